@@ -8,12 +8,19 @@ from app.service.logging.logger import (
     START_MODULE_MESSAGE
 )
 from app.config.settings import settings
+from app.aiogram_services.session import TunedAiohttpSession
 
 
-MODULE_DESCRIPTION = "This is module for aiogram bot"
+MODULE_DESCRIPTION = "This is module for aiogram bots"
 
 
-bot = Bot(token=settings.BOT_TOKEN)
+# one HTTP session (connection pool) is shared by all bots of the process
+session = TunedAiohttpSession()
+
+bots: list[Bot] = [Bot(token=token, session=session) for token in settings.ALL_BOT_TOKENS]
+
+# the main bot (BOT_TOKEN)
+bot = bots[0]
 
 
 if __name__ != "__main__":
@@ -23,6 +30,7 @@ if __name__ != "__main__":
 def main():
     logger.info(START_MODULE_MESSAGE + str(__file__))
     logger.info(MODULE_DESCRIPTION)
+    logger.info(f"Bots in process: {len(bots)}")
     logger.info(str_object_is_created(bot))
 
 
@@ -0,0 +1,17 @@
+from app.aiogram_services.keyboards.callback_data import CompactCallback, CompactCallbackFilter
+from app.aiogram_services.keyboards.registry import KeyboardRegistry, keyboards
+from app.aiogram_services.keyboards.diagnostics import (
+    DIAGNOSTICS_KEYBOARD,
+    DIAGNOSTICS_REFRESH,
+    diagnostics_callback,
+)
+
+__all__ = [
+    "CompactCallback",
+    "CompactCallbackFilter",
+    "KeyboardRegistry",
+    "keyboards",
+    "DIAGNOSTICS_KEYBOARD",
+    "DIAGNOSTICS_REFRESH",
+    "diagnostics_callback",
+]
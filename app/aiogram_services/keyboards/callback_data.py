@@ -0,0 +1,193 @@
+# app/aiogram_services/keyboards/callback_data.py
+
+from __future__ import annotations
+
+import base64
+import struct
+from collections import namedtuple
+from typing import Any, Literal
+from uuid import UUID
+
+from aiogram.filters import Filter
+from aiogram.types import CallbackQuery
+
+from app.service.logging.logger import (
+    logger,
+    START_MODULE_MESSAGE,
+    str_object_is_created,
+)
+
+
+MODULE_DESCRIPTION = ("This module provides compact callback data: a short prefix and struct-packed fields "
+                      "in base64url, checked against Telegram's 64 bytes limit when the factory is defined.")
+
+
+CALLBACK_DATA_LIMIT = 64
+SEPARATOR = "."
+
+# field type -> struct format; "uuid" is packed as 16 bytes
+FIELD_FORMATS = {
+    "bool": "?",
+    "uint8": "B",
+    "uint16": "H",
+    "uint32": "I",
+    "int32": "i",
+    "int64": "q",
+    "uuid": "16s",
+}
+
+
+class CompactCallback:
+    """
+    Factory of one kind of callback data: ``<prefix>.<base64url of packed fields>``.
+    E.g. chat_id (int64) + message_id (int32) + action (uint8) take 20 characters
+    (aiogram CallbackData takes the decimal digits of every value plus separators).
+
+    Usage:
+        rule_callback = CompactCallback("nr", rule_uuid="uuid", action="uint8")
+        data = rule_callback.pack(rule_uuid=rule.uuid, action=1)
+
+        @router.callback_query(rule_callback.filter(action=1))
+        async def handler(query: CallbackQuery, callback_data):
+            callback_data.rule_uuid ...
+    """
+
+    __slots__ = ("prefix", "fields", "_head", "_struct", "_uuid_fields", "_values_type")
+
+    def __init__(self, prefix: str, **fields: str):
+        if not prefix or SEPARATOR in prefix:
+            raise ValueError(f"Callback prefix must be a non-empty string without {SEPARATOR!r}: {prefix!r}")
+
+        unknown = {name: kind for name, kind in fields.items() if kind not in FIELD_FORMATS}
+        if unknown:
+            raise ValueError(f"Unknown field types {unknown}, expected one of {list(FIELD_FORMATS)}")
+
+        self.prefix = prefix
+        self.fields = fields
+        self._head = prefix + SEPARATOR
+        self._struct = struct.Struct("<" + "".join(FIELD_FORMATS[kind] for kind in fields.values()))
+        self._uuid_fields = tuple(index for index, kind in enumerate(fields.values()) if kind == "uuid")
+        self._values_type = namedtuple(f"{prefix}_callback", fields.keys())
+
+        if self.max_length > CALLBACK_DATA_LIMIT:
+            raise ValueError(f"Callback data '{prefix}' takes up to {self.max_length} bytes, "
+                             f"Telegram limit is {CALLBACK_DATA_LIMIT}")
+
+    @property
+    def max_length(self) -> int:
+        # base64 without padding: 4 characters per 3 bytes, rounded up
+        return len(self._head.encode()) + -(-self._struct.size * 4 // 3)
+
+    def pack(self, **values: Any) -> str:
+        """
+        Parameters:
+            **values: Values of all fields.
+
+        Returns:
+            str: Callback data.
+
+        Raises:
+            ValueError: If a field is missing or unknown, or a value does not fit its type.
+        """
+
+        if values.keys() != self.fields.keys():
+            raise ValueError(f"Callback '{self.prefix}' takes fields {list(self.fields)}, got {sorted(values)}")
+
+        args = [values[name] for name in self.fields]
+        try:
+            for index in self._uuid_fields:
+                args[index] = args[index].bytes
+            packed = self._struct.pack(*args)
+        except (AttributeError, struct.error) as e:
+            raise ValueError(f"Invalid values of callback '{self.prefix}': {e}") from e
+        return self._head + base64.urlsafe_b64encode(packed).rstrip(b"=").decode()
+
+    def matches(self, data: str) -> bool:
+        """Cheap check (prefix only) whether the data is of this kind."""
+        return data.startswith(self._head)
+
+    def unpack(self, data: str) -> Any:
+        """
+        Parameters:
+            data (str): Callback data made by ``pack``.
+
+        Returns:
+            namedtuple: Values of the fields.
+
+        Raises:
+            ValueError: If the data is not of this kind or is damaged.
+        """
+
+        if not data.startswith(self._head):
+            raise ValueError(f"Callback data is not of kind '{self.prefix}'")
+
+        encoded = data[len(self._head):]
+        try:
+            raw = base64.urlsafe_b64decode(encoded + "=" * (-len(encoded) % 4))
+            values = self._struct.unpack(raw)
+        except (ValueError, struct.error) as e:
+            # binascii.Error (bad base64) and the error of a non-ASCII string are ValueErrors
+            raise ValueError(f"Damaged callback data '{self.prefix}': {e}") from e
+
+        # the decoder skips characters outside of the alphabet: only the data made by pack is accepted
+        if base64.urlsafe_b64encode(raw).rstrip(b"=").decode() != encoded:
+            raise ValueError(f"Damaged callback data '{self.prefix}': not a canonical encoding")
+
+        if self._uuid_fields:
+            values = list(values)
+            for index in self._uuid_fields:
+                values[index] = UUID(bytes=values[index])
+        return self._values_type._make(values)
+
+    def filter(self, **expected: Any) -> "CompactCallbackFilter":
+        """
+        Filter of callback queries of this kind; values are passed to the handler as ``callback_data``.
+
+        Parameters:
+            **expected: Required values of fields (e.g. action=1).
+        """
+
+        unknown = set(expected) - set(self.fields)
+        if unknown:
+            raise ValueError(f"Callback '{self.prefix}' has no fields {sorted(unknown)}")
+        return CompactCallbackFilter(self, expected)
+
+
+class CompactCallbackFilter(Filter):
+    __slots__ = ("callback", "expected")
+
+    def __init__(self, callback: CompactCallback, expected: dict[str, Any]):
+        self.callback = callback
+        self.expected = expected
+
+    def __str__(self) -> str:
+        return self._signature_to_string(prefix=self.callback.prefix, **self.expected)
+
+    async def __call__(self, query: CallbackQuery) -> Literal[False] | dict[str, Any]:
+        data = query.data
+        # the prefix is checked before decoding: queries of other kinds cost one startswith
+        if not data or not self.callback.matches(data):
+            return False
+        try:
+            values = self.callback.unpack(data)
+        except ValueError:
+            return False
+
+        for name, value in self.expected.items():
+            if getattr(values, name) != value:
+                return False
+        return {"callback_data": values}
+
+
+def main():
+    logger.info(START_MODULE_MESSAGE + str(__file__))
+    logger.info(MODULE_DESCRIPTION)
+    logger.info(str_object_is_created(CompactCallback))
+
+
+if __name__ != "__main__":
+    main()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,42 @@
+# app/aiogram_services/keyboards/diagnostics.py
+
+from aiogram.types import InlineKeyboardButton, InlineKeyboardMarkup
+
+from app.aiogram_services.keyboards.callback_data import CompactCallback
+from app.aiogram_services.keyboards.registry import keyboards
+from app.service.logging.logger import (
+    logger,
+    START_MODULE_MESSAGE,
+    str_object_is_created,
+)
+
+
+MODULE_DESCRIPTION = "This module stores keyboards and callback data of admin diagnostics commands."
+
+
+DIAGNOSTICS_KEYBOARD = "diagnostics"
+
+DIAGNOSTICS_REFRESH = 1
+
+diagnostics_callback = CompactCallback("dg", action="uint8")
+
+
+@keyboards.static(DIAGNOSTICS_KEYBOARD)
+def diagnostics_keyboard() -> InlineKeyboardMarkup:
+    return InlineKeyboardMarkup(inline_keyboard=[[
+        InlineKeyboardButton(text="Refresh", callback_data=diagnostics_callback.pack(action=DIAGNOSTICS_REFRESH)),
+    ]])
+
+
+def main():
+    logger.info(START_MODULE_MESSAGE + str(__file__))
+    logger.info(MODULE_DESCRIPTION)
+    logger.info(str_object_is_created(diagnostics_callback))
+
+
+if __name__ != "__main__":
+    main()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+# app/aiogram_services/keyboards/registry.py
+
+from functools import lru_cache
+from typing import Callable, TypeVar
+
+from aiogram.types import InlineKeyboardMarkup, ReplyKeyboardMarkup
+
+from app.service.logging.logger import (
+    logger,
+    START_MODULE_MESSAGE,
+    str_object_is_created,
+)
+
+
+MODULE_DESCRIPTION = ("This module stores registry of keyboards: static markups are built once and reused, "
+                      "parametrized ones are cached per arguments.")
+
+
+Markup = InlineKeyboardMarkup | ReplyKeyboardMarkup
+MarkupBuilder = TypeVar("MarkupBuilder", bound=Callable[..., Markup])
+
+
+class KeyboardRegistry:
+    """
+    Markups are shared between responses: they must not be changed after they are built.
+
+    Usage:
+        @keyboards.static("diagnostics")
+        def diagnostics_keyboard() -> InlineKeyboardMarkup: ...
+
+        @keyboards.cached(maxsize=256)
+        def page_keyboard(page: int) -> InlineKeyboardMarkup: ...
+
+        await message.answer(text, reply_markup=keyboards.get("diagnostics"))
+    """
+
+    def __init__(self):
+
+        logger.debug("Initializing KeyboardRegistry")
+
+        self._builders: dict[str, Callable[[], Markup]] = {}
+        self._markups: dict[str, Markup] = {}
+        self._cached_builders: list[Callable] = []
+
+    def static(self, name: str) -> Callable[[Callable[[], Markup]], Callable[[], Markup]]:
+        """Register builder of a keyboard without parameters."""
+
+        def decorator(builder: Callable[[], Markup]) -> Callable[[], Markup]:
+            if name in self._builders:
+                raise ValueError(f"Keyboard '{name}' is already registered")
+            self._builders[name] = builder
+            return builder
+
+        return decorator
+
+    def cached(self, maxsize: int = 128) -> Callable[[MarkupBuilder], MarkupBuilder]:
+        """Cache markups of a builder per (hashable) arguments, e.g. a page number."""
+
+        def decorator(builder: MarkupBuilder) -> MarkupBuilder:
+            cached_builder = lru_cache(maxsize=maxsize)(builder)
+            self._cached_builders.append(cached_builder)
+            return cached_builder
+
+        return decorator
+
+    def get(self, name: str) -> Markup:
+        """
+        Parameters:
+            name (str): Name of the static keyboard.
+
+        Returns:
+            Markup: The markup (built on the first call if ``build_all`` was not called).
+        """
+
+        markup = self._markups.get(name)
+        if markup is None:
+            markup = self._markups[name] = self._builders[name]()
+        return markup
+
+    def build_all(self) -> None:
+        """Build static keyboards in advance (at startup, before the first update)."""
+        for name in self._builders:
+            self.get(name)
+        logger.info(f"Keyboards are built: {len(self._markups)}")
+
+    def stats(self) -> dict[str, int]:
+        hits = misses = 0
+        for cached_builder in self._cached_builders:
+            info = cached_builder.cache_info()
+            hits += info.hits
+            misses += info.misses
+        return {"static": len(self._markups), "cached_hits": hits, "cached_misses": misses}
+
+
+keyboards = KeyboardRegistry()
+
+
+def main():
+    logger.info(START_MODULE_MESSAGE + str(__file__))
+    logger.info(MODULE_DESCRIPTION)
+    logger.info(str_object_is_created(keyboards))
+
+
+if __name__ != "__main__":
+    main()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,6 +1,7 @@
 # app/aiogram_services/main.py
 
-from app.aiogram_services.bot import bot
+from app.aiogram_services.bot import bots, session
+from app.config.settings import settings
 from app.service.logging.logger import (
     logger,
     str_object_is_created,
@@ -8,35 +9,200 @@ from app.service.logging.logger import (
 )
 from app.aiogram_services.routers import (
     start_router,
+    diagnostics_router,
+    messages_router,
 )
-
-from aiogram import Dispatcher
+from app.aiogram_services.middlewares.in_flight import InFlightUpdatesMiddleware
+from app.aiogram_services.middlewares.update_dedup import UpdateDeduplicationMiddleware
+from app.aiogram_services.middlewares.query_stats import QueryStatsMiddleware
+from app.aiogram_services.middlewares.handler_timing import HandlerTimingMiddleware
+from app.aiogram_services.middlewares.bot_metrics import bot_metrics_middleware
+from app.aiogram_services.middlewares.db_session import DbSessionMiddleware
+from app.aiogram_services.middlewares.throttling import throttling_middleware
+from app.aiogram_services.middlewares.chat_metadata import ChatMetadataMiddleware
+from app.aiogram_services.middlewares.tracing import UpdateTracingMiddleware, HandlerTracingMiddleware
+from app.service.diagnostics.loop_monitor import loop_lag_monitor
+from app.service.diagnostics.task_profiler import install_profile_signal_handler
+from app.service.database.database import get_session
+from app.service.database.crud.polling_offsets import get_last_update_id, save_last_update_id
+from app.service.lifecycle.shutdown import run_flush_hooks, register_flush_hook
+from app.aiogram_services.storage import CachedStorage, SQLAlchemyStorage, RedisFsmStorage
+
+from aiogram import Bot, Dispatcher
+from aiogram.fsm.storage.base import BaseStorage
 from aiogram.fsm.storage.memory import MemoryStorage
 
 
 MODULE_DESCRIPTION = "This is main module for aiogram. Functions to start aiogram bot and run FastAPI app."
 
 
-storage = MemoryStorage()
+def create_fsm_storage() -> BaseStorage:
+    """
+    Create FSM storage according to settings.FSM_STORAGE.
+    """
+
+    if settings.FSM_STORAGE == "sqlalchemy":
+        return SQLAlchemyStorage()
+    if settings.FSM_STORAGE == "redis":
+        return RedisFsmStorage.from_url(settings.FSM_REDIS_URL)
+    if settings.FSM_STORAGE != "memory":
+        logger.warning(f"Unknown FSM_STORAGE={settings.FSM_STORAGE}, memory storage is used")
+
+    return MemoryStorage()
+
+
+storage = create_fsm_storage()
+if isinstance(storage, CachedStorage):
+    # the Dispatcher only flushes it (storage.close) before the drain: the backend is closed after the drain
+    register_flush_hook("fsm storage", storage.shutdown)
 
 dp = Dispatcher(storage=storage)
 
+# root span of the update (sampling decision): the rest of middlewares are inside it
+dp.update.outer_middleware(UpdateTracingMiddleware())
+
+# one dispatcher serves all bots: handlers get the bot of the update ("bot", "bot_id" in context)
+dp.update.outer_middleware(bot_metrics_middleware)
+
+in_flight_middleware = InFlightUpdatesMiddleware()
+dp.update.outer_middleware(in_flight_middleware)
+
+update_dedup_middleware = UpdateDeduplicationMiddleware()
+dp.update.outer_middleware(update_dedup_middleware)
+
+# flood protection: throttled updates never reach the database or handlers
+dp.update.outer_middleware(throttling_middleware)
+
+# chat titles / usernames for links and notifications, without getChat for active chats
+dp.update.outer_middleware(ChatMetadataMiddleware())
+
+if settings.DB_QUERY_STATS_ENABLED:
+    # per update and per handler (inner middlewares of dp are propagated to included routers)
+    dp.update.outer_middleware(QueryStatsMiddleware(budget=0))
+    dp.message.middleware(QueryStatsMiddleware())
+    dp.callback_query.middleware(QueryStatsMiddleware())
+
+# session per update ("db" in context); None while the database circuit is open
+dp.update.outer_middleware(DbSessionMiddleware())
+
+dp.message.middleware(HandlerTimingMiddleware())
+dp.callback_query.middleware(HandlerTimingMiddleware())
+dp.message.middleware(HandlerTracingMiddleware())
+dp.callback_query.middleware(HandlerTracingMiddleware())
+
+dp.include_router(diagnostics_router)
 dp.include_router(start_router)
+# catch-all: included last, commands are handled by the routers above
+dp.include_router(messages_router)
+
+
+@dp.startup()
+async def start_diagnostics() -> None:
+    loop_lag_monitor.start()
+    install_profile_signal_handler()
+
+
+@dp.startup()
+async def start_fsm_storage() -> None:
+    if isinstance(storage, CachedStorage):
+        storage.start()
+
+
+@dp.shutdown()
+async def stop_diagnostics() -> None:
+    loop_lag_monitor.stop()
+
+
+async def confirm_updates(bot: Bot, last_update_id: int) -> None:
+    """
+    Confirm (acknowledge) all updates up to last_update_id on Telegram side,
+    so they are not delivered again.
+    """
+    await bot.get_updates(offset=last_update_id + 1, limit=1, timeout=0)
 
 
-async def dp_task() -> None:
+async def restore_polling_offset(bot: Bot) -> None:
     """
-    Start polling in a controlled way:
+    Resume polling from the persisted offset: updates up to the last processed one are confirmed
+    before polling starts, so they are not replayed.
+    This is a best-effort hint (see ``InFlightUpdatesMiddleware.safe_offset``): aiogram already confirmed
+    every batch it fetched before the last one, those updates are not delivered again either way.
+    """
+
+    async with get_session() as db:
+        last_update_id = await get_last_update_id(db, bot.id)
+
+    if last_update_id is None:
+        logger.info(f"No persisted polling offset for bot {bot.id}")
+        return
+
+    await confirm_updates(bot, last_update_id)
+    logger.info(f"Polling offset restored for bot {bot.id}: last_update_id={last_update_id}")
+
+
+async def persist_polling_offset(bot: Bot) -> None:
+    """
+    Persist the last processed update_id of the bot and confirm it on Telegram side
+    (a best-effort progress marker, see ``InFlightUpdatesMiddleware.safe_offset``).
+    """
+
+    last_update_id = in_flight_middleware.safe_offset(bot.id)
+    if last_update_id is None:
+        logger.info(f"Bot {bot.id} has not processed any update, offset is not persisted")
+        return
+
+    async with get_session() as db:
+        await save_last_update_id(db, bot.id, last_update_id)
+
+    await confirm_updates(bot, last_update_id)
+    logger.info(f"Polling offset persisted for bot {bot.id}: last_update_id={last_update_id}")
+
+
+async def graceful_shutdown(bots: list[Bot]) -> None:
+    """
+    Shutdown protocol (polling is already stopped):
+    - drain in-flight handlers with a deadline,
+    - flush buffered work (pending DB writes and so on),
+    - persist the last processed update_id of every bot.
+    """
+
+    await in_flight_middleware.drain(timeout=settings.SHUTDOWN_DRAIN_TIMEOUT_SECONDS)
+    await run_flush_hooks(timeout=settings.SHUTDOWN_FLUSH_TIMEOUT_SECONDS)
+
+    for bot in bots:
+        try:
+            await persist_polling_offset(bot)
+        except Exception as e:
+            logger.error(f"Failed to persist polling offset of bot {bot.id}: {e}")
+
+
+async def dp_task(handle_signals: bool = True) -> None:
+    """
+    Start polling of all bots in a controlled way:
+    - resume from the persisted offsets,
     - resolve allowed updates,
-    - close bot session on shutdown.
+    - drain, flush and persist offsets on shutdown,
+    - close the shared bot session on shutdown.
     """
+    for bot in bots:
+        try:
+            await restore_polling_offset(bot)
+        except Exception as e:
+            logger.error(f"Failed to restore polling offset of bot {bot.id}: {e}")
+
     allowed_updates = dp.resolve_used_update_types()
-    logger.info(f"Starting polling. allowed_updates={allowed_updates}")
+    logger.info(f"Starting polling of {len(bots)} bots. allowed_updates={allowed_updates}")
     try:
-        await dp.start_polling(bot, allowed_updates=allowed_updates)
+        await dp.start_polling(
+            *bots,
+            allowed_updates=allowed_updates,
+            handle_signals=handle_signals,
+            close_bot_session=False,
+        )
     finally:
+        await graceful_shutdown(bots)
         try:
-            await bot.session.close()
+            await session.close()
         except Exception as e:
             logger.error(f"Failed to close bot session: {e}")
         logger.info("Bot stopped.")
@@ -0,0 +1,86 @@
+# app/aiogram_services/middlewares/bot_metrics.py
+
+from __future__ import annotations
+
+import time
+from dataclasses import dataclass
+from typing import Callable, Dict, Any, Awaitable
+from aiogram import BaseMiddleware, Bot
+from aiogram.types import Update
+
+from app.service.logging.logger import (
+    logger,
+    START_MODULE_MESSAGE,
+    str_object_is_created,
+)
+
+
+MODULE_DESCRIPTION = ("This module provides an outer middleware which collects per-bot metrics when one "
+                      "dispatcher serves several bots, and puts bot_id into handler context.")
+
+
+@dataclass(slots=True)
+class BotMetrics:
+    updates: int = 0
+    errors: int = 0
+    processing_seconds: float = 0.0
+
+    @property
+    def average_ms(self) -> float:
+        return self.processing_seconds * 1000 / self.updates if self.updates else 0.0
+
+
+class BotMetricsMiddleware(BaseMiddleware):
+    def __init__(self):
+
+        logger.debug("Initializing BotMetricsMiddleware")
+
+        self.metrics: dict[int, BotMetrics] = {}
+
+    def report(self) -> str:
+        lines = [
+            f"bot {bot_id}: updates={metrics.updates} errors={metrics.errors} avg={metrics.average_ms:.1f}ms"
+            for bot_id, metrics in self.metrics.items()
+        ]
+        return "\n".join(lines) or "no updates yet"
+
+    async def __call__(
+        self,
+        handler: Callable[[Any, Dict[str, Any]], Awaitable[Any]],
+        event: Update,
+        data: Dict[str, Any],
+    ) -> Any:
+
+        bot: Bot = data["bot"]
+        data["bot_id"] = bot.id
+
+        metrics = self.metrics.get(bot.id)
+        if metrics is None:
+            metrics = self.metrics[bot.id] = BotMetrics()
+
+        started = time.perf_counter()
+        try:
+            return await handler(event, data)
+        except Exception:
+            metrics.errors += 1
+            raise
+        finally:
+            metrics.updates += 1
+            metrics.processing_seconds += time.perf_counter() - started
+
+
+bot_metrics_middleware = BotMetricsMiddleware()
+
+
+def main():
+    logger.info(START_MODULE_MESSAGE + str(__file__))
+    logger.info(MODULE_DESCRIPTION)
+    logger.info(str_object_is_created(bot_metrics_middleware))
+
+
+if __name__ != "__main__":
+    main()
+
+
+if __name__ == "__main__":
+    main()
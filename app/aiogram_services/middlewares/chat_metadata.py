@@ -0,0 +1,52 @@
+# app/aiogram_services/middlewares/chat_metadata.py
+
+from __future__ import annotations
+
+from typing import Callable, Dict, Any, Awaitable
+from aiogram import BaseMiddleware
+
+from app.service.chats.metadata import ChatMetadataCache, chat_metadata_cache
+from app.service.logging.logger import (
+    logger,
+    START_MODULE_MESSAGE,
+    str_object_is_created,
+)
+
+
+MODULE_DESCRIPTION = ("This module provides an outer middleware which fills the chat metadata cache from incoming "
+                      "updates, so link building and notifications do not call getChat for active chats.")
+
+
+class ChatMetadataMiddleware(BaseMiddleware):
+    def __init__(self, cache: ChatMetadataCache = chat_metadata_cache):
+
+        logger.debug("Initializing ChatMetadataMiddleware")
+
+        self.cache = cache
+
+    async def __call__(
+        self,
+        handler: Callable[[Any, Dict[str, Any]], Awaitable[Any]],
+        event: Any,
+        data: Dict[str, Any],
+    ) -> Any:
+
+        chat = data.get("event_chat")
+        if chat is not None:
+            self.cache.update_from_chat(chat)
+
+        return await handler(event, data)
+
+
+def main():
+    logger.info(START_MODULE_MESSAGE + str(__file__))
+    logger.info(MODULE_DESCRIPTION)
+    logger.info(str_object_is_created(ChatMetadataMiddleware()))
+
+
+if __name__ != "__main__":
+    main()
+
+
+if __name__ == "__main__":
+    main()
@@ -7,6 +7,9 @@ from aiogram import BaseMiddleware
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.service.database.database import get_session
+from app.service.database.circuit_breaker import CircuitBreaker, db_circuit_breaker
+from app.service.database.routing import routing_scope
+from app.service.tracing.tracer import tracer
 from app.service.logging.logger import (
     logger,
     START_MODULE_MESSAGE,
@@ -15,15 +18,17 @@ from app.service.logging.logger import (
 
 
 MODULE_DESCRIPTION = ("This module provides a middleware for managing database sessions in an asynchronous context using SQLAlchemy."
-                      "Like Dependency Injection in FastAPI, it ensures that each request has a dedicated database session.")
+                      "Like Dependency Injection in FastAPI, it ensures that each request has a dedicated database session. "
+                      "While the database circuit is open handlers get db=None and do not wait for the database.")
 
 
 class DbSessionMiddleware(BaseMiddleware):
-    def __init__(self, session_factory=get_session):
+    def __init__(self, session_factory=get_session, circuit_breaker: CircuitBreaker = db_circuit_breaker):
 
         logger.debug("Initializing DbSessionMiddleware")
 
         self.session_factory = session_factory
+        self.circuit_breaker = circuit_breaker
 
     async def __call__(
         self,
@@ -34,16 +39,33 @@ class DbSessionMiddleware(BaseMiddleware):
 
         logger.debug(f"DbSessionMiddleware called with event: {event}")
 
-        async with self.session_factory() as session:  # type: AsyncSession
-            data["db"] = session
-            try:
-                result = await handler(event, data)
-                await session.commit()
+        # sessions opened by handlers themselves (e.g. persist_message) share read-your-writes with this one
+        with tracer.span("db_session") as span, routing_scope():
+            if self.circuit_breaker.is_open:
+                # fail fast: handlers spool their writes (see service.spool.persist) instead of waiting for the database
+                if span is not None:
+                    span.set_attribute("circuit", "open")
+                data["db"] = None
+                return await handler(event, data)
+
+            async with self.session_factory() as session:  # type: AsyncSession
+                data["db"] = session
+                try:
+                    result = await handler(event, data)
+                    used_database = session.in_transaction()
+                    with tracer.span("db_commit"):
+                        await session.commit()
+                except self.circuit_breaker.failures:
+                    self.circuit_breaker.record_failure()
+                    await session.rollback()
+                    raise
+                except Exception:
+                    await session.rollback()
+                    raise
+
+                if used_database:
+                    self.circuit_breaker.record_success()
                 return result
-            except Exception:
-                await session.rollback()
-                raise
-
 
 def main():
     logger.info(START_MODULE_MESSAGE + str(__file__))
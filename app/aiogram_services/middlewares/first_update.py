@@ -0,0 +1,56 @@
+# app/aiogram_services/middlewares/first_update.py
+
+from __future__ import annotations
+
+import time
+from typing import Callable, Dict, Any, Awaitable
+from aiogram import BaseMiddleware
+from aiogram.types import Update
+
+from app.service.logging.logger import (
+    logger,
+    START_MODULE_MESSAGE,
+    str_object_is_created,
+)
+
+
+MODULE_DESCRIPTION = "This module provides an outer middleware which reports time from process start to the first update."
+
+
+class FirstUpdateMiddleware(BaseMiddleware):
+    def __init__(self, started_at: float | None = None):
+
+        logger.debug("Initializing FirstUpdateMiddleware")
+
+        # time.perf_counter() of the process start
+        self.started_at = started_at if started_at is not None else time.perf_counter()
+        self.first_update_seconds: float | None = None
+
+    async def __call__(
+        self,
+        handler: Callable[[Any, Dict[str, Any]], Awaitable[Any]],
+        event: Update,
+        data: Dict[str, Any],
+    ) -> Any:
+
+        if self.first_update_seconds is None:
+            self.first_update_seconds = time.perf_counter() - self.started_at
+            logger.info(
+                f"Startup to first update: {self.first_update_seconds:.3f}s (update_id={event.update_id})"
+            )
+
+        return await handler(event, data)
+
+
+def main():
+    logger.info(START_MODULE_MESSAGE + str(__file__))
+    logger.info(MODULE_DESCRIPTION)
+    logger.info(str_object_is_created(FirstUpdateMiddleware()))
+
+
+if __name__ != "__main__":
+    main()
+
+
+if __name__ == "__main__":
+    main()
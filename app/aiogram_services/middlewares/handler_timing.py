@@ -0,0 +1,62 @@
+# app/aiogram_services/middlewares/handler_timing.py
+
+from __future__ import annotations
+
+import time
+from typing import Callable, Dict, Any, Awaitable
+from aiogram import BaseMiddleware
+
+from app.service.diagnostics.slow_handlers import slow_handlers_recorder
+from app.service.logging.logger import (
+    logger,
+    START_MODULE_MESSAGE,
+    str_object_is_created,
+)
+
+
+MODULE_DESCRIPTION = "This module provides an inner middleware which records handler durations for diagnostics."
+
+
+class HandlerTimingMiddleware(BaseMiddleware):
+    def __init__(self, recorder=slow_handlers_recorder):
+
+        logger.debug("Initializing HandlerTimingMiddleware")
+
+        self.recorder = recorder
+
+    async def __call__(
+        self,
+        handler: Callable[[Any, Dict[str, Any]], Awaitable[Any]],
+        event: Any,
+        data: Dict[str, Any],
+    ) -> Any:
+
+        started = time.perf_counter()
+        try:
+            return await handler(event, data)
+        finally:
+            handler_object = data.get("handler")
+            callback = handler_object.callback if handler_object is not None else handler
+            chat = data.get("event_chat")
+            update = data.get("event_update")
+
+            self.recorder.record(
+                handler=getattr(callback, "__qualname__", repr(callback)),
+                duration=time.perf_counter() - started,
+                update_id=update.update_id if update is not None else None,
+                chat_id=chat.id if chat is not None else None,
+            )
+
+
+def main():
+    logger.info(START_MODULE_MESSAGE + str(__file__))
+    logger.info(MODULE_DESCRIPTION)
+    logger.info(str_object_is_created(HandlerTimingMiddleware()))
+
+
+if __name__ != "__main__":
+    main()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,121 @@
+# app/aiogram_services/middlewares/in_flight.py
+
+from __future__ import annotations
+
+import asyncio
+from typing import Callable, Dict, Any, Awaitable
+from aiogram import BaseMiddleware, Bot
+from aiogram.types import Update
+
+from app.service.logging.logger import (
+    logger,
+    START_MODULE_MESSAGE,
+    str_object_is_created,
+)
+
+
+MODULE_DESCRIPTION = ("This module provides an outer middleware which tracks in-flight updates per bot. "
+                      "It is used to drain handlers on shutdown and to report how far every update is processed.")
+
+
+class InFlightUpdatesMiddleware(BaseMiddleware):
+    def __init__(self):
+
+        logger.debug("Initializing InFlightUpdatesMiddleware")
+
+        self._in_flight: dict[int, set[int]] = {}
+        self._last_processed: dict[int, int] = {}
+        self._idle = asyncio.Event()
+        self._idle.set()
+
+    @property
+    def in_flight_count(self) -> int:
+        return sum(len(update_ids) for update_ids in self._in_flight.values())
+
+    def in_flight_update_ids(self, bot_id: int) -> list[int]:
+        """Update ids of the bot which are being processed now."""
+        return sorted(self._in_flight.get(bot_id, ()))
+
+    def safe_offset(self, bot_id: int) -> int | None:
+        """
+        Return the last update_id of the bot up to which every update is processed.
+
+        It is a best-effort progress marker, not a delivery guarantee: aiogram confirms the updates of
+        a getUpdates batch when it requests the next batch, so Telegram does not deliver them again
+        even if their handlers have not finished. Updates still in flight when the drain times out are lost;
+        they are logged by ``drain`` (ids above this offset).
+
+        Parameters:
+            bot_id (int): The telegram id of the bot.
+
+        Returns:
+            int | None: The update_id, or None if the bot has not processed any update yet.
+        """
+
+        in_flight = self._in_flight.get(bot_id)
+        if in_flight:
+            return min(in_flight) - 1
+
+        return self._last_processed.get(bot_id)
+
+    async def drain(self, timeout: float) -> bool:
+        """
+        Wait until all in-flight updates are processed.
+
+        Parameters:
+            timeout (float): Deadline in seconds.
+
+        Returns:
+            bool: True if all updates were processed, False if deadline was exceeded.
+        """
+
+        logger.info(f"Draining {self.in_flight_count} in-flight updates (timeout={timeout}s)")
+
+        try:
+            await asyncio.wait_for(self._idle.wait(), timeout=timeout)
+        except asyncio.TimeoutError:
+            logger.error(f"Drain timed out, {self.in_flight_count} updates are still in-flight")
+            for bot_id in self._in_flight:
+                update_ids = self.in_flight_update_ids(bot_id)
+                if update_ids:
+                    logger.error(f"Bot {bot_id}: updates {update_ids} are not processed, they are not delivered again")
+            return False
+
+        return True
+
+    async def __call__(
+        self,
+        handler: Callable[[Any, Dict[str, Any]], Awaitable[Any]],
+        event: Update,
+        data: Dict[str, Any],
+    ) -> Any:
+
+        bot: Bot = data["bot"]
+        update_id = event.update_id
+
+        in_flight = self._in_flight.setdefault(bot.id, set())
+        in_flight.add(update_id)
+        self._idle.clear()
+
+        try:
+            return await handler(event, data)
+        finally:
+            in_flight.discard(update_id)
+            if update_id > self._last_processed.get(bot.id, -1):
+                self._last_processed[bot.id] = update_id
+            if self.in_flight_count == 0:
+                self._idle.set()
+
+
+def main():
+    logger.info(START_MODULE_MESSAGE + str(__file__))
+    logger.info(MODULE_DESCRIPTION)
+    logger.info(str_object_is_created(InFlightUpdatesMiddleware()))
+
+
+if __name__ != "__main__":
+    main()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+# app/aiogram_services/middlewares/query_stats.py
+
+from __future__ import annotations
+
+from typing import Callable, Dict, Any, Awaitable
+from aiogram import BaseMiddleware
+from aiogram.types import Update
+
+from app.config.settings import settings
+from app.service.database.query_stats import collect_queries
+from app.service.logging.logger import (
+    logger,
+    START_MODULE_MESSAGE,
+    str_object_is_created,
+)
+
+
+MODULE_DESCRIPTION = ("This module provides a middleware which counts SQL statements per update (outer middleware "
+                      "of dp.update) or per handler (inner middleware of dp.message, dp.callback_query...).")
+
+
+class QueryStatsMiddleware(BaseMiddleware):
+    def __init__(self, budget: int = settings.DB_QUERY_BUDGET_PER_HANDLER):
+
+        logger.debug("Initializing QueryStatsMiddleware")
+
+        # 0 means no budget
+        self.budget = budget
+
+    @staticmethod
+    def get_label(event: Any, data: Dict[str, Any]) -> str:
+        if isinstance(event, Update):
+            return f"update {event.update_id}"
+
+        handler_object = data.get("handler")
+        if handler_object is not None:
+            callback = handler_object.callback
+            return f"handler {callback.__module__}.{getattr(callback, '__qualname__', callback)}"
+
+        return f"event {type(event).__name__}"
+
+    async def __call__(
+        self,
+        handler: Callable[[Any, Dict[str, Any]], Awaitable[Any]],
+        event: Any,
+        data: Dict[str, Any],
+    ) -> Any:
+
+        label = self.get_label(event, data)
+
+        with collect_queries(label) as stats:
+            result = await handler(event, data)
+
+        logger.debug(f"{label}: {stats.count} queries")
+        if self.budget and stats.count > self.budget:
+            logger.warning(f"Query budget exceeded in {label} ({stats.count} > {self.budget})\n{stats.report()}")
+
+        return result
+
+
+def main():
+    logger.info(START_MODULE_MESSAGE + str(__file__))
+    logger.info(MODULE_DESCRIPTION)
+    logger.info(str_object_is_created(QueryStatsMiddleware()))
+
+
+if __name__ != "__main__":
+    main()
+
+
+if __name__ == "__main__":
+    main()
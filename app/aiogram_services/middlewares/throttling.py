@@ -0,0 +1,156 @@
+# app/aiogram_services/middlewares/throttling.py
+
+from __future__ import annotations
+
+import asyncio
+import time
+from collections import Counter
+from typing import Callable, Dict, Any, Awaitable
+from aiogram import BaseMiddleware
+from aiogram.types import Update, User, Chat
+
+from app.config.settings import settings
+from app.service.throttling.token_bucket import TokenBuckets
+from app.service.logging.logger import (
+    logger,
+    START_MODULE_MESSAGE,
+    str_object_is_created,
+)
+
+
+MODULE_DESCRIPTION = ("This module provides an outer middleware which rate limits updates per user and per chat "
+                      "(token buckets) before any database or handler work happens.")
+
+
+# what to do with an update over the limit
+POLICY_DROP = "drop"      # skip the update
+POLICY_RECORD = "record"  # only count it, process as usual
+POLICY_DELAY = "delay"    # wait for a token (up to max delay, then drop)
+
+POLICIES = (POLICY_DROP, POLICY_RECORD, POLICY_DELAY)
+
+
+class ThrottlingMiddleware(BaseMiddleware):
+    """
+    Register it as ``dp.update.outer_middleware`` after UpdateDeduplicationMiddleware and before
+    DbSessionMiddleware. Uses user / chat resolved by aiogram's UserContextMiddleware. Admins are not limited.
+    """
+
+    def __init__(
+        self,
+        policy: str = settings.THROTTLING_POLICY,
+        user_rate: float = settings.THROTTLING_USER_RATE,
+        user_burst: float = settings.THROTTLING_USER_BURST,
+        chat_rate: float = settings.THROTTLING_CHAT_RATE,
+        chat_burst: float = settings.THROTTLING_CHAT_BURST,
+        max_delay_seconds: float = settings.THROTTLING_MAX_DELAY_SECONDS,
+        ttl_seconds: float = settings.THROTTLING_BUCKET_TTL_SECONDS,
+        max_buckets: int = settings.THROTTLING_MAX_BUCKETS,
+        exempt_user_ids: list[int] = settings.ADMIN_IDS,
+    ):
+
+        logger.debug("Initializing ThrottlingMiddleware")
+
+        if policy not in POLICIES:
+            raise ValueError(f"Unknown throttling policy {policy!r}, expected one of {POLICIES}")
+
+        self.policy = policy
+        self.max_delay_seconds = max_delay_seconds
+        self.exempt_user_ids = frozenset(exempt_user_ids)
+
+        # rate 0 - no limit
+        self.user_buckets = TokenBuckets(user_rate, user_burst, ttl_seconds, max_buckets) if user_rate > 0 else None
+        self.chat_buckets = TokenBuckets(chat_rate, chat_burst, ttl_seconds, max_buckets) if chat_rate > 0 else None
+
+        self.allowed = 0
+        self.throttled: Counter[str] = Counter()
+        self.throttled_users: Counter[int] = Counter()
+
+    def stats(self) -> dict:
+        return {
+            "policy": self.policy,
+            "allowed": self.allowed,
+            "throttled": dict(self.throttled),
+            "user_buckets": len(self.user_buckets) if self.user_buckets else 0,
+            "chat_buckets": len(self.chat_buckets) if self.chat_buckets else 0,
+            "top_users": self.throttled_users.most_common(5),
+        }
+
+    def check(self, user: User | None, chat: Chat | None) -> float:
+        """
+        Take tokens of the user and the chat (with the delay policy a token available within max delay is reserved).
+        Both buckets are checked before a token is taken from either: a rejected update takes no tokens.
+
+        Returns:
+            float: 0.0 if the update is within limits, otherwise seconds until it would be.
+        """
+
+        max_wait = self.max_delay_seconds if self.policy == POLICY_DELAY else 0.0
+        now = time.monotonic()
+
+        limits = []
+        if user is not None and self.user_buckets is not None:
+            limits.append((self.user_buckets, user.id))
+        if chat is not None and self.chat_buckets is not None:
+            limits.append((self.chat_buckets, chat.id))
+
+        wait = max((buckets.peek(key, now) for buckets, key in limits), default=0.0)
+        if wait > max_wait:
+            return wait
+
+        for buckets, key in limits:
+            buckets.acquire(key, max_wait, now)
+        return wait
+
+    async def __call__(
+        self,
+        handler: Callable[[Any, Dict[str, Any]], Awaitable[Any]],
+        event: Update,
+        data: Dict[str, Any],
+    ) -> Any:
+
+        user: User | None = data.get("event_from_user")
+        chat: Chat | None = data.get("event_chat")
+
+        if user is not None and user.id in self.exempt_user_ids:
+            return await handler(event, data)
+
+        wait = self.check(user, chat)
+        if not wait:
+            self.allowed += 1
+            return await handler(event, data)
+
+        if user is not None:
+            self.throttled_users[user.id] += 1
+
+        if self.policy == POLICY_RECORD:
+            self.throttled[POLICY_RECORD] += 1
+            return await handler(event, data)
+
+        if self.policy == POLICY_DELAY and wait <= self.max_delay_seconds:
+            self.throttled[POLICY_DELAY] += 1
+            await asyncio.sleep(wait)
+            return await handler(event, data)
+
+        self.throttled[POLICY_DROP] += 1
+        logger.debug(
+            f"Update {event.update_id} is throttled: user={user.id if user else None} chat={chat.id if chat else None}"
+        )
+        return None
+
+
+throttling_middleware = ThrottlingMiddleware()
+
+
+def main():
+    logger.info(START_MODULE_MESSAGE + str(__file__))
+    logger.info(MODULE_DESCRIPTION)
+    logger.info(str_object_is_created(throttling_middleware))
+
+
+if __name__ != "__main__":
+    main()
+
+
+if __name__ == "__main__":
+    main()
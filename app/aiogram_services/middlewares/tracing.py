@@ -0,0 +1,90 @@
+# app/aiogram_services/middlewares/tracing.py
+
+from __future__ import annotations
+
+from typing import Callable, Dict, Any, Awaitable
+from aiogram import BaseMiddleware
+from aiogram.types import Update
+
+from app.service.tracing.tracer import Tracer, tracer as default_tracer
+from app.service.logging.logger import (
+    logger,
+    START_MODULE_MESSAGE,
+    str_object_is_created,
+)
+
+
+MODULE_DESCRIPTION = ("This module provides tracing middlewares: the root span of an update (outer middleware, "
+                      "the sampling decision is made here) and a span of the handler (inner middleware).")
+
+
+class UpdateTracingMiddleware(BaseMiddleware):
+    """
+    Register before other outer middlewares of updates: their work is inside the root span.
+    """
+
+    def __init__(self, tracer: Tracer = default_tracer):
+
+        logger.debug("Initializing UpdateTracingMiddleware")
+
+        self.tracer = tracer
+
+    async def __call__(
+        self,
+        handler: Callable[[Any, Dict[str, Any]], Awaitable[Any]],
+        event: Update,
+        data: Dict[str, Any],
+    ) -> Any:
+
+        if not self.tracer.enabled:
+            return await handler(event, data)
+
+        chat = data.get("event_chat")
+        user = data.get("event_from_user")
+        bot = data.get("bot")
+
+        with self.tracer.trace(
+            "update",
+            update_id=event.update_id,
+            update_type=event.event_type,
+            chat_id=chat.id if chat is not None else None,
+            user_id=user.id if user is not None else None,
+            bot_id=bot.id if bot is not None else None,
+        ):
+            return await handler(event, data)
+
+
+class HandlerTracingMiddleware(BaseMiddleware):
+    def __init__(self, tracer: Tracer = default_tracer):
+
+        logger.debug("Initializing HandlerTracingMiddleware")
+
+        self.tracer = tracer
+
+    async def __call__(
+        self,
+        handler: Callable[[Any, Dict[str, Any]], Awaitable[Any]],
+        event: Any,
+        data: Dict[str, Any],
+    ) -> Any:
+
+        with self.tracer.span("handler") as span:
+            if span is not None:
+                handler_object = data.get("handler")
+                callback = handler_object.callback if handler_object is not None else handler
+                span.set_attribute("handler", getattr(callback, "__qualname__", repr(callback)))
+            return await handler(event, data)
+
+
+def main():
+    logger.info(START_MODULE_MESSAGE + str(__file__))
+    logger.info(MODULE_DESCRIPTION)
+    logger.info(str_object_is_created(UpdateTracingMiddleware()))
+
+
+if __name__ != "__main__":
+    main()
+
+
+if __name__ == "__main__":
+    main()
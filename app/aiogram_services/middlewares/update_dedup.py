@@ -0,0 +1,97 @@
+# app/aiogram_services/middlewares/update_dedup.py
+
+from __future__ import annotations
+
+from collections import OrderedDict
+from typing import Callable, Dict, Any, Awaitable
+from aiogram import BaseMiddleware, Bot
+from aiogram.types import Update
+
+from app.config.settings import settings
+from app.service.logging.logger import (
+    logger,
+    START_MODULE_MESSAGE,
+    str_object_is_created,
+)
+
+
+MODULE_DESCRIPTION = ("This module provides an outer middleware which drops already seen updates (webhook retries, "
+                      "replays after restart) before any handler or database work happens.")
+
+
+class UpdateDeduplicationMiddleware(BaseMiddleware):
+    """
+    Bounded filter of recently seen ``(bot_id, update_id)``: every bot has its own sequence of update_id.
+    Register it as ``dp.update.outer_middleware`` so duplicates never reach handlers.
+    """
+
+    def __init__(self, max_size: int = settings.UPDATE_DEDUP_CACHE_SIZE):
+
+        logger.debug("Initializing UpdateDeduplicationMiddleware")
+
+        self.max_size = max_size
+        self.dropped_updates = 0
+        self._seen: OrderedDict[tuple[int, int], None] = OrderedDict()
+
+    def is_duplicate(self, bot_id: int, update_id: int) -> bool:
+        """
+        Check update_id of the bot and remember it.
+
+        Parameters:
+            bot_id (int): The telegram id of the bot which received the update.
+            update_id (int): Telegram update id.
+
+        Returns:
+            bool: True if update_id was already seen by the bot, False otherwise.
+        """
+
+        key = (bot_id, update_id)
+        if key in self._seen:
+            return True
+
+        self._seen[key] = None
+        if len(self._seen) > self.max_size:
+            self._seen.popitem(last=False)
+
+        return False
+
+    def forget(self, bot_id: int, update_id: int) -> None:
+        """Forget update_id of the bot, so the update can be processed again (used when handler has failed)."""
+        self._seen.pop((bot_id, update_id), None)
+
+    async def __call__(
+        self,
+        handler: Callable[[Any, Dict[str, Any]], Awaitable[Any]],
+        event: Update,
+        data: Dict[str, Any],
+    ) -> Any:
+
+        bot: Bot = data["bot"]
+        update_id = event.update_id
+
+        if self.is_duplicate(bot.id, update_id):
+            self.dropped_updates += 1
+            logger.debug(f"Duplicate update dropped: bot_id={bot.id}, update_id={update_id}, "
+                         f"dropped total={self.dropped_updates}")
+            return None
+
+        try:
+            return await handler(event, data)
+        except Exception:
+            # let a retry of the failed update to be processed
+            self.forget(bot.id, update_id)
+            raise
+
+
+def main():
+    logger.info(START_MODULE_MESSAGE + str(__file__))
+    logger.info(MODULE_DESCRIPTION)
+    logger.info(str_object_is_created(UpdateDeduplicationMiddleware()))
+
+
+if __name__ != "__main__":
+    main()
+
+
+if __name__ == "__main__":
+    main()
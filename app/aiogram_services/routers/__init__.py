@@ -1,5 +1,9 @@
 from app.aiogram_services.routers.start import start_router
+from app.aiogram_services.routers.diagnostics import diagnostics_router
+from app.aiogram_services.routers.messages import messages_router
 
 __all__ = [
     "start_router",
+    "diagnostics_router",
+    "messages_router",
 ]
@@ -0,0 +1,101 @@
+# app/aiogram_services/routers/diagnostics.py
+
+from aiogram import Router, F
+from aiogram.filters import Command, CommandObject
+from aiogram.types import CallbackQuery, Message
+
+from app.config.settings import settings
+from app.aiogram_services.bot import session
+from app.aiogram_services.keyboards import DIAGNOSTICS_KEYBOARD, DIAGNOSTICS_REFRESH, diagnostics_callback, keyboards
+from app.aiogram_services.middlewares.bot_metrics import bot_metrics_middleware
+from app.aiogram_services.middlewares.throttling import throttling_middleware
+from app.service.chats.metadata import chat_metadata_cache
+from app.service.database.circuit_breaker import db_circuit_breaker
+from app.service.diagnostics.loop_monitor import loop_lag_monitor
+from app.service.diagnostics.slow_handlers import slow_handlers_recorder
+from app.service.diagnostics.task_profiler import build_profile_report
+from app.service.keywords.prefilter import keyword_prefilter
+from app.service.media.archiver import media_archiver
+from app.service.tracing.tracer import tracer
+from app.service.logging.logger import (
+    logger,
+    str_object_is_created,
+    START_MODULE_MESSAGE,
+)
+
+
+MODULE_DESCRIPTION = "This module stores router for aiogram - admin-only runtime diagnostics commands."
+
+
+TELEGRAM_MESSAGE_LIMIT = 4000
+MAX_PROFILE_SECONDS = 30.0
+
+
+diagnostics_router: Router = Router(name="Diagnostics")
+diagnostics_router.message.filter(F.from_user.id.in_(settings.ADMIN_IDS))
+diagnostics_router.callback_query.filter(F.from_user.id.in_(settings.ADMIN_IDS))
+
+
+def build_diag_text() -> str:
+    text = (
+        f"Loop lag: {loop_lag_monitor.stats()}\n"
+        f"Database circuit: {db_circuit_breaker.stats()}\n"
+        f"Throttling: {throttling_middleware.stats()}\n"
+        f"Tracing: {tracer.stats()}\n"
+        f"Chat cache: {chat_metadata_cache.stats()}\n"
+        f"Keyword prefilter: {keyword_prefilter.stats()}\n"
+        f"Media archive: {media_archiver.stats()}\n"
+        f"Keyboards: {keyboards.stats()}\n"
+        f"Bots:\n{bot_metrics_middleware.report()}\n"
+        f"Bot API:\n{session.report()}\n"
+        f"Slowest handlers:\n{slow_handlers_recorder.report()}"
+    )
+    return text[:TELEGRAM_MESSAGE_LIMIT]
+
+
+@diagnostics_router.message(Command("diag"))
+async def diag_command(message: Message):
+
+    logger.debug(f"Start function 'diag_command'. message: {message}")
+
+    await message.answer(build_diag_text(), reply_markup=keyboards.get(DIAGNOSTICS_KEYBOARD))
+
+
+@diagnostics_router.callback_query(diagnostics_callback.filter(action=DIAGNOSTICS_REFRESH))
+async def diag_refresh_callback(query: CallbackQuery):
+
+    logger.debug(f"Start function 'diag_refresh_callback'. query: {query}")
+
+    await query.answer()
+    if query.message is not None:
+        await query.message.edit_text(build_diag_text(), reply_markup=keyboards.get(DIAGNOSTICS_KEYBOARD))
+
+
+@diagnostics_router.message(Command("profile"))
+async def profile_command(message: Message, command: CommandObject):
+
+    logger.debug(f"Start function 'profile_command'. message: {message}")
+
+    try:
+        duration = min(float(command.args or 2.0), MAX_PROFILE_SECONDS)
+    except ValueError:
+        await message.answer("Usage: /profile [seconds]")
+        return
+
+    report = await build_profile_report(duration)
+    logger.info(f"Async tasks profile:\n{report}")
+    await message.answer(report[:TELEGRAM_MESSAGE_LIMIT])
+
+
+def main():
+    logger.info(START_MODULE_MESSAGE + str(__file__))
+    logger.info(MODULE_DESCRIPTION)
+    logger.info(str_object_is_created(diagnostics_router))
+
+
+if __name__ != "__main__":
+    main()
+
+
+if __name__ == "__main__":
+    main()
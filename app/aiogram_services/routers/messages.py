@@ -0,0 +1,65 @@
+# app/aiogram_services/routers/messages.py
+
+from aiogram import Router
+from aiogram.types import Message
+
+from app.config.settings import settings
+from app.service.keywords.prefilter import keyword_prefilter
+from app.service.media.archiver import media_archiver
+from app.service.notifications.digest import notification_digest
+from app.service.spool.persist import persist_message
+from app.service.logging.logger import (
+    logger,
+    str_object_is_created,
+    START_MODULE_MESSAGE,
+)
+
+
+MODULE_DESCRIPTION = ("This module stores router for aiogram - messages of chats are saved to the database, "
+                      "their media to the archive.")
+
+
+messages_router: Router = Router(name="Messages")
+
+
+@messages_router.message()
+async def save_message(message: Message):
+
+    logger.debug(f"Start function 'save_message'. message: {message.message_id} from chat {message.chat.id}")
+
+    stored_message = await persist_message(message)
+    # after the message row (or its spool record): media is archived only for messages that are kept,
+    # references are saved by (chat_id, message_id)
+    media_archiver.submit(message)
+
+    # candidate themes of the message in one pass over the text: the classifier is skipped without them
+    candidate_themes = keyword_prefilter.match(message.text or message.caption)
+    if not candidate_themes:
+        return
+
+    logger.debug(f"Message {message.message_id} from chat {message.chat.id} matches keywords of themes: "
+                 f"{candidate_themes}")
+
+    if stored_message is None:
+        # spooled: digests are built from stored messages (threads are resolved through the stored reply chain)
+        logger.debug(f"Message {message.message_id} from chat {message.chat.id} is spooled, not notified")
+        return
+
+    # admins get one digest per theme and window instead of a message per match
+    for theme_uuid in candidate_themes:
+        for recipient_id in settings.ADMIN_IDS:
+            await notification_digest.add(theme_uuid, recipient_id, stored_message)
+
+
+def main():
+    logger.info(START_MODULE_MESSAGE + str(__file__))
+    logger.info(MODULE_DESCRIPTION)
+    logger.info(str_object_is_created(messages_router))
+
+
+if __name__ != "__main__":
+    main()
+
+
+if __name__ == "__main__":
+    main()
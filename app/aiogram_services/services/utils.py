@@ -0,0 +1,58 @@
+# app/aiogram_services/services/utils.py
+
+from typing import Any
+
+from aiogram.client.default import Default
+
+from app.service.logging.logger import (
+    logger,
+    START_MODULE_MESSAGE,
+    str_object_is_created,
+)
+
+
+MODULE_DESCRIPTION = "This module stores helpers for aiogram objects."
+
+
+def strip_aiogram_defaults(value: Any) -> Any:
+    """
+    Remove aiogram ``Default`` placeholders (bot-level defaults such as parse_mode) from a dumped object,
+    and the objects left empty by the removal, e.g. ``link_preview_options`` without set options.
+    The function is pure: it runs in offload process workers as well.
+
+    Parameters:
+        value (Any): Result of ``model_dump`` of an aiogram object (dict, list or a scalar).
+
+    Returns:
+        Any: The value without defaults.
+    """
+
+    if isinstance(value, dict):
+        stripped = {}
+        for key, item in value.items():
+            if isinstance(item, Default):
+                continue
+            item = strip_aiogram_defaults(item)
+            if isinstance(item, dict) and not item:
+                continue
+            stripped[key] = item
+        return stripped
+
+    if isinstance(value, list):
+        return [strip_aiogram_defaults(item) for item in value if not isinstance(item, Default)]
+
+    return value
+
+
+def main():
+    logger.info(START_MODULE_MESSAGE + str(__file__))
+    logger.info(MODULE_DESCRIPTION)
+    logger.info(str_object_is_created(strip_aiogram_defaults))
+
+
+if __name__ != "__main__":
+    main()
+
+
+if __name__ == "__main__":
+    main()
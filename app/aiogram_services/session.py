@@ -0,0 +1,253 @@
+# app/aiogram_services/session.py
+
+from __future__ import annotations
+
+import asyncio
+import random
+import time
+from dataclasses import dataclass
+from typing import Any, TYPE_CHECKING
+
+from aiohttp import ClientSession, TraceConfig
+from aiohttp.hdrs import USER_AGENT
+from aiohttp.http import SERVER_SOFTWARE
+from aiogram.__meta__ import __version__ as aiogram_version
+from aiogram.client.session.aiohttp import AiohttpSession
+from aiogram.exceptions import TelegramNetworkError, TelegramRetryAfter, TelegramServerError
+
+from app.config.settings import settings
+from app.service.tracing.tracer import Span, tracer
+from app.service.logging.logger import (
+    logger,
+    START_MODULE_MESSAGE,
+    str_object_is_created,
+)
+
+if TYPE_CHECKING:
+    from aiogram import Bot
+    from aiogram.methods import TelegramMethod
+
+
+MODULE_DESCRIPTION = ("This module provides Bot API HTTP session with tuned connection pool (limits, keep-alive, "
+                      "DNS cache), per-method timeouts, retries with jitter and connection / latency counters.")
+
+
+def parse_method_timeouts(value: str) -> dict[str, float]:
+    """Parse "sendMessage=10,getChat=5" into {"sendMessage": 10.0, "getChat": 5.0}."""
+
+    timeouts = {}
+    for item in value.split(","):
+        if not item.strip():
+            continue
+        method, _, seconds = item.partition("=")
+        timeouts[method.strip()] = float(seconds)
+    return timeouts
+
+
+def is_read_only(api_method: str) -> bool:
+    """
+    Methods which can be repeated after a network / server error without side effects.
+    getUpdates is not retried here: polling has its own backoff.
+    """
+    return api_method.startswith("get") and api_method != "getUpdates"
+
+
+@dataclass(slots=True)
+class MethodStats:
+    calls: int = 0
+    errors: int = 0
+    retries: int = 0
+    total_seconds: float = 0.0
+    max_seconds: float = 0.0
+
+    @property
+    def average_ms(self) -> float:
+        return self.total_seconds * 1000 / self.calls if self.calls else 0.0
+
+    def record(self, elapsed: float) -> None:
+        self.calls += 1
+        self.total_seconds += elapsed
+        self.max_seconds = max(self.max_seconds, elapsed)
+
+
+@dataclass(slots=True)
+class ConnectionStats:
+    new: int = 0
+    reused: int = 0
+    dns_cache_hits: int = 0
+    dns_cache_misses: int = 0
+
+
+class TunedAiohttpSession(AiohttpSession):
+    """
+    Drop-in replacement of aiogram AiohttpSession.
+
+    Retries:
+    - flood control (429): any method, after ``retry_after`` if it is not longer than ``retry_max_delay``,
+    - network errors and 5xx: only read-only methods (see ``is_read_only``) - a message could be already sent.
+    """
+
+    def __init__(
+        self,
+        limit: int = settings.BOT_API_CONNECTIONS_LIMIT,
+        limit_per_host: int = settings.BOT_API_CONNECTIONS_PER_HOST,
+        keepalive_seconds: float = settings.BOT_API_KEEPALIVE_SECONDS,
+        dns_cache_seconds: int = settings.BOT_API_DNS_CACHE_SECONDS,
+        timeout: float = settings.BOT_API_TIMEOUT_SECONDS,
+        method_timeouts: dict[str, float] | None = None,
+        max_retries: int = settings.BOT_API_MAX_RETRIES,
+        retry_base_delay: float = settings.BOT_API_RETRY_BASE_DELAY_SECONDS,
+        retry_max_delay: float = settings.BOT_API_RETRY_MAX_DELAY_SECONDS,
+        **kwargs: Any,
+    ):
+        super().__init__(limit=limit, timeout=timeout, **kwargs)
+
+        logger.debug("Initializing TunedAiohttpSession")
+
+        self._connector_init.update(
+            limit_per_host=limit_per_host,
+            ttl_dns_cache=dns_cache_seconds,
+            use_dns_cache=dns_cache_seconds > 0,
+        )
+        if keepalive_seconds > 0:
+            self._connector_init["keepalive_timeout"] = keepalive_seconds
+        else:
+            # a new connection per request (benchmark baseline)
+            self._connector_init["force_close"] = True
+
+        if method_timeouts is None:
+            method_timeouts = parse_method_timeouts(settings.BOT_API_METHOD_TIMEOUTS)
+        self.method_timeouts = method_timeouts
+        self.max_retries = max_retries
+        self.retry_base_delay = retry_base_delay
+        self.retry_max_delay = retry_max_delay
+
+        self.connections = ConnectionStats()
+        self.methods: dict[str, MethodStats] = {}
+
+    def _trace_config(self) -> TraceConfig:
+        trace_config = TraceConfig()
+
+        async def on_connection_create_end(*_: Any) -> None:
+            self.connections.new += 1
+
+        async def on_connection_reuseconn(*_: Any) -> None:
+            self.connections.reused += 1
+
+        async def on_dns_cache_hit(*_: Any) -> None:
+            self.connections.dns_cache_hits += 1
+
+        async def on_dns_cache_miss(*_: Any) -> None:
+            self.connections.dns_cache_misses += 1
+
+        trace_config.on_connection_create_end.append(on_connection_create_end)
+        trace_config.on_connection_reuseconn.append(on_connection_reuseconn)
+        trace_config.on_dns_cache_hit.append(on_dns_cache_hit)
+        trace_config.on_dns_cache_miss.append(on_dns_cache_miss)
+        return trace_config
+
+    async def create_session(self) -> ClientSession:
+        # as AiohttpSession.create_session, plus trace config of connection counters
+        if self._should_reset_connector:
+            await self.close()
+
+        if self._session is None or self._session.closed:
+            self._session = ClientSession(
+                connector=self._connector_type(**self._connector_init),
+                headers={
+                    USER_AGENT: f"{SERVER_SOFTWARE} aiogram/{aiogram_version}",
+                },
+                trace_configs=[self._trace_config()],
+            )
+            self._should_reset_connector = False
+
+        return self._session
+
+    def backoff_delay(self, attempt: int) -> float:
+        """Exponential backoff with full jitter."""
+        return random.uniform(0, min(self.retry_max_delay, self.retry_base_delay * 2 ** attempt))
+
+    async def make_request(self, bot: Bot, method: TelegramMethod[Any], timeout: int | None = None) -> Any:
+        api_method = method.__api_method__
+        if timeout is None:
+            timeout = self.method_timeouts.get(api_method)
+
+        stats = self.methods.get(api_method)
+        if stats is None:
+            stats = self.methods[api_method] = MethodStats()
+
+        with tracer.span("bot_api", api_method=api_method) as span:
+            if span is not None:
+                chat_id = getattr(method, "chat_id", None)
+                if chat_id is not None:
+                    span.set_attribute("chat_id", chat_id)
+            return await self._make_request_with_retries(bot, method, timeout, stats, span)
+
+    async def _make_request_with_retries(
+        self,
+        bot: Bot,
+        method: TelegramMethod[Any],
+        timeout: int | None,
+        stats: MethodStats,
+        span: Span | None,
+    ) -> Any:
+        api_method = method.__api_method__
+        attempt = 0
+        while True:
+            started = time.perf_counter()
+            try:
+                result = await super().make_request(bot, method, timeout)
+            except TelegramRetryAfter as e:
+                error, delay = e, float(e.retry_after)
+            except (TelegramNetworkError, TelegramServerError) as e:
+                if not is_read_only(api_method):
+                    stats.errors += 1
+                    raise
+                error, delay = e, self.backoff_delay(attempt)
+            except Exception:
+                stats.errors += 1
+                raise
+            else:
+                stats.record(time.perf_counter() - started)
+                return result
+
+            stats.errors += 1
+            if attempt >= self.max_retries or delay > self.retry_max_delay:
+                raise error
+
+            attempt += 1
+            stats.retries += 1
+            if span is not None:
+                span.set_attribute("retries", attempt)
+            logger.warning(f"Bot API {api_method} failed ({type(error).__name__}), retry {attempt} in {delay:.2f}s")
+            await asyncio.sleep(delay)
+
+    def stats(self) -> dict:
+        return {
+            "new_connections": self.connections.new,
+            "reused_connections": self.connections.reused,
+            "dns_cache_hits": self.connections.dns_cache_hits,
+            "dns_cache_misses": self.connections.dns_cache_misses,
+        }
+
+    def report(self) -> str:
+        lines = [
+            f"{api_method}: calls={stats.calls} errors={stats.errors} retries={stats.retries} "
+            f"avg={stats.average_ms:.1f}ms max={stats.max_seconds * 1000:.1f}ms"
+            for api_method, stats in sorted(self.methods.items(), key=lambda item: -item[1].total_seconds)
+        ]
+        return "\n".join([str(self.stats()), *lines])
+
+
+def main():
+    logger.info(START_MODULE_MESSAGE + str(__file__))
+    logger.info(MODULE_DESCRIPTION)
+    logger.info(str_object_is_created(TunedAiohttpSession))
+
+
+if __name__ != "__main__":
+    main()
+
+
+if __name__ == "__main__":
+    main()
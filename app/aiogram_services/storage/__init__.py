@@ -0,0 +1,9 @@
+from app.aiogram_services.storage.cached import CachedStorage
+from app.aiogram_services.storage.sql_storage import SQLAlchemyStorage
+from app.aiogram_services.storage.redis_storage import RedisFsmStorage
+
+__all__ = [
+    "CachedStorage",
+    "SQLAlchemyStorage",
+    "RedisFsmStorage",
+]
@@ -0,0 +1,232 @@
+# app/aiogram_services/storage/cached.py
+
+from __future__ import annotations
+
+import asyncio
+import json
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from copy import copy
+from dataclasses import dataclass, field
+from typing import Any, Mapping
+
+from aiogram.exceptions import DataNotDictLikeError
+from aiogram.fsm.state import State
+from aiogram.fsm.storage.base import BaseStorage, StorageKey, StateType, DefaultKeyBuilder, KeyBuilder
+
+from app.config.settings import settings
+from app.service.logging.logger import (
+    logger,
+    START_MODULE_MESSAGE,
+    str_object_is_created,
+)
+
+
+MODULE_DESCRIPTION = ("This module stores base class of persistent aiogram FSM storages: per-process LRU cache "
+                      "(reads hit the backend only on a miss) and batched writes of changed keys.")
+
+
+@dataclass(slots=True)
+class FsmEntry:
+    state: str | None = None
+    data: dict[str, Any] = field(default_factory=dict)
+    # JSON of data, as it is written to the backend
+    data_json: str = "{}"
+    loaded_at: float = 0.0
+
+    @property
+    def is_empty(self) -> bool:
+        return self.state is None and not self.data
+
+
+def default_key_builder() -> KeyBuilder:
+    return DefaultKeyBuilder(with_bot_id=True, with_business_connection_id=True, with_destiny=True)
+
+
+class CachedStorage(BaseStorage, ABC):
+    """
+    Writes go to the cache immediately and to the backend in batches (every ``write_interval_seconds``,
+    several changes of one key are written once). Missing keys are cached too: most users have no state,
+    so the FSM middleware does not hit the backend for them on every update.
+
+    Cached entries expire after ``cache_ttl_seconds``, so changes made by another process are seen eventually.
+
+    Data is serialized to JSON in ``set_data`` (like aiogram RedisStorage does): a value which is not
+    JSON serializable fails the call of the handler, not the batch write.
+
+    ``close`` (called by the Dispatcher on shutdown, before in-flight handlers are drained) only writes
+    pending changes; the backend is closed by ``shutdown``, after the drain.
+    """
+
+    def __init__(
+        self,
+        cache_size: int = settings.FSM_CACHE_SIZE,
+        cache_ttl_seconds: float = settings.FSM_CACHE_TTL_SECONDS,
+        write_interval_seconds: float = settings.FSM_WRITE_INTERVAL_SECONDS,
+        key_builder: KeyBuilder | None = None,
+    ):
+
+        logger.debug(f"Initializing {type(self).__name__}")
+
+        self.cache_size = cache_size
+        self.cache_ttl_seconds = cache_ttl_seconds
+        self.write_interval_seconds = write_interval_seconds
+        self.key_builder = key_builder or default_key_builder()
+
+        self.hits = 0
+        self.misses = 0
+        self.batches = 0
+
+        self._cache: OrderedDict[StorageKey, FsmEntry] = OrderedDict()
+        # changed entries which are not written to the backend yet (the newest change of each key)
+        self._dirty: dict[StorageKey, FsmEntry] = {}
+        self._flush_lock = asyncio.Lock()
+        self._flush_task: asyncio.Task | None = None
+        self._closed = False
+
+    @abstractmethod
+    async def _load(self, key: StorageKey) -> FsmEntry:
+        """Read the entry from the backend (an empty entry if nothing is stored)."""
+
+    @abstractmethod
+    async def _write(self, entries: dict[StorageKey, FsmEntry]) -> None:
+        """Write entries to the backend (empty entries are deleted)."""
+
+    async def _close_backend(self) -> None:
+        pass
+
+    def start(self) -> None:
+        """Start background work of the storage (needs a running event loop)."""
+
+    def stats(self) -> dict:
+        return {
+            "cached": len(self._cache),
+            "dirty": len(self._dirty),
+            "hits": self.hits,
+            "misses": self.misses,
+            "batches": self.batches,
+        }
+
+    def _remember(self, key: StorageKey, entry: FsmEntry) -> None:
+        self._cache[key] = entry
+        self._cache.move_to_end(key)
+        while len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+
+    async def _entry(self, key: StorageKey) -> FsmEntry:
+        entry = self._dirty.get(key)
+        if entry is not None:
+            return entry
+
+        now = time.monotonic()
+        entry = self._cache.get(key)
+        if entry is not None and now - entry.loaded_at < self.cache_ttl_seconds:
+            self._cache.move_to_end(key)
+            self.hits += 1
+            return entry
+
+        self.misses += 1
+        entry = await self._load(key)
+        entry.loaded_at = now
+
+        # the key could be changed while it was loading: the change wins
+        dirty = self._dirty.get(key)
+        if dirty is not None:
+            return dirty
+
+        self._remember(key, entry)
+        return entry
+
+    def _change(self, key: StorageKey, entry: FsmEntry) -> None:
+        entry.loaded_at = time.monotonic()
+        self._remember(key, entry)
+        self._dirty[key] = entry
+
+        if self._flush_task is None or self._flush_task.done():
+            self._flush_task = asyncio.create_task(self._flush_soon(), name=f"{type(self).__name__}-flush")
+
+    async def _flush_soon(self) -> None:
+        # changes made meanwhile are written with the same batch
+        while self._dirty:
+            await asyncio.sleep(self.write_interval_seconds)
+            await self.flush()
+
+    async def flush(self) -> None:
+        """Write changed entries to the backend. On failure they are kept for the next batch."""
+
+        async with self._flush_lock:
+            dirty, self._dirty = self._dirty, {}
+            if not dirty:
+                return
+
+            try:
+                await self._write(dirty)
+            except Exception as e:
+                logger.error(f"Failed to write {len(dirty)} FSM entries: {e!r}")
+                for key, entry in dirty.items():
+                    self._dirty.setdefault(key, entry)
+                return
+
+            self.batches += 1
+
+    async def set_state(self, key: StorageKey, state: StateType = None) -> None:
+        entry = await self._entry(key)
+        state = state.state if isinstance(state, State) else state
+        self._change(key, FsmEntry(state, entry.data, entry.data_json))
+
+    async def get_state(self, key: StorageKey) -> str | None:
+        return (await self._entry(key)).state
+
+    async def set_data(self, key: StorageKey, data: Mapping[str, Any]) -> None:
+        if not isinstance(data, dict):
+            msg = f"Data must be a dict or dict-like object, got {type(data).__name__}"
+            raise DataNotDictLikeError(msg)
+
+        # raises TypeError / ValueError for values which are not JSON serializable
+        data_json = json.dumps(data)
+
+        entry = await self._entry(key)
+        self._change(key, FsmEntry(entry.state, data.copy(), data_json))
+
+    async def get_data(self, key: StorageKey) -> dict[str, Any]:
+        return (await self._entry(key)).data.copy()
+
+    async def get_value(self, storage_key: StorageKey, dict_key: str, default: Any | None = None) -> Any | None:
+        return copy((await self._entry(storage_key)).data.get(dict_key, default))
+
+    async def close(self) -> None:
+        """
+        Write pending changes. The backend stays open: the Dispatcher calls this on shutdown,
+        while in-flight handlers may still change states (see ``shutdown``).
+        """
+        await self.flush()
+
+    async def shutdown(self) -> None:
+        """Write pending changes and close the backend (after in-flight handlers are drained). Idempotent."""
+
+        if self._closed:
+            return
+
+        # not cancelled before: a batch which is being written would be lost
+        await self.flush()
+        if self._flush_task is not None:
+            self._flush_task.cancel()
+            self._flush_task = None
+
+        self._closed = True
+        await self._close_backend()
+
+
+def main():
+    logger.info(START_MODULE_MESSAGE + str(__file__))
+    logger.info(MODULE_DESCRIPTION)
+    logger.info(str_object_is_created(CachedStorage))
+
+
+if __name__ != "__main__":
+    main()
+
+
+if __name__ == "__main__":
+    main()
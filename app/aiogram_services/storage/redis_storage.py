@@ -0,0 +1,96 @@
+# app/aiogram_services/storage/redis_storage.py
+
+from __future__ import annotations
+
+import json
+from typing import Any
+
+from aiogram.fsm.storage.base import StorageKey
+
+from app.aiogram_services.storage.cached import CachedStorage, FsmEntry
+from app.config.settings import settings
+from app.service.logging.logger import (
+    logger,
+    START_MODULE_MESSAGE,
+    str_object_is_created,
+)
+
+
+MODULE_DESCRIPTION = ("This module stores aiogram FSM storage on any Redis protocol server, with a per-process "
+                      "cache and pipelined batched writes. Keys are compatible with aiogram RedisStorage.")
+
+
+def _decode(value: Any) -> str | None:
+    if isinstance(value, bytes):
+        return value.decode()
+    return value
+
+
+class RedisFsmStorage(CachedStorage):
+    """
+    ``redis`` is a ``redis.asyncio.Redis`` compatible client: a real server, or a local stand-in
+    for tests (e.g. ``fakeredis.aioredis.FakeRedis()``). State keys expire after ``state_ttl_seconds``.
+    """
+
+    def __init__(self, redis: Any, state_ttl_seconds: float = settings.FSM_STATE_TTL_SECONDS, **kwargs):
+        super().__init__(**kwargs)
+
+        self.redis = redis
+        self.state_ttl_seconds = state_ttl_seconds
+
+    @classmethod
+    def from_url(cls, url: str, **kwargs) -> RedisFsmStorage:
+        try:
+            from redis.asyncio import Redis
+        except ImportError as e:
+            raise ImportError("FSM_STORAGE=redis requires the 'redis' package (pip install redis)") from e
+
+        return cls(Redis.from_url(url), **kwargs)
+
+    async def _load(self, key: StorageKey) -> FsmEntry:
+        async with self.redis.pipeline(transaction=False) as pipe:
+            pipe.get(self.key_builder.build(key, "state"))
+            pipe.get(self.key_builder.build(key, "data"))
+            state, data = await pipe.execute()
+
+        data = _decode(data)
+        if not data:
+            return FsmEntry(_decode(state))
+        return FsmEntry(_decode(state), json.loads(data), data)
+
+    async def _write(self, entries: dict[StorageKey, FsmEntry]) -> None:
+        ttl = int(self.state_ttl_seconds) or None
+
+        async with self.redis.pipeline(transaction=False) as pipe:
+            for key, entry in entries.items():
+                state_key = self.key_builder.build(key, "state")
+                data_key = self.key_builder.build(key, "data")
+
+                if entry.state is None:
+                    pipe.delete(state_key)
+                else:
+                    pipe.set(state_key, entry.state, ex=ttl)
+
+                if entry.data:
+                    pipe.set(data_key, entry.data_json, ex=ttl)
+                else:
+                    pipe.delete(data_key)
+
+            await pipe.execute()
+
+    async def _close_backend(self) -> None:
+        await self.redis.aclose()
+
+
+def main():
+    logger.info(START_MODULE_MESSAGE + str(__file__))
+    logger.info(MODULE_DESCRIPTION)
+    logger.info(str_object_is_created(RedisFsmStorage))
+
+
+if __name__ != "__main__":
+    main()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+# app/aiogram_services/storage/sql_storage.py
+
+from __future__ import annotations
+
+import asyncio
+import json
+from datetime import datetime, timedelta
+from typing import Callable
+
+from aiogram.fsm.storage.base import StorageKey
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.aiogram_services.storage.cached import CachedStorage, FsmEntry
+from app.config.settings import settings
+from app.service.database.database import get_session
+from app.service.database.crud.fsm_records import get_fsm_record, save_fsm_records, delete_stale_fsm_records
+from app.service.logging.logger import (
+    logger,
+    START_MODULE_MESSAGE,
+    str_object_is_created,
+)
+
+
+MODULE_DESCRIPTION = ("This module stores aiogram FSM storage on the application database (fsm_record table) "
+                      "with a per-process cache, batched upserts and cleanup of abandoned states.")
+
+
+class SQLAlchemyStorage(CachedStorage):
+    def __init__(
+        self,
+        session_factory: Callable[[], AsyncSession] = get_session,
+        state_ttl_seconds: float = settings.FSM_STATE_TTL_SECONDS,
+        cleanup_interval_seconds: float = settings.FSM_CLEANUP_INTERVAL_SECONDS,
+        **kwargs,
+    ):
+        super().__init__(**kwargs)
+
+        self.session_factory = session_factory
+        self.state_ttl_seconds = state_ttl_seconds
+        self.cleanup_interval_seconds = cleanup_interval_seconds
+        self._cleanup_task: asyncio.Task | None = None
+
+    async def _load(self, key: StorageKey) -> FsmEntry:
+        async with self.session_factory() as db:
+            record = await get_fsm_record(db, self.key_builder.build(key))
+
+        if record is None:
+            return FsmEntry()
+
+        state, data = record
+        return FsmEntry(state, json.loads(data), data)
+
+    async def _write(self, entries: dict[StorageKey, FsmEntry]) -> None:
+        records = {
+            self.key_builder.build(key): None if entry.is_empty else (entry.state, entry.data_json)
+            for key, entry in entries.items()
+        }
+        async with self.session_factory() as db:
+            await save_fsm_records(db, records)
+            await db.commit()
+
+    async def cleanup(self) -> int:
+        """Delete states which were not updated for state_ttl_seconds."""
+
+        async with self.session_factory() as db:
+            deleted = await delete_stale_fsm_records(
+                db, datetime.utcnow() - timedelta(seconds=self.state_ttl_seconds)
+            )
+
+        if deleted:
+            logger.info(f"Abandoned FSM states deleted: {deleted}")
+        return deleted
+
+    async def _run_cleanup(self) -> None:
+        while True:
+            try:
+                await self.cleanup()
+            except Exception as e:
+                logger.error(f"Failed to delete abandoned FSM states: {e!r}")
+            await asyncio.sleep(self.cleanup_interval_seconds)
+
+    def start(self) -> None:
+        if self._cleanup_task is None and self.state_ttl_seconds > 0:
+            self._cleanup_task = asyncio.create_task(self._run_cleanup(), name="fsm-states-cleanup")
+
+    async def _close_backend(self) -> None:
+        if self._cleanup_task is not None:
+            self._cleanup_task.cancel()
+            self._cleanup_task = None
+
+
+def main():
+    logger.info(START_MODULE_MESSAGE + str(__file__))
+    logger.info(MODULE_DESCRIPTION)
+    logger.info(str_object_is_created(SQLAlchemyStorage))
+
+
+if __name__ != "__main__":
+    main()
+
+
+if __name__ == "__main__":
+    main()
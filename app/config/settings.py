@@ -31,6 +31,76 @@ class Settings(BaseSettings):
     # region telegram settings
 
     BOT_TOKEN:           str
+    # additional bots served by the same process (comma separated tokens)
+    BOT_TOKENS:          str = ""
+    # telegram ids of admins (comma separated), they can use diagnostics commands
+    ADMIN_USER_IDS:      str = ""
+    # size of in-memory window of recently seen update_id (drops retried/replayed updates)
+    UPDATE_DEDUP_CACHE_SIZE: int = 10_000
+
+    @computed_field
+    @property
+    def ALL_BOT_TOKENS(self) -> list[str]:
+        tokens = [self.BOT_TOKEN] + [token.strip() for token in self.BOT_TOKENS.split(",") if token.strip()]
+        return list(dict.fromkeys(tokens))
+
+    @computed_field
+    @property
+    def ADMIN_IDS(self) -> list[int]:
+        return [int(user_id) for user_id in self.ADMIN_USER_IDS.split(",") if user_id.strip()]
+
+    # Bot API HTTP session (see aiogram_services.session): connection pool, keep-alive, DNS cache
+    BOT_API_CONNECTIONS_LIMIT:           int   = 100
+    BOT_API_CONNECTIONS_PER_HOST:        int   = 50
+    # idle connections are kept open so long (0 - a new connection per request)
+    BOT_API_KEEPALIVE_SECONDS:           float = 60.0
+    BOT_API_DNS_CACHE_SECONDS:           int   = 3600
+    # request timeout; per method overrides, e.g. "sendMessage=10,getChat=5"
+    BOT_API_TIMEOUT_SECONDS:             float = 60.0
+    BOT_API_METHOD_TIMEOUTS:             str   = "sendMessage=15,getChat=10,getFile=15,answerCallbackQuery=5"
+    # retries of flood control (429) and, for read-only methods, network / server errors
+    BOT_API_MAX_RETRIES:                 int   = 3
+    BOT_API_RETRY_BASE_DELAY_SECONDS:    float = 0.5
+    BOT_API_RETRY_MAX_DELAY_SECONDS:     float = 10.0
+
+    # flood protection (see middlewares.throttling): token buckets per user and per chat,
+    # rate - updates per second (0 - no limit), burst - bucket size
+    # "record" only counts updates over the limits: limits are tuned on real traffic before "drop" / "delay"
+    THROTTLING_POLICY:               str   = "record"  # drop | record | delay
+    THROTTLING_USER_RATE:            float = 1.0
+    THROTTLING_USER_BURST:           float = 10.0
+    THROTTLING_CHAT_RATE:            float = 20.0
+    THROTTLING_CHAT_BURST:           float = 60.0
+    # "delay" policy: updates which would wait longer are dropped
+    THROTTLING_MAX_DELAY_SECONDS:    float = 2.0
+    # idle buckets are forgotten after this time; total number of buckets is bounded too
+    THROTTLING_BUCKET_TTL_SECONDS:   float = 600.0
+    THROTTLING_MAX_BUCKETS:          int   = 100_000
+
+    # FSM storage: "memory" (lost on restart), "sqlalchemy" (application database) or "redis"
+    FSM_STORAGE:                     str   = "sqlalchemy"
+    FSM_REDIS_URL:                   str   = "redis://localhost:6379/0"
+    # per-process cache of states (entries are re-read after the TTL: other processes may change them)
+    FSM_CACHE_SIZE:                  int   = 10_000
+    FSM_CACHE_TTL_SECONDS:           float = 60.0
+    # changed states are written in batches, at most this long after the change
+    FSM_WRITE_INTERVAL_SECONDS:      float = 0.2
+    # states not changed for so long are abandoned and deleted (0 - keep forever)
+    FSM_STATE_TTL_SECONDS:           float = 7 * 24 * 3600
+    FSM_CLEANUP_INTERVAL_SECONDS:    float = 3600.0
+
+    # chat metadata (title, username) by chat_id, filled from updates; getChat only on a miss.
+    # stale entries are served and refreshed in background; failed getChat is retried after the error TTL
+    CHAT_CACHE_SIZE:                 int   = 50_000
+    CHAT_CACHE_TTL_SECONDS:          float = 3600.0
+    CHAT_CACHE_ERROR_TTL_SECONDS:    float = 300.0
+
+    # notification digests: matches of one rule for one recipient are merged into one message,
+    # sent when the window since the first buffered match passes or when enough matches are buffered
+    NOTIFICATION_DIGEST_WINDOW_SECONDS:  float = 60.0
+    NOTIFICATION_DIGEST_MAX_ITEMS:       int   = 50
+    # a digest which failed to send is kept (with matches buffered meanwhile) and sent with the next tick
+    NOTIFICATION_DIGEST_MAX_ATTEMPTS:    int   = 3
 
     # endregion telegram settings
 
@@ -57,8 +127,141 @@ class Settings(BaseSettings):
             f"@{self.DB_HOST}:{self.DB_PORT}/{self.DB_NAME}"
         )
 
+    # read replicas: comma separated SQLAlchemy URLs (e.g. a second local sqlite file for testing)
+    DB_REPLICA_URLS:                     str   = ""
+    # replica with greater replication lag is not used for reads
+    DB_REPLICA_MAX_LAG_SECONDS:          float = 5.0
+    DB_REPLICA_CHECK_INTERVAL_SECONDS:   float = 5.0
+
+    @computed_field
+    @property
+    def REPLICA_DATABASE_URLS(self) -> list[str]:
+        return [url.strip() for url in self.DB_REPLICA_URLS.split(",") if url.strip()]
+
+    # count and fingerprint SQL statements per update / handler
+    DB_QUERY_STATS_ENABLED:              bool  = False
+    # the same statement repeated so many times in one update / handler is reported as N+1
+    DB_N_PLUS_ONE_THRESHOLD:             int   = 5
+    # warn if a handler executes more statements (0 - no budget)
+    DB_QUERY_BUDGET_PER_HANDLER:         int   = 0
+
+    # text search configuration for PostgreSQL to_tsvector (language independent by default)
+    FULL_TEXT_SEARCH_CONFIG:             str   = "simple"
+
+    # context window of a message (see crud.messages.fetch_context_messages)
+    LENGTH_OF_REPLY_CHAIN_LIMIT:             int = 10
+    TIME_OF_LAST_MESSAGES_LIMIT_MINUTES:     int = 30
+    LENGTH_OF_AUTHOR_CHAIN_LIMIT:            int = 5
+    LENGTH_OF_LAST_MESSAGES_CHAIN_LIMIT:     int = 10
+
+    # circuit breaker around database calls: after so many consecutive failures / timeouts calls fail fast
+    # for the reset timeout, then one probe call decides whether the database is back
+    DB_CIRCUIT_FAILURE_THRESHOLD:        int   = 5
+    DB_CIRCUIT_RESET_TIMEOUT_SECONDS:    float = 15.0
+    DB_CALL_TIMEOUT_SECONDS:             float = 3.0
+
+    # local journal of messages which could not be written while the database was unavailable
+    SPOOL_DIR:                           str   = "spool"
+    # appended records are written and fsynced together, at most this long after the first of them
+    SPOOL_FSYNC_INTERVAL_SECONDS:        float = 0.05
+    SPOOL_SEGMENT_MAX_BYTES:             int   = 16 * 1024 * 1024
+    SPOOL_REPLAY_INTERVAL_SECONDS:       float = 5.0
+    SPOOL_REPLAY_BATCH_SIZE:             int   = 500
+
+    @computed_field
+    @property
+    def SPOOL_PATH(self) -> str:
+        return str((ROOT_DIR / self.SPOOL_DIR).resolve())
+
+    # archive of message media (see service.media): files are streamed to MEDIA_DIR, stored once per content hash
+    MEDIA_ARCHIVE_ENABLED:               bool  = False
+    MEDIA_DIR:                           str   = "media"
+    # comma separated: photo, document, video, animation, audio, voice, video_note, sticker
+    MEDIA_ARCHIVE_KINDS:                 str   = "photo,document,video,animation,audio,voice,video_note,sticker"
+    # parallel downloads and total download rate of them (0 - no limit)
+    MEDIA_ARCHIVE_CONCURRENCY:           int   = 4
+    MEDIA_ARCHIVE_BANDWIDTH_BYTES_PER_SECOND: int = 5 * 1024 * 1024
+    MEDIA_ARCHIVE_CHUNK_BYTES:           int   = 64 * 1024
+    # Bot API does not serve files over 20 MB
+    MEDIA_ARCHIVE_MAX_FILE_BYTES:        int   = 20 * 1024 * 1024
+    MEDIA_ARCHIVE_TIMEOUT_SECONDS:       int   = 300
+    # messages waiting for download; media of messages over the limit is not archived
+    MEDIA_ARCHIVE_QUEUE_SIZE:            int   = 1000
+
+    @computed_field
+    @property
+    def MEDIA_PATH(self) -> str:
+        return str((ROOT_DIR / self.MEDIA_DIR).resolve())
+
     # endregion database settings
 
+    # region themes settings
+
+    # a new theme whose name+description+keywords is at least so similar (cosine) to an existing theme
+    # is treated as that theme
+    THEME_SIMILARITY_THRESHOLD:          float = 0.8
+    # dimension of hashing embeddings of themes
+    THEME_EMBEDDING_DIM:                 int   = 1024
+
+    # endregion themes settings
+
+    # region runtime settings
+
+    # event loop implementation: "asyncio" or "uvloop"
+    EVENT_LOOP:                          str   = "asyncio"
+    # GC thresholds (generation 0, 1, 2); a bigger gen 0 threshold means less frequent collections
+    GC_THRESHOLD_GEN0:                   int   = 50_000
+    GC_THRESHOLD_GEN1:                   int   = 20
+    GC_THRESHOLD_GEN2:                   int   = 100
+    # move objects created during startup to the permanent generation (gc.freeze)
+    GC_FREEZE_AFTER_WARMUP:              bool  = True
+
+    # deadline for in-flight handlers on shutdown
+    SHUTDOWN_DRAIN_TIMEOUT_SECONDS: float = 10.0
+    # deadline for flushing buffered work (pending DB writes and so on) on shutdown
+    SHUTDOWN_FLUSH_TIMEOUT_SECONDS: float = 10.0
+
+    # interval of flushing in-memory message statistics to rollup tables
+    STATS_ROLLUP_FLUSH_INTERVAL_SECONDS: float = 30.0
+
+    # event loop lag monitoring
+    LOOP_LAG_CHECK_INTERVAL_SECONDS:     float = 0.5
+    LOOP_LAG_WARNING_SECONDS:            float = 0.1
+    # if the loop does not respond so long, stack of the blocking code is logged
+    LOOP_STALL_STACK_SECONDS:            float = 1.0
+    # number of the slowest handlers kept for diagnostics
+    SLOW_HANDLERS_BUFFER_SIZE:           int   = 50
+    # sampling interval of the async tasks profiler
+    PROFILE_SAMPLE_INTERVAL_SECONDS:     float = 0.01
+
+    # CPU-bound steps off the event loop (see service.offload): process workers (0 - number of CPUs - 1),
+    # thread workers; calls made within the window are submitted to the pool as one batch
+    OFFLOAD_PROCESS_WORKERS:             int   = 0
+    OFFLOAD_THREAD_WORKERS:              int   = 4
+    OFFLOAD_BATCH_SIZE:                  int   = 32
+    OFFLOAD_BATCH_WINDOW_SECONDS:        float = 0.002
+    # where JSON of a stored message is built: "inline", "thread" or "process";
+    # messages with shorter text are serialized inline (cheaper than a round trip to the pool).
+    # Telegram caps text at 4096 characters (captions at 1024): at that size JSON takes ~0.1ms,
+    # less than the IPC of the process pool, see benchmarks/offload_loop_lag.py
+    OFFLOAD_MESSAGE_JSON:                str   = "thread"
+    OFFLOAD_MESSAGE_JSON_MIN_TEXT_LENGTH: int  = 2000
+
+    # tracing of updates (see service.tracing): share of updates traced, decided when an update arrives
+    # (0 - off, 1 - every update); exporter "file" (JSON lines) or "stdout"
+    TRACING_SAMPLE_RATE:                 float = 0.0
+    TRACING_EXPORTER:                    str   = "file"
+    TRACING_FILE:                        str   = "traces/traces.jsonl"
+    # spans over the limit (e.g. SQL statements of a long loop) are counted but not exported
+    TRACING_MAX_SPANS_PER_TRACE:         int   = 1000
+
+    @computed_field
+    @property
+    def TRACING_FILE_PATH(self) -> str:
+        return str((ROOT_DIR / self.TRACING_FILE).resolve())
+
+    # endregion runtime settings
+
 settings = Settings()
 
 
@@ -0,0 +1,168 @@
+# app/main.py
+
+import time
+
+# measured before heavy imports: startup time includes them
+PROCESS_STARTED_AT = time.perf_counter()
+
+import asyncio
+import gc
+import signal
+
+from app.config.settings import settings
+from app.service.logging.logger import (
+    logger,
+    START_MODULE_MESSAGE,
+)
+from app.service.database.database import init_db, get_session
+from app.service.database.crud.message_themes import load_keyword_prefilter, load_theme_similarity_index
+from app.service.stats.rollups import message_stats_aggregator
+from app.service.notifications.digest import notification_digest
+from app.service.spool.replayer import spool_replayer
+from app.service.media.archiver import media_archiver
+from app.aiogram_services.bot import bots
+from app.aiogram_services.main import dp, dp_task
+from app.aiogram_services.keyboards import keyboards
+from app.aiogram_services.middlewares.first_update import FirstUpdateMiddleware
+
+
+MODULE_DESCRIPTION = ("This is production entry point: database initialization, runtime tuning "
+                      "(event loop, GC) and polling. Usage: python -m app.main")
+
+
+def tune_gc() -> None:
+    """
+    Raise GC thresholds: the bot allocates many short-lived objects per update,
+    default thresholds make generation 0 collections run too often.
+    """
+
+    gc.set_threshold(settings.GC_THRESHOLD_GEN0, settings.GC_THRESHOLD_GEN1, settings.GC_THRESHOLD_GEN2)
+    logger.info(f"GC thresholds: {gc.get_threshold()}")
+
+
+def freeze_gc() -> None:
+    """
+    Move everything created during warm-up (modules, settings, engine, routers...) to the permanent
+    generation, so long-lived objects are no longer rescanned by the collector.
+    """
+
+    if not settings.GC_FREEZE_AFTER_WARMUP:
+        return
+
+    gc.collect()
+    gc.freeze()
+    logger.info(f"GC frozen after warm-up: {gc.get_freeze_count()} objects")
+
+
+# set by the dispatcher startup hook: from then on a stop signal stops polling
+polling_started = asyncio.Event()
+
+
+@dp.startup()
+async def mark_polling_started() -> None:
+    polling_started.set()
+
+
+def install_stop_signal_handlers(main_task: asyncio.Task) -> None:
+    """
+    SIGINT / SIGTERM (docker stop) stop polling; dp_task then drains handlers and persists the offset.
+    A signal received before polling has started (during warm-up) cancels the main task.
+    """
+
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        try:
+            loop.add_signal_handler(sig, lambda s=sig: asyncio.ensure_future(stop(s, main_task)))
+        except NotImplementedError:
+            # Windows: KeyboardInterrupt is raised instead
+            logger.warning(f"Signal handler for {sig} is not supported on this platform")
+
+
+async def stop(sig: signal.Signals, main_task: asyncio.Task) -> None:
+    if not polling_started.is_set():
+        logger.info(f"Received {sig.name} before polling has started, stopping")
+        main_task.cancel()
+        return
+
+    logger.info(f"Received {sig.name}, stopping polling")
+    try:
+        await dp.stop_polling()
+    except RuntimeError:
+        # polling is already stopped: graceful shutdown is in progress
+        logger.info(f"Polling is already stopped, {sig.name} is ignored")
+
+
+async def warm_up() -> None:
+    """
+    Initialize everything which is needed before the first update.
+    """
+
+    await init_db()
+
+    # keywords of enabled themes and embeddings of all themes; updated incrementally when themes change
+    async with get_session() as db:
+        await load_keyword_prefilter(db)
+        await load_theme_similarity_index(db)
+
+    for bot in bots:
+        bot_user = await bot.get_me()
+        logger.info(f"Bot @{bot_user.username} (id={bot_user.id}) is ready")
+
+    # static keyboards are built once, before the GC freeze
+    keyboards.build_all()
+
+    dp.update.outer_middleware(FirstUpdateMiddleware(started_at=PROCESS_STARTED_AT))
+    message_stats_aggregator.start()
+    notification_digest.start()
+    # messages spooled while the database was unavailable (also by the previous run)
+    spool_replayer.start()
+    media_archiver.start()
+
+
+async def run() -> None:
+    tune_gc()
+    install_stop_signal_handlers(asyncio.current_task())
+
+    await warm_up()
+    freeze_gc()
+
+    logger.info(f"Startup took {time.perf_counter() - PROCESS_STARTED_AT:.3f}s")
+
+    await dp_task(handle_signals=False)
+
+
+def new_event_loop_factory():
+    """
+    Return event loop factory according to settings.EVENT_LOOP (None - default asyncio loop).
+    """
+
+    if settings.EVENT_LOOP == "uvloop":
+        try:
+            import uvloop
+        except ImportError:
+            logger.warning("uvloop is not installed, default asyncio event loop is used")
+            return None
+        return uvloop.new_event_loop
+
+    if settings.EVENT_LOOP != "asyncio":
+        logger.warning(f"Unknown EVENT_LOOP={settings.EVENT_LOOP}, default asyncio event loop is used")
+
+    return None
+
+
+def main():
+    logger.info(START_MODULE_MESSAGE + str(__file__))
+    logger.info(MODULE_DESCRIPTION)
+
+    loop_factory = new_event_loop_factory()
+    logger.info(f"Event loop: {settings.EVENT_LOOP if loop_factory else 'asyncio'}")
+
+    with asyncio.Runner(loop_factory=loop_factory) as runner:
+        try:
+            runner.run(run())
+        except asyncio.CancelledError:
+            logger.info("Stopped during warm-up")
+
+
+if __name__ == "__main__":
+    main()
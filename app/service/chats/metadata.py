@@ -0,0 +1,240 @@
+# app/service/chats/metadata.py
+
+import asyncio
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable
+
+from aiogram.enums import ChatType
+
+from app.aiogram_services.bot import bot
+from app.config.settings import settings
+from app.service.logging.logger import (
+    logger,
+    START_MODULE_MESSAGE,
+    str_object_is_created,
+)
+
+
+MODULE_DESCRIPTION = ("This module caches chat metadata (type, title, username) by chat_id: filled from incoming "
+                      "updates, getChat only on a miss (concurrent misses of a chat share one call). "
+                      "Builds message links without the network.")
+
+
+# private supergroup / channel ids are -100<id>; links use <id>
+CHANNEL_ID_OFFSET = 1_000_000_000_000
+
+
+@dataclass(slots=True, frozen=True)
+class ChatInfo:
+    id: int
+    type: str
+    title: str | None = None
+    username: str | None = None
+    first_name: str | None = None
+
+    @classmethod
+    def from_chat(cls, chat: Any) -> "ChatInfo":
+        """From aiogram Chat (of an update) or ChatFullInfo (of getChat)."""
+        return cls(chat.id, chat.type, chat.title, chat.username, chat.first_name)
+
+    @property
+    def display_name(self) -> str:
+        if self.title:
+            return self.title
+        if self.username:
+            return f"@{self.username}"
+        return self.first_name or str(self.id)
+
+
+def build_message_link(chat: ChatInfo, message_id: int, thread_id: int | None = None) -> str | None:
+    """
+    Link to the message: t.me/<username>/<id> for public chats, t.me/c/<id>/<id> for private supergroups
+    and channels, None for private chats and basic groups (they have no message links).
+
+    Parameters:
+        chat (ChatInfo): The chat of the message.
+        message_id (int): Id of the message.
+        thread_id (int | None): Forum topic of the message.
+
+    Returns:
+        str | None: The link.
+    """
+
+    if chat.type not in (ChatType.SUPERGROUP, ChatType.CHANNEL):
+        return None
+
+    thread = f"{thread_id}/" if thread_id else ""
+    if chat.username:
+        return f"https://t.me/{chat.username}/{thread}{message_id}"
+    return f"https://t.me/c/{-chat.id - CHANNEL_ID_OFFSET}/{thread}{message_id}"
+
+
+ChatFetcher = Callable[[int], Awaitable[Any]]
+
+
+async def fetch_chat_with_bot(chat_id: int) -> Any:
+    return await bot.get_chat(chat_id)
+
+
+class ChatMetadataCache:
+    """
+    Entries are kept in least recently used order, bounded by ``max_size``.
+    Entries older than ``ttl_seconds`` are still returned by ``resolve`` (stale), and refreshed in background,
+    so callers never wait on getChat for a known chat. Failed getChat (e.g. the bot left the chat) is
+    remembered for ``error_ttl_seconds``.
+    """
+
+    def __init__(
+        self,
+        fetcher: ChatFetcher = fetch_chat_with_bot,
+        max_size: int = settings.CHAT_CACHE_SIZE,
+        ttl_seconds: float = settings.CHAT_CACHE_TTL_SECONDS,
+        error_ttl_seconds: float = settings.CHAT_CACHE_ERROR_TTL_SECONDS,
+    ):
+
+        logger.debug("Initializing ChatMetadataCache")
+
+        self.fetcher = fetcher
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self.error_ttl_seconds = error_ttl_seconds
+
+        self.hits = 0
+        self.misses = 0
+        self.fetches = 0
+        self.fetch_errors = 0
+
+        # chat_id -> (info or None for a failed fetch, updated_at)
+        self._entries: OrderedDict[int, tuple[ChatInfo | None, float]] = OrderedDict()
+        self._fetching: dict[int, asyncio.Task] = {}
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _put(self, chat_id: int, info: ChatInfo | None, now: float | None = None) -> None:
+        self._entries[chat_id] = (info, time.monotonic() if now is None else now)
+        self._entries.move_to_end(chat_id)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    def update_from_chat(self, chat: Any) -> None:
+        """
+        Remember the chat of an incoming update (aiogram Chat).
+        """
+
+        info = ChatInfo.from_chat(chat)
+        entry = self._entries.get(chat.id)
+        if entry is not None and entry[0] == info:
+            # unchanged: only refresh the timestamp and the LRU position
+            self._entries[chat.id] = (info, time.monotonic())
+            self._entries.move_to_end(chat.id)
+            return
+        self._put(chat.id, info)
+
+    def _is_fresh(self, entry: tuple[ChatInfo | None, float]) -> bool:
+        info, updated_at = entry
+        return time.monotonic() - updated_at < (self.ttl_seconds if info is not None else self.error_ttl_seconds)
+
+    def get(self, chat_id: int) -> ChatInfo | None:
+        """Cached metadata (possibly stale), never calls the API."""
+        entry = self._entries.get(chat_id)
+        return entry[0] if entry is not None else None
+
+    async def resolve(self, chat_id: int) -> ChatInfo | None:
+        """
+        Metadata of the chat: cached (a stale entry is returned at once and refreshed in background),
+        otherwise fetched with getChat.
+
+        Parameters:
+            chat_id (int): Id of the chat.
+
+        Returns:
+            ChatInfo | None: The metadata, None if getChat failed.
+        """
+
+        entry = self._entries.get(chat_id)
+        if entry is not None:
+            info = entry[0]
+            self._entries.move_to_end(chat_id)
+            if not self._is_fresh(entry):
+                if info is None:
+                    self.misses += 1
+                    return await self._fetch(chat_id)
+                self._start_fetch(chat_id)
+            self.hits += 1
+            return info
+
+        self.misses += 1
+        return await self._fetch(chat_id)
+
+    def prefetch(self, chat_id: int) -> None:
+        """Fetch the chat in background if it is not cached or stale (e.g. before a digest is rendered)."""
+
+        entry = self._entries.get(chat_id)
+        if entry is not None and self._is_fresh(entry):
+            return
+        self._start_fetch(chat_id)
+
+    def _start_fetch(self, chat_id: int) -> asyncio.Task:
+        # concurrent misses of the chat wait for the same getChat call
+        task = self._fetching.get(chat_id)
+        if task is None:
+            task = self._fetching[chat_id] = asyncio.create_task(self._fetch_once(chat_id),
+                                                                 name=f"chat-metadata-{chat_id}")
+        return task
+
+    def _fetch(self, chat_id: int) -> Awaitable[ChatInfo | None]:
+        # shielded: a cancelled caller does not cancel the call other callers wait for
+        return asyncio.shield(self._start_fetch(chat_id))
+
+    async def _fetch_once(self, chat_id: int) -> ChatInfo | None:
+        self.fetches += 1
+        try:
+            info = ChatInfo.from_chat(await self.fetcher(chat_id))
+        except Exception as e:
+            self.fetch_errors += 1
+            logger.warning(f"Failed to get chat {chat_id}: {e!r}")
+            info = None
+        finally:
+            self._fetching.pop(chat_id, None)
+
+        self._put(chat_id, info)
+        return info
+
+    def title(self, chat_id: int) -> str:
+        """Display name of the chat if it is cached, otherwise the id (never calls the API)."""
+        info = self.get(chat_id)
+        return info.display_name if info is not None else str(chat_id)
+
+    def message_link(self, chat_id: int, message_id: int, thread_id: int | None = None) -> str | None:
+        """Link to the message if the chat is cached (never calls the API)."""
+        info = self.get(chat_id)
+        return build_message_link(info, message_id, thread_id) if info is not None else None
+
+    def stats(self) -> dict:
+        return {
+            "size": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "fetches": self.fetches,
+            "fetch_errors": self.fetch_errors,
+        }
+
+
+chat_metadata_cache = ChatMetadataCache()
+
+
+def main():
+    logger.info(START_MODULE_MESSAGE + str(__file__))
+    logger.info(MODULE_DESCRIPTION)
+    logger.info(str_object_is_created(chat_metadata_cache))
+
+
+if __name__ != "__main__":
+    main()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,155 @@
+# app/service/database/circuit_breaker.py
+
+import asyncio
+import time
+from typing import Any, Awaitable, Callable
+
+from sqlalchemy import exc as sa_exc
+
+from app.config.settings import settings
+from app.service.logging.logger import (
+    logger,
+    START_MODULE_MESSAGE,
+    str_object_is_created,
+)
+
+
+MODULE_DESCRIPTION = ("This module provides a circuit breaker for database calls: after repeated failures or "
+                      "timeouts the circuit opens and calls fail fast until a probe call succeeds.")
+
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+# errors which mean "the database is slow or unavailable" (not a bug in the statement)
+DATABASE_FAILURES: tuple[type[BaseException], ...] = (
+    asyncio.TimeoutError,
+    OSError,
+    sa_exc.OperationalError,
+    sa_exc.InterfaceError,
+    sa_exc.TimeoutError,
+)
+
+
+class CircuitOpenError(Exception):
+    """The call is rejected without trying: the circuit is open."""
+
+
+class CircuitBreaker:
+    """
+    closed -> (failure_threshold consecutive failures) -> open -> (reset timeout) -> half open:
+    one probe call is let through; success closes the circuit, failure opens it again.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        failure_threshold: int = settings.DB_CIRCUIT_FAILURE_THRESHOLD,
+        reset_timeout_seconds: float = settings.DB_CIRCUIT_RESET_TIMEOUT_SECONDS,
+        call_timeout_seconds: float = settings.DB_CALL_TIMEOUT_SECONDS,
+        failures: tuple[type[BaseException], ...] = DATABASE_FAILURES,
+    ):
+
+        logger.debug(f"Initializing CircuitBreaker {name}")
+
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout_seconds = reset_timeout_seconds
+        self.call_timeout_seconds = call_timeout_seconds
+        self.failures = failures
+
+        self.consecutive_failures = 0
+        self.trips = 0
+        self.rejected = 0
+
+        self._state = CLOSED
+        self._opened_at = 0.0
+        self._probe_in_flight = False
+
+    @property
+    def state(self) -> str:
+        if self._state == OPEN and time.monotonic() - self._opened_at >= self.reset_timeout_seconds:
+            return HALF_OPEN
+        return self._state
+
+    @property
+    def is_open(self) -> bool:
+        """True while calls are rejected (a probe is not due yet or is already running)."""
+        state = self.state
+        return state == OPEN or (state == HALF_OPEN and self._probe_in_flight)
+
+    def stats(self) -> dict:
+        return {
+            "state": self.state,
+            "consecutive_failures": self.consecutive_failures,
+            "trips": self.trips,
+            "rejected": self.rejected,
+        }
+
+    def record_success(self) -> None:
+        if self._state != CLOSED:
+            logger.info(f"Circuit '{self.name}' is closed")
+        self._state = CLOSED
+        self.consecutive_failures = 0
+
+    def record_failure(self) -> None:
+        self.consecutive_failures += 1
+
+        if self._state == CLOSED and self.consecutive_failures < self.failure_threshold:
+            return
+
+        if self._state == CLOSED:
+            self.trips += 1
+            logger.error(f"Circuit '{self.name}' is open after {self.consecutive_failures} failures")
+        self._state = OPEN
+        self._opened_at = time.monotonic()
+
+    async def call(self, func: Callable[..., Awaitable[Any]], *args: Any, **kwargs: Any) -> Any:
+        """
+        Call ``func(*args, **kwargs)`` through the breaker with the call timeout.
+
+        Raises:
+            CircuitOpenError: The circuit is open, the call was not tried.
+            Exception: The error of the call (it is counted if it is one of ``failures``).
+        """
+
+        state = self.state
+        if state == OPEN or (state == HALF_OPEN and self._probe_in_flight):
+            self.rejected += 1
+            raise CircuitOpenError(f"Circuit '{self.name}' is open")
+
+        probe = state == HALF_OPEN
+        if probe:
+            self._probe_in_flight = True
+
+        try:
+            result = await asyncio.wait_for(func(*args, **kwargs), timeout=self.call_timeout_seconds)
+        except self.failures as e:
+            logger.warning(f"Circuit '{self.name}': call failed: {e!r}")
+            self.record_failure()
+            raise
+        finally:
+            if probe:
+                self._probe_in_flight = False
+
+        self.record_success()
+        return result
+
+
+db_circuit_breaker = CircuitBreaker("database")
+
+
+def main():
+    logger.info(START_MODULE_MESSAGE + str(__file__))
+    logger.info(MODULE_DESCRIPTION)
+    logger.info(str_object_is_created(db_circuit_breaker))
+
+
+if __name__ != "__main__":
+    main()
+
+
+if __name__ == "__main__":
+    main()
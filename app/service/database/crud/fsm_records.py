@@ -0,0 +1,107 @@
+# app/service/database/crud/fsm_records.py
+
+from app.service.logging.logger import (
+    logger,
+    START_MODULE_MESSAGE,
+    str_object_is_created,
+)
+from app.service.database.models.fsm_record import FsmRecord
+from app.service.database.dialects import get_insert
+
+from sqlalchemy import select, delete
+from sqlalchemy.ext.asyncio import AsyncSession
+from datetime import datetime
+
+
+MODULE_DESCRIPTION = "This module stores crud functions for persisted aiogram FSM states."
+
+
+UPSERT_BATCH_SIZE = 1_000
+
+
+async def get_fsm_record(db: AsyncSession, key: str) -> tuple[str | None, str] | None:
+    """
+    Get state and JSON data of the storage key.
+
+    Parameters:
+        db (AsyncSession): The database session.
+        key (str): The storage key.
+
+    Returns:
+        tuple[str | None, str] | None: State and JSON data, or None if nothing is stored.
+    """
+
+    stmt = select(FsmRecord.state, FsmRecord.data).where(FsmRecord.key == key)
+    result = await db.execute(stmt)
+    row = result.first()
+    return (row.state, row.data) if row is not None else None
+
+
+async def save_fsm_records(db: AsyncSession, records: dict[str, tuple[str | None, str] | None]) -> None:
+    """
+    Upsert (or delete - value None) FSM records in batches. The caller commits.
+
+    Parameters:
+        db (AsyncSession): The database session.
+        records (dict[str, tuple[str | None, str] | None]): State and JSON data by storage key.
+    """
+
+    now = datetime.utcnow()
+
+    deleted = [key for key, record in records.items() if record is None]
+    for start in range(0, len(deleted), UPSERT_BATCH_SIZE):
+        await db.execute(delete(FsmRecord).where(FsmRecord.key.in_(deleted[start:start + UPSERT_BATCH_SIZE])))
+
+    rows = [
+        {"key": key, "state": record[0], "data": record[1], "updated_at": now}
+        for key, record in records.items()
+        if record is not None
+    ]
+    if not rows:
+        return
+
+    insert = get_insert(db)
+    stmt = insert(FsmRecord)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=["key"],
+        set_={
+            "state": stmt.excluded.state,
+            "data": stmt.excluded.data,
+            "updated_at": stmt.excluded.updated_at,
+        },
+    )
+    for start in range(0, len(rows), UPSERT_BATCH_SIZE):
+        await db.execute(stmt, rows[start:start + UPSERT_BATCH_SIZE])
+
+    logger.debug(f"FSM records saved: {len(rows)} upserted, {len(deleted)} deleted")
+
+
+async def delete_stale_fsm_records(db: AsyncSession, updated_before: datetime) -> int:
+    """
+    Delete FSM records which were not updated since the moment (abandoned dialogs).
+
+    Parameters:
+        db (AsyncSession): The database session.
+        updated_before (datetime): Records updated before it are deleted.
+
+    Returns:
+        int: Number of deleted records.
+    """
+
+    result = await db.execute(delete(FsmRecord).where(FsmRecord.updated_at < updated_before))
+    await db.commit()
+    return result.rowcount
+
+
+def main():
+    logger.info(START_MODULE_MESSAGE + str(__file__))
+    logger.info(MODULE_DESCRIPTION)
+    logger.info(str_object_is_created(save_fsm_records))
+
+
+if __name__ != "__main__":
+    main()
+
+
+if __name__ == "__main__":
+    main()
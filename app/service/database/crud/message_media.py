@@ -0,0 +1,70 @@
+# app/service/database/crud/message_media.py
+
+from app.service.logging.logger import (
+    logger,
+    START_MODULE_MESSAGE,
+    str_object_is_created,
+)
+from app.service.database.models.message_media import MessageMedia
+from app.service.database.dialects import get_insert
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+
+MODULE_DESCRIPTION = "This module stores crud functions for archived media of messages."
+
+
+async def get_media_by_file_unique_id(db: AsyncSession, file_unique_id: str) -> tuple[str, int] | None:
+    """
+    Get the archived content of a Telegram file.
+
+    Parameters:
+        db (AsyncSession): The database session.
+        file_unique_id (str): Telegram file_unique_id.
+
+    Returns:
+        tuple[str, int] | None: sha256 and size of the archived file, or None if it is not archived.
+    """
+
+    stmt = (
+        select(MessageMedia.sha256, MessageMedia.size)
+        .where(MessageMedia.file_unique_id == file_unique_id)
+        .limit(1)
+    )
+    result = await db.execute(stmt)
+    row = result.first()
+    return (row.sha256, row.size) if row is not None else None
+
+
+async def save_message_media(db: AsyncSession, rows: list[dict]) -> None:
+    """
+    Insert media references of messages; references which are already stored are skipped. The caller commits.
+
+    Parameters:
+        db (AsyncSession): The database session.
+        rows (list[dict]): Column values (chat_id, message_id, kind, file_unique_id, mime_type, size, sha256).
+    """
+
+    if not rows:
+        return
+
+    insert = get_insert(db)
+    stmt = insert(MessageMedia).on_conflict_do_nothing(index_elements=["chat_id", "message_id", "file_unique_id"])
+    await db.execute(stmt, rows)
+
+    logger.debug(f"Media references saved: {len(rows)}")
+
+
+def main():
+    logger.info(START_MODULE_MESSAGE + str(__file__))
+    logger.info(MODULE_DESCRIPTION)
+    logger.info(str_object_is_created(save_message_media))
+
+
+if __name__ != "__main__":
+    main()
+
+
+if __name__ == "__main__":
+    main()
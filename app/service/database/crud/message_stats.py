@@ -0,0 +1,118 @@
+# app/service/database/crud/message_stats.py
+
+from app.service.logging.logger import (
+    logger,
+    START_MODULE_MESSAGE,
+    str_object_is_created,
+)
+from app.service.database.models.message import Message
+from app.service.database.models.message_stats import MessageStatsRollup
+from app.service.stats.rollups import RollupKey, rollup_key, upsert_rollup_counts
+
+from collections import Counter
+from collections.abc import Sequence
+from datetime import datetime
+from sqlalchemy import select, delete, func
+from sqlalchemy.ext.asyncio import AsyncSession
+
+
+MODULE_DESCRIPTION = "This module stores query and rebuild functions for message statistics rollups."
+
+
+STATS_DIMENSIONS = ("bucket_start", "chat_id", "from_user_id")
+
+
+REBUILD_YIELD_PER = 10_000
+
+
+async def get_message_counts(
+    db: AsyncSession,
+    group_by: Sequence[str] = ("chat_id",),
+    start_time: datetime | None = None,
+    end_time: datetime | None = None,
+    chat_id: int | None = None,
+    from_user_id: int | None = None,
+) -> list[dict]:
+    """
+    Get message counts from the rollup table (cost depends on number of buckets, not messages).
+
+    Parameters:
+        db (AsyncSession): The database session.
+        group_by (Sequence[str]): Dimensions to group by, any of STATS_DIMENSIONS.
+        start_time (datetime | None): Count messages of hour buckets starting at or after this time.
+        end_time (datetime | None): Count messages of hour buckets starting at or before this time.
+        chat_id (int | None): Count only messages of this chat.
+        from_user_id (int | None): Count only messages of this user.
+
+    Returns:
+        list[dict]: Rows with the requested dimensions and "message_count", the biggest counts first.
+    """
+
+    logger.debug(f"Getting message counts grouped by {group_by}")
+
+    unknown_dimensions = set(group_by) - set(STATS_DIMENSIONS)
+    if unknown_dimensions:
+        raise ValueError(f"Unknown stats dimensions: {unknown_dimensions}")
+
+    group_columns = [getattr(MessageStatsRollup, dimension) for dimension in group_by]
+    message_count = func.sum(MessageStatsRollup.message_count).label("message_count")
+
+    stmt = select(*group_columns, message_count).group_by(*group_columns).order_by(message_count.desc())
+    if start_time is not None:
+        stmt = stmt.where(MessageStatsRollup.bucket_start >= start_time)
+    if end_time is not None:
+        stmt = stmt.where(MessageStatsRollup.bucket_start <= end_time)
+    if chat_id is not None:
+        stmt = stmt.where(MessageStatsRollup.chat_id == chat_id)
+    if from_user_id is not None:
+        stmt = stmt.where(MessageStatsRollup.from_user_id == from_user_id)
+
+    result = await db.execute(stmt)
+    rows = [dict(row._mapping) for row in result.all()]
+
+    logger.debug(f"Found {len(rows)} message count rows")
+
+    return rows
+
+
+async def rebuild_message_stats(db: AsyncSession) -> int:
+    """
+    Regenerate the rollup table from raw messages (streams messages, keeps only the buckets in memory).
+
+    Parameters:
+        db (AsyncSession): The database session.
+
+    Returns:
+        int: Number of rollup rows.
+    """
+
+    logger.info("Rebuilding message stats rollups")
+
+    columns = [Message.created_at, Message.chat_id, Message.from_user_id]
+
+    counts: Counter[RollupKey] = Counter()
+    result = await db.stream(select(*columns).execution_options(yield_per=REBUILD_YIELD_PER))
+    async for row in result:
+        counts[rollup_key(*row)] += 1
+
+    await db.execute(delete(MessageStatsRollup))
+    upserted = await upsert_rollup_counts(db, counts.items())
+    await db.commit()
+
+    logger.info(f"Message stats rollups rebuilt: {upserted} rows from {sum(counts.values())} messages")
+
+    return upserted
+
+
+def main():
+    logger.info(START_MODULE_MESSAGE + str(__file__))
+    logger.info(MODULE_DESCRIPTION)
+    logger.info(str_object_is_created(get_message_counts))
+
+
+if __name__ != "__main__":
+    main()
+
+
+if __name__ == "__main__":
+    main()
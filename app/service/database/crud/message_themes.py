@@ -1,16 +1,25 @@
 # app/services/database/crud/message_themes.py
 
-from app.logger.logger import (
+from __future__ import annotations
+
+from app.service.logging.logger import (
     logger,
     START_MODULE_MESSAGE,
     str_object_is_created,
 )
-from app.services.database.models import MessageTheme as DatabaseMessageTheme
-from app.services.llm.schemas import MessageTheme as LangchainMessageTheme
+from app.service.database.models.message_theme import MessageTheme as DatabaseMessageTheme
+from app.service.keywords.prefilter import keyword_prefilter
+from app.service.themes.similarity_index import theme_similarity_index
 
+from typing import TYPE_CHECKING
+from uuid import UUID
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
+if TYPE_CHECKING:
+    # themes proposed by the classifier (name, description, keywords)
+    from app.services.llm.schemas import MessageTheme as LangchainMessageTheme
+
 
 MODULE_DESCRIPTION = "This module stores crud functions for messages in the database."
 
@@ -89,6 +98,23 @@ async def get_message_theme_by_name(db: AsyncSession, name: str) -> DatabaseMess
     return theme
 
 
+async def get_message_theme_by_uuid(db: AsyncSession, theme_uuid: UUID) -> DatabaseMessageTheme | None:
+    """
+    Get a message theme by its uuid.
+
+    Parameters:
+        db (AsyncSession): The database session.
+        theme_uuid (UUID): The uuid of the message theme.
+
+    Returns:
+        MessageTheme: The message theme with the specified uuid, or None if not found.
+    """
+
+    logger.debug(f"Getting message theme by uuid: {theme_uuid}")
+
+    return await db.get(DatabaseMessageTheme, theme_uuid)
+
+
 async def message_theme_exists(db: AsyncSession, name: str) -> bool:
     """
     Check if a message theme exists by its name.
@@ -130,6 +156,10 @@ async def add_new_keywords_to_theme(db: AsyncSession, theme: DatabaseMessageThem
     await db.commit()
     await db.refresh(theme)
 
+    if theme.enable:
+        keyword_prefilter.add_theme_keywords(theme.uuid, new_keywords)
+    theme_similarity_index.upsert_theme(theme)
+
     logger.debug(f"Updated message theme: {theme}")
 
     return theme
@@ -182,6 +212,10 @@ async def create_message_theme(db: AsyncSession, theme: LangchainMessageTheme) -
     await db.commit()
     await db.refresh(new_theme)
 
+    if new_theme.enable:
+        keyword_prefilter.add_theme_keywords(new_theme.uuid, new_theme.keywords or [])
+    theme_similarity_index.upsert_theme(new_theme)
+
     logger.info(f"Created new message theme: {new_theme}")
 
     return new_theme
@@ -201,9 +235,20 @@ async def check_and_create_or_update_theme(db: AsyncSession, theme: LangchainMes
 
     logger.debug(f"Checking and creating message theme if not exists: {theme}")
 
-    if await message_theme_exists(db, theme.name):
-        existing_theme: DatabaseMessageTheme = await get_message_theme_by_name(db, theme.name)
+    existing_theme: DatabaseMessageTheme | None = await get_message_theme_by_name(db, theme.name)
 
+    if existing_theme is None:
+        # the classifier often invents near-duplicate names: look for a semantically similar theme
+        similar_theme_uuid = theme_similarity_index.find_duplicate(theme.name, theme.description, theme.keywords)
+        if similar_theme_uuid is not None:
+            existing_theme = await get_message_theme_by_uuid(db, similar_theme_uuid)
+            if existing_theme is None:
+                # deleted meanwhile (or by another process): the index entry is stale
+                theme_similarity_index.remove(similar_theme_uuid)
+            else:
+                logger.info(f"Theme {theme.name!r} is a near-duplicate of existing theme {existing_theme.name!r}")
+
+    if existing_theme is not None:
         if await there_are_less_than_n_different_keywords_in_theme(existing_theme, theme.keywords or [], n=3):
             existing_theme: DatabaseMessageTheme = await add_new_keywords_to_theme(db, existing_theme, theme.keywords or [])
 
@@ -214,6 +259,38 @@ async def check_and_create_or_update_theme(db: AsyncSession, theme: LangchainMes
     return created_theme
 
 
+async def load_keyword_prefilter(db: AsyncSession) -> None:
+    """
+    Build the keyword prefilter from keywords of all enabled message themes.
+    Call it on startup; afterwards the prefilter is updated incrementally by
+    ``create_message_theme`` and ``add_new_keywords_to_theme``.
+
+    Parameters:
+        db (AsyncSession): The database session.
+    """
+
+    logger.debug("Loading keyword prefilter")
+
+    themes = await list_enabled_message_themes(db)
+    keyword_prefilter.rebuild(themes)
+
+
+async def load_theme_similarity_index(db: AsyncSession) -> None:
+    """
+    Build the theme similarity index from enabled message themes (disabled themes are not returned
+    as near-duplicates). Call it on startup; afterwards the index is updated incrementally by
+    ``create_message_theme`` and ``add_new_keywords_to_theme``.
+
+    Parameters:
+        db (AsyncSession): The database session.
+    """
+
+    logger.debug("Loading theme similarity index")
+
+    themes = await list_enabled_message_themes(db)
+    theme_similarity_index.rebuild(themes)
+
+
 def main():
     logger.info(START_MODULE_MESSAGE + str(__file__))
     logger.info(MODULE_DESCRIPTION)
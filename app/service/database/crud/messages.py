@@ -1,40 +1,88 @@
 # app/services/database/crud/messages.py
 
-from app.logger.logger import (
+from app.service.logging.logger import (
     logger,
     START_MODULE_MESSAGE,
     str_object_is_created,
 )
-from app.services.database.models import Message as DatabaseMessage
-from app.aiogram_services.services.utils import build_message_link, strip_aiogram_defaults
+from app.service.database.models.message import Message as DatabaseMessage
 from app.config.settings import settings
+from app.service.chats.metadata import ChatInfo, build_message_link, chat_metadata_cache
+from app.service.offload.executor import offload_executor
+from app.service.offload.steps import MESSAGE_JSON, serialize_message_payload
+from app.service.database.dialects import get_insert, get_dialect_name
+from app.service.stats.rollups import message_stats_aggregator
+from app.service.tracing.tracer import tracer
+from app.service.database.search import (
+    SQLITE_FTS_TABLE,
+    SQLITE_FTS_ROWID_COLUMN,
+    POSTGRES_TSV_COLUMN,
+    to_fts5_query,
+)
 
-import json
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.orm import selectinload
-from sqlalchemy import select
+from sqlalchemy.orm import defer, aliased
+from sqlalchemy import select, func, literal_column, table, column, literal
+from dataclasses import dataclass
 from datetime import datetime
 from datetime import timedelta
+from uuid import uuid4
 from aiogram.types import Message as AiogramMessage
 
 
 MODULE_DESCRIPTION = "This module stores crud functions for messages in the database."
 
 
-async def create_message(db: AsyncSession, message: AiogramMessage) -> DatabaseMessage:
+# str_json_data is a large blob which is almost never needed: it is not loaded unless requested
+# (``await message.awaitable_attrs.str_json_data``)
+DEFER_JSON_DATA = defer(DatabaseMessage.str_json_data)
+
+
+# safety bound of recursive reply chain query
+REPLY_CHAIN_MAX_DEPTH = 1_000
+
+
+@dataclass(slots=True, frozen=True)
+class ContextMessage:
     """
-    Create a new message in the database from an Aiogram Message object.
+    Compact read-only projection of a message for context windows (no ORM instance, no JSON blob).
+    """
+
+    uuid: object
+    created_at: datetime
+    id: int
+    chat_id: int
+    from_user_id: int
+    reply_to_message: int | None
+    text: str
+
+
+def context_columns(entity=DatabaseMessage) -> tuple:
+    """Columns of ContextMessage, in the order of its fields."""
+    return (
+        entity.uuid,
+        entity.created_at,
+        entity.id,
+        entity.chat_id,
+        entity.from_user_id,
+        entity.reply_to_message,
+        entity.text,
+    )
+
+
+async def message_row(message: AiogramMessage) -> dict:
+    """
+    Build the row of the message table from an Aiogram Message object (uuid and created_at are assigned here,
+    so the row can be stored later, e.g. replayed from the spool, with the same values).
+    JSON of messages with long text is built by the offload executor, off the event loop.
 
     Parameters:
-        db (AsyncSession): The database session.
         message (AiogramMessage): The message to be saved.
 
     Returns:
-        DatabaseMessage: The created message object.
+        dict: Column values of the message row.
     """
 
-    logger.debug("Creating new message in database")
-
     payload =  message.model_dump(
         by_alias=True,
         mode="json",
@@ -43,34 +91,140 @@ async def create_message(db: AsyncSession, message: AiogramMessage) -> DatabaseM
         exclude_unset=True,
     )
 
-    payload = strip_aiogram_defaults(payload)
+    text_length = len(message.text or message.caption or "")
+    if text_length >= settings.OFFLOAD_MESSAGE_JSON_MIN_TEXT_LENGTH:
+        str_json_data = await offload_executor.run(MESSAGE_JSON, payload)
+    else:
+        str_json_data = serialize_message_payload(payload)
 
-    str_json_data = json.dumps(payload, ensure_ascii=False)
-
-    message_link: str = build_message_link(message)
+    # metadata of the chat as the cache knows it (filled from updates); the message's own chat otherwise
+    chat = chat_metadata_cache.get(message.chat.id) or ChatInfo.from_chat(message.chat)
+    thread_id = message.message_thread_id if message.is_topic_message else None
+    message_link: str | None = build_message_link(chat, message.message_id, thread_id)
 
     logger.debug(f"JSON data: {str_json_data}")
 
     reply_id = message.reply_to_message.message_id if message.reply_to_message else None
     logger.debug(f"Reply to message id: {reply_id}")
 
-    new_message = DatabaseMessage(
-        id=message.message_id,
-        chat_id=message.chat.id,
-        from_user_id=message.from_user.id,
-        reply_to_message=reply_id,
-        text=message.text,
-        message_link=message_link,
-        str_json_data=str_json_data,
+    # anonymous admins and channel posts have no from_user: the author is the chat they are sent on behalf of
+    sender_id = message.from_user.id if message.from_user is not None else message.sender_chat.id
+
+    return {
+        "uuid": uuid4(),
+        "created_at": datetime.utcnow(),
+        "id": message.message_id,
+        "chat_id": message.chat.id,
+        "from_user_id": sender_id,
+        "reply_to_message": reply_id,
+        # media messages have a caption or no text at all (stickers), the column is NOT NULL
+        "text": message.text or message.caption or "",
+        "message_link": message_link,
+        "str_json_data": str_json_data,
+    }
+
+
+async def create_message(db: AsyncSession, message: AiogramMessage) -> DatabaseMessage:
+    """
+    Create a new message in the database from an Aiogram Message object.
+    Insert is idempotent: if the message (chat_id, id) is already stored, the stored row is returned.
+
+    Parameters:
+        db (AsyncSession): The database session.
+        message (AiogramMessage): The message to be saved.
+
+    Returns:
+        DatabaseMessage: The created (or already stored) message object.
+    """
+
+    logger.debug("Creating new message in database")
+
+    return await store_message_row(db, await message_row(message))
+
+
+async def store_message_row(db: AsyncSession, row: dict) -> DatabaseMessage:
+    """
+    Insert the message row (see ``message_row``) unless the message (chat_id, id) is already stored.
+
+    Parameters:
+        db (AsyncSession): The database session.
+        row (dict): Column values of the message row.
+
+    Returns:
+        DatabaseMessage: The created (or already stored) message object.
+    """
+
+    insert = get_insert(db)
+    stmt = (
+        insert(DatabaseMessage)
+        .values(**row)
+        .on_conflict_do_nothing(index_elements=["chat_id", "id"])
+        .returning(DatabaseMessage.uuid)
     )
 
-    db.add(new_message)
+    result = await db.execute(stmt)
+    inserted_uuid = result.scalar_one_or_none()
     await db.commit()
-    await db.refresh(new_message)
 
-    return new_message
+    if inserted_uuid is None:
+        logger.debug(f"Message {row['id']} from chat {row['chat_id']} is already stored, skip insert")
+
+    stmt = (
+        select(DatabaseMessage)
+        .where(
+            DatabaseMessage.chat_id == row["chat_id"],
+            DatabaseMessage.id == row["id"],
+        )
+        .options(DEFER_JSON_DATA)
+    )
+    result = await db.execute(stmt)
+    stored_message = result.scalar_one()
+
+    if inserted_uuid is not None:
+        message_stats_aggregator.record(stored_message)
+
+    return stored_message
 
 
+async def insert_message_rows(db: AsyncSession, rows: list[dict]) -> int:
+    """
+    Bulk insert message rows with one statement; already stored messages (chat_id, id) are skipped.
+    The caller commits.
+
+    Parameters:
+        db (AsyncSession): The database session.
+        rows (list[dict]): Column values of message rows (see ``message_row``).
+
+    Returns:
+        int: Number of inserted rows.
+    """
+
+    if not rows:
+        return 0
+
+    insert = get_insert(db)
+    stmt = (
+        insert(DatabaseMessage)
+        .values(rows)
+        .on_conflict_do_nothing(index_elements=["chat_id", "id"])
+        .returning(
+            DatabaseMessage.created_at,
+            DatabaseMessage.chat_id,
+            DatabaseMessage.from_user_id,
+        )
+    )
+
+    result = await db.execute(stmt)
+    inserted = result.all()
+    for stored_message in inserted:
+        message_stats_aggregator.record(stored_message)
+
+    logger.debug(f"Bulk insert of messages: {len(inserted)} of {len(rows)} inserted")
+
+    return len(inserted)
+
+
+@tracer.traced("fetch_context_messages")
 async def fetch_context_messages(db: AsyncSession, msg: DatabaseMessage) -> list[DatabaseMessage]:
     """Fetch context messages for a given message.
 
@@ -81,21 +235,24 @@ async def fetch_context_messages(db: AsyncSession, msg: DatabaseMessage) -> list
 
     logger.debug(f"Fetching context for message id={msg.id}")
 
-    reloaded_msg = await get_message_by_id(db, msg.id)
+    reloaded_msg = await get_message_by_id(db, msg.chat_id, msg.id)
     if reloaded_msg is not None:
         msg = reloaded_msg
 
+    # Build reply chain: one recursive query, not a query per hop
     chain: list[DatabaseMessage] = []
-    current = msg
-    # Build reply chain
-    while current.reply_to_message:
-        prev = await get_message_by_id(db, current.reply_to_message)
-        if prev is None:
-            break
-        chain.append(prev)
-        current = prev
-
-    chain.reverse()
+    if msg.reply_to_message is not None:
+        reply_chain = reply_chain_cte(msg.chat_id, msg.reply_to_message)
+        stmt = (
+            select(DatabaseMessage)
+            .join(reply_chain, (DatabaseMessage.chat_id == reply_chain.c.chat_id)
+                  & (DatabaseMessage.id == reply_chain.c.id))
+            .options(DEFER_JSON_DATA)
+            .order_by(reply_chain.c.depth.desc())
+        )
+        result = await db.execute(stmt)
+        chain = list(result.scalars().all())
+
     if chain:
         chain.append(msg)
         limit = settings.LENGTH_OF_REPLY_CHAIN_LIMIT
@@ -114,7 +271,7 @@ async def fetch_context_messages(db: AsyncSession, msg: DatabaseMessage) -> list
             DatabaseMessage.created_at >= time_from,
             DatabaseMessage.created_at < msg.created_at,
         )
-        .options(selectinload(DatabaseMessage.theme))
+        .options(DEFER_JSON_DATA)
         .order_by(DatabaseMessage.created_at.desc())
         .limit(settings.LENGTH_OF_AUTHOR_CHAIN_LIMIT)
     )
@@ -134,7 +291,7 @@ async def fetch_context_messages(db: AsyncSession, msg: DatabaseMessage) -> list
             DatabaseMessage.created_at >= time_from,
             DatabaseMessage.created_at < msg.created_at,
         )
-        .options(selectinload(DatabaseMessage.theme))
+        .options(DEFER_JSON_DATA)
         .order_by(DatabaseMessage.created_at.desc())
         .limit(settings.LENGTH_OF_LAST_MESSAGES_CHAIN_LIMIT)
     )
@@ -146,21 +303,209 @@ async def fetch_context_messages(db: AsyncSession, msg: DatabaseMessage) -> list
     return chat_msgs
 
 
-async def get_message_by_id(db: AsyncSession, message_id: int) -> DatabaseMessage | None:
+async def get_context_message(db: AsyncSession, chat_id: int, message_id: int) -> ContextMessage | None:
     """
-    Retrieve a message from the database by its ID.
+    Load compact projection of a message.
 
     Parameters:
         db (AsyncSession): The database session.
+        chat_id (int): The chat of the message.
+        message_id (int): The telegram id of the message in the chat.
+
+    Returns:
+        ContextMessage | None: The projection if found, otherwise None.
+    """
+
+    stmt = select(*context_columns()).where(
+        DatabaseMessage.chat_id == chat_id,
+        DatabaseMessage.id == message_id,
+    )
+    result = await db.execute(stmt)
+    row = result.first()
+    return ContextMessage(*row) if row is not None else None
+
+
+def reply_chain_cte(chat_id: int, message_id: int):
+    """
+    Recursive CTE of a reply chain: columns of ContextMessage and depth (1 for the message itself,
+    then its parent and so on), bounded by REPLY_CHAIN_MAX_DEPTH. The chain ends at a message which is not stored.
+
+    Parameters:
+        chat_id (int): The chat of the chain.
+        message_id (int): The telegram id of the first message of the chain (e.g. the message a message replies to).
+
+    Returns:
+        CTE: The reply chain.
+    """
+
+    chain = (
+        select(*context_columns(), literal(1).label("depth"))
+        .where(
+            DatabaseMessage.chat_id == chat_id,
+            DatabaseMessage.id == message_id,
+        )
+        .cte("reply_chain", recursive=True)
+    )
+    parent = aliased(DatabaseMessage)
+    return chain.union_all(
+        select(*context_columns(parent), (chain.c.depth + 1).label("depth"))
+        .join(chain, (parent.chat_id == chain.c.chat_id) & (parent.id == chain.c.reply_to_message))
+        .where(chain.c.depth < REPLY_CHAIN_MAX_DEPTH)
+    )
+
+
+async def fetch_reply_chain(db: AsyncSession, msg: ContextMessage) -> list[ContextMessage]:
+    """
+    Load the whole reply chain of a message with one recursive query.
+
+    Parameters:
+        db (AsyncSession): The database session.
+        msg (ContextMessage): The message.
+
+    Returns:
+        list[ContextMessage]: Messages the message replies to (directly or not), ordered from older to newer,
+        without the message itself.
+    """
+
+    if msg.reply_to_message is None:
+        return []
+
+    chain = reply_chain_cte(msg.chat_id, msg.reply_to_message)
+    stmt = select(*[chain.c[name] for name in ContextMessage.__slots__]).order_by(chain.c.depth.desc())
+    result = await db.execute(stmt)
+    return [ContextMessage(*row) for row in result.all()]
+
+
+async def get_thread_root_id(db: AsyncSession, chat_id: int, message_id: int) -> int:
+    """
+    Find the root of the reply thread of a message with one recursive query (ids only).
+
+    Parameters:
+        db (AsyncSession): The database session.
+        chat_id (int): The chat of the message.
+        message_id (int): The telegram id of the message (e.g. the message a new message replies to).
+
+    Returns:
+        int: Id of the first message of the thread; if the chain leads to a message which is not stored,
+        the id of that message (the same for every message of the thread).
+    """
+
+    chain = (
+        select(DatabaseMessage.id, DatabaseMessage.reply_to_message, literal(1).label("depth"))
+        .where(
+            DatabaseMessage.chat_id == chat_id,
+            DatabaseMessage.id == message_id,
+        )
+        .cte("thread_chain", recursive=True)
+    )
+    parent = aliased(DatabaseMessage)
+    chain = chain.union_all(
+        select(parent.id, parent.reply_to_message, (chain.c.depth + 1).label("depth"))
+        .join(chain, (parent.chat_id == chat_id) & (parent.id == chain.c.reply_to_message))
+        .where(chain.c.depth < REPLY_CHAIN_MAX_DEPTH)
+    )
+
+    stmt = select(chain.c.id, chain.c.reply_to_message).order_by(chain.c.depth.desc()).limit(1)
+    result = await db.execute(stmt)
+    row = result.first()
+    if row is None:
+        return message_id
+
+    root_id, reply_to_message = row
+    return reply_to_message if reply_to_message is not None else root_id
+
+
+async def fetch_context_records(db: AsyncSession, msg: DatabaseMessage | ContextMessage) -> list[ContextMessage]:
+    """Lightweight version of ``fetch_context_messages``.
+
+    The same context rules (reply chain, author's recent messages, recent chat messages), but only
+    the needed columns are selected into ContextMessage records: no ORM instances in the identity map,
+    no JSON blob. Returned list is ordered from older to newer and always ends with the original message
+    (as it was passed, if it is not stored).
+    """
+
+    logger.debug(f"Fetching context records for message id={msg.id}")
+
+    reloaded_msg = await get_context_message(db, msg.chat_id, msg.id)
+    if reloaded_msg is not None:
+        msg = reloaded_msg
+    elif isinstance(msg, DatabaseMessage):
+        # not stored (e.g. spooled): the context is built around the message as it was passed
+        msg = ContextMessage(*(getattr(msg, name) for name in ContextMessage.__slots__))
+
+    chain = await fetch_reply_chain(db, msg)
+    if chain:
+        chain.append(msg)
+        limit = settings.LENGTH_OF_REPLY_CHAIN_LIMIT
+        if len(chain) > limit:
+            chain = chain[:2] + chain[-(limit - 2):]
+        logger.debug(f"Reply chain length: {len(chain)}")
+        return chain
+
+    time_from = msg.created_at - timedelta(minutes=settings.TIME_OF_LAST_MESSAGES_LIMIT_MINUTES)
+
+    # No reply chain, collect author's recent messages
+    stmt = (
+        select(*context_columns())
+        .where(
+            DatabaseMessage.chat_id == msg.chat_id,
+            DatabaseMessage.from_user_id == msg.from_user_id,
+            DatabaseMessage.created_at >= time_from,
+            DatabaseMessage.created_at < msg.created_at,
+        )
+        .order_by(DatabaseMessage.created_at.desc())
+        .limit(settings.LENGTH_OF_AUTHOR_CHAIN_LIMIT)
+    )
+    result = await db.execute(stmt)
+    author_msgs = [ContextMessage(*row) for row in result.all()]
+    author_msgs.reverse()
+    if author_msgs:
+        author_msgs.append(msg)
+        logger.debug(f"Author chain length: {len(author_msgs)}")
+        return author_msgs
+
+    # Fallback: recent chat messages
+    stmt = (
+        select(*context_columns())
+        .where(
+            DatabaseMessage.chat_id == msg.chat_id,
+            DatabaseMessage.created_at >= time_from,
+            DatabaseMessage.created_at < msg.created_at,
+        )
+        .order_by(DatabaseMessage.created_at.desc())
+        .limit(settings.LENGTH_OF_LAST_MESSAGES_CHAIN_LIMIT)
+    )
+    result = await db.execute(stmt)
+    chat_msgs = [ContextMessage(*row) for row in result.all()]
+    chat_msgs.reverse()
+    chat_msgs.append(msg)
+    logger.debug(f"Chat chain length: {len(chat_msgs)}")
+    return chat_msgs
+
+
+async def get_message_by_id(db: AsyncSession, chat_id: int, message_id: int) -> DatabaseMessage | None:
+    """
+    Retrieve a message from the database by its ID (telegram message ids are unique only within a chat).
+
+    Parameters:
+        db (AsyncSession): The database session.
+        chat_id (int): The chat of the message.
         message_id (int): The ID of the message to retrieve.
 
     Returns:
         DatabaseMessage | None: The message object if found, otherwise None.
     """
 
-    logger.debug(f"Retrieving message by ID from db: {message_id}")
+    logger.debug(f"Retrieving message by ID from db: {message_id} from chat {chat_id}")
 
-    stmt = select(DatabaseMessage).where(DatabaseMessage.id == message_id).options(selectinload(DatabaseMessage.theme))
+    stmt = (
+        select(DatabaseMessage)
+        .where(
+            DatabaseMessage.chat_id == chat_id,
+            DatabaseMessage.id == message_id,
+        )
+        .options(DEFER_JSON_DATA)
+    )
     result = await db.execute(stmt)
     return result.scalar_one_or_none()
 
@@ -182,7 +527,7 @@ async def list_messages(
 
     logger.debug("Listing all messages from database")
 
-    stmt = select(DatabaseMessage).order_by(DatabaseMessage.created_at.desc())
+    stmt = select(DatabaseMessage).options(DEFER_JSON_DATA).order_by(DatabaseMessage.created_at.desc())
     if start_time is not None:
         stmt = stmt.where(DatabaseMessage.created_at >= start_time)
     if end_time is not None:
@@ -196,12 +541,88 @@ async def list_messages(
     return messages
 
 
+async def search_messages(
+    db: AsyncSession,
+    query: str,
+    chat_id: int | None = None,
+    start_time: datetime | None = None,
+    end_time: datetime | None = None,
+    limit: int = 20,
+    offset: int = 0,
+) -> list[tuple[DatabaseMessage, float]]:
+    """
+    Full-text search over message text (PostgreSQL tsvector + GIN, SQLite FTS5).
+
+    Parameters:
+        db (AsyncSession): The database session.
+        query (str): Search query (words are combined with AND).
+        chat_id (int | None): Search only in this chat.
+        start_time (datetime | None): Search only messages created at or after this time.
+        end_time (datetime | None): Search only messages created at or before this time.
+        limit (int): Page size.
+        offset (int): Page offset.
+
+    Returns:
+        list[tuple[DatabaseMessage, float]]: Found messages with rank, the most relevant first.
+    """
+
+    logger.debug(f"Searching messages: query={query!r}, chat_id={chat_id}, limit={limit}, offset={offset}")
+
+    if not query.strip():
+        return []
+
+    dialect_name = get_dialect_name(db)
+    message_table = DatabaseMessage.__tablename__
+
+    if dialect_name == "postgresql":
+        text_tsv = literal_column(f"{message_table}.{POSTGRES_TSV_COLUMN}")
+        ts_query = func.websearch_to_tsquery(settings.FULL_TEXT_SEARCH_CONFIG, query)
+        rank = func.ts_rank(text_tsv, ts_query)
+        stmt = (
+            select(DatabaseMessage, rank.label("rank"))
+            .options(DEFER_JSON_DATA)
+            .where(text_tsv.op("@@")(ts_query))
+            .order_by(rank.desc(), DatabaseMessage.created_at.desc())
+        )
+    elif dialect_name == "sqlite":
+        fts = table(SQLITE_FTS_TABLE, column("rowid"), column("rank"))
+        stmt = (
+            select(DatabaseMessage, (-fts.c.rank).label("rank"))
+            .options(DEFER_JSON_DATA)
+            .join(fts, fts.c.rowid == literal_column(f"{message_table}.{SQLITE_FTS_ROWID_COLUMN}"))
+            .where(literal_column(SQLITE_FTS_TABLE).op("MATCH")(to_fts5_query(query)))
+            # bm25 rank of FTS5: the lower, the more relevant
+            .order_by(fts.c.rank, DatabaseMessage.created_at.desc())
+        )
+    else:
+        raise NotImplementedError(f"Full-text search is not supported for dialect {dialect_name}")
+
+    if chat_id is not None:
+        stmt = stmt.where(DatabaseMessage.chat_id == chat_id)
+    if start_time is not None:
+        stmt = stmt.where(DatabaseMessage.created_at >= start_time)
+    if end_time is not None:
+        stmt = stmt.where(DatabaseMessage.created_at <= end_time)
+
+    stmt = stmt.limit(limit).offset(offset)
+
+    result = await db.execute(stmt)
+    found = [(found_message, float(rank)) for found_message, rank in result.all()]
+
+    logger.debug(f"Found {len(found)} messages for query {query!r}")
+
+    return found
+
+
 def main():
     logger.info(START_MODULE_MESSAGE + str(__file__))
     logger.info(MODULE_DESCRIPTION)
     logger.info(str_object_is_created(create_message))
+    logger.info(str_object_is_created(insert_message_rows))
     logger.info(str_object_is_created(fetch_context_messages))
     logger.info(str_object_is_created(get_message_by_id))
+    logger.info(str_object_is_created(search_messages))
+    logger.info(str_object_is_created(fetch_context_records))
 
 
 if __name__ != "__main__":
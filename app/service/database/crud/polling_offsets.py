@@ -0,0 +1,79 @@
+# app/service/database/crud/polling_offsets.py
+
+from app.service.logging.logger import (
+    logger,
+    START_MODULE_MESSAGE,
+    str_object_is_created,
+)
+from app.service.database.models.polling_offset import PollingOffset
+from app.service.database.dialects import get_insert
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from datetime import datetime
+
+
+MODULE_DESCRIPTION = "This module stores crud functions for persisted polling offsets."
+
+
+async def get_last_update_id(db: AsyncSession, bot_id: int) -> int | None:
+    """
+    Get the last processed update_id of the bot.
+
+    Parameters:
+        db (AsyncSession): The database session.
+        bot_id (int): The telegram id of the bot.
+
+    Returns:
+        int | None: The last processed update_id, or None if nothing was persisted yet.
+    """
+
+    logger.debug(f"Getting last processed update_id for bot {bot_id}")
+
+    stmt = select(PollingOffset.last_update_id).where(PollingOffset.bot_id == bot_id)
+    result = await db.execute(stmt)
+    return result.scalar_one_or_none()
+
+
+async def save_last_update_id(db: AsyncSession, bot_id: int, last_update_id: int) -> None:
+    """
+    Persist the last processed update_id of the bot (insert or update).
+
+    Parameters:
+        db (AsyncSession): The database session.
+        bot_id (int): The telegram id of the bot.
+        last_update_id (int): The last processed update_id.
+    """
+
+    logger.debug(f"Saving last processed update_id={last_update_id} for bot {bot_id}")
+
+    insert = get_insert(db)
+    stmt = insert(PollingOffset).values(
+        bot_id=bot_id,
+        last_update_id=last_update_id,
+        updated_at=datetime.utcnow(),
+    )
+    stmt = stmt.on_conflict_do_update(
+        index_elements=["bot_id"],
+        set_={
+            "last_update_id": stmt.excluded.last_update_id,
+            "updated_at": stmt.excluded.updated_at,
+        },
+    )
+
+    await db.execute(stmt)
+    await db.commit()
+
+
+def main():
+    logger.info(START_MODULE_MESSAGE + str(__file__))
+    logger.info(MODULE_DESCRIPTION)
+    logger.info(str_object_is_created(save_last_update_id))
+
+
+if __name__ != "__main__":
+    main()
+
+
+if __name__ == "__main__":
+    main()
@@ -7,6 +7,15 @@ from app.service.logging.logger import (
     str_object_is_created,
 )
 from app.service.database.models.message import Message # noqa: F401
+from app.service.database.models.polling_offset import PollingOffset # noqa: F401
+from app.service.database.models.message_stats import MessageStatsRollup # noqa: F401
+from app.service.database.models.fsm_record import FsmRecord # noqa: F401
+from app.service.database.models.message_media import MessageMedia # noqa: F401
+from app.service.database.models.message_theme import MessageTheme # noqa: F401
+from app.service.database.routing import ReplicaPool, make_routing_session_class
+from app.service.database.search import install_full_text_search
+from app.service.database.query_stats import install_query_stats
+from app.service.database.tracing import install_sql_tracing
 
 import asyncio
 
@@ -23,6 +32,9 @@ MODULE_DESCRIPTION = "This module is used for access to the database"
 
 
 connect_args: dict = {}
+if settings.DB_ENGINE.startswith("postgresql+asyncpg"):
+    # statements hanging on a slow / restarting server fail with TimeoutError (counted by the circuit breaker)
+    connect_args["command_timeout"] = settings.DB_CALL_TIMEOUT_SECONDS
 
 engine = create_async_engine(
     settings.DATABASE_URL,
@@ -31,10 +43,48 @@ engine = create_async_engine(
     connect_args=connect_args,
     pool_size=20,
     max_overflow=20,
+    pool_timeout=settings.DB_CALL_TIMEOUT_SECONDS,
 )
 
 
-async_session_factory = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+replica_engines = [
+    create_async_engine(
+        replica_url,
+        echo=False,
+        future=True,
+        connect_args=connect_args,
+        pool_size=20,
+        max_overflow=20,
+    )
+    for replica_url in settings.REPLICA_DATABASE_URLS
+]
+
+replica_pool = ReplicaPool(
+    replica_engines,
+    max_lag_seconds=settings.DB_REPLICA_MAX_LAG_SECONDS,
+    check_interval_seconds=settings.DB_REPLICA_CHECK_INTERVAL_SECONDS,
+)
+
+
+if settings.DB_QUERY_STATS_ENABLED:
+    for _engine in (engine, *replica_engines):
+        install_query_stats(_engine)
+
+if settings.TRACING_SAMPLE_RATE > 0:
+    for _engine in (engine, *replica_engines):
+        install_sql_tracing(_engine)
+
+
+if replica_engines:
+    # read-only statements go to healthy replicas, writes (and reads after them) go to the primary
+    async_session_factory = async_sessionmaker(
+        engine,
+        class_=AsyncSession,
+        expire_on_commit=False,
+        sync_session_class=make_routing_session_class(engine, replica_pool),
+    )
+else:
+    async_session_factory = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
 
 
 async def init_db() -> None:
@@ -48,9 +98,14 @@ async def init_db() -> None:
         logger.info(str_object_is_created(engine))
         logger.info(str_object_is_created(async_session_factory))
         await conn.run_sync(SQLModel.metadata.create_all)
+        await install_full_text_search(conn)
         logger.info("Database is successfully connected")
         logger.info(f"Current database: {engine.url}")
 
+    if replica_engines:
+        logger.info(f"Read replicas configured: {len(replica_engines)}")
+        await replica_pool.start_monitor()
+
 
 def get_session() -> AsyncSession:
     """
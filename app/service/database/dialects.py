@@ -0,0 +1,62 @@
+# app/service/database/dialects.py
+
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.service.logging.logger import (
+    logger,
+    START_MODULE_MESSAGE,
+    str_object_is_created,
+)
+
+
+MODULE_DESCRIPTION = "This module provides dialect-specific SQL helpers (INSERT ... ON CONFLICT for SQLite and PostgreSQL)."
+
+
+def get_dialect_name(db: AsyncSession) -> str:
+    """
+    Return the name of the dialect the session is bound to.
+
+    Parameters:
+        db (AsyncSession): The database session.
+
+    Returns:
+        str: Dialect name, e.g. "sqlite" or "postgresql".
+    """
+    return db.get_bind().dialect.name
+
+
+def get_insert(db: AsyncSession):
+    """
+    Return the dialect-specific ``insert`` construct which supports ``on_conflict_do_nothing``
+    and ``on_conflict_do_update``.
+
+    Parameters:
+        db (AsyncSession): The database session.
+
+    Returns:
+        Callable: ``sqlalchemy.dialects.postgresql.insert`` or ``sqlalchemy.dialects.sqlite.insert``.
+    """
+
+    dialect_name = get_dialect_name(db)
+
+    if dialect_name == "postgresql":
+        return postgresql.insert
+    if dialect_name == "sqlite":
+        return sqlite.insert
+
+    raise NotImplementedError(f"INSERT ... ON CONFLICT is not supported for dialect {dialect_name}")
+
+
+def main():
+    logger.info(START_MODULE_MESSAGE + str(__file__))
+    logger.info(MODULE_DESCRIPTION)
+    logger.info(str_object_is_created(get_insert))
+
+
+if __name__ != "__main__":
+    main()
+
+
+if __name__ == "__main__":
+    main()
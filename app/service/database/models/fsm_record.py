@@ -0,0 +1,41 @@
+# app/service/database/models/fsm_record.py
+
+from sqlmodel import Field, Column, String, Text
+from pydantic import StrictStr
+from datetime import datetime
+
+from app.service.database.models.message import AsyncBase
+from app.service.logging.logger import (
+    logger,
+    START_MODULE_MESSAGE,
+    str_object_is_created,
+)
+
+
+MODULE_DESCRIPTION = "This module stores model of aiogram FSM state and data (one row per storage key)."
+
+
+class FsmRecord(AsyncBase, table=True):
+    __tablename__ = "fsm_record"
+
+    # storage key built by aiogram DefaultKeyBuilder: fsm:<bot_id>:<chat_id>:<user_id>:<destiny>
+    key:                StrictStr        = Field(sa_column=Column(String, primary_key=True))
+    state:              StrictStr | None = Field(default=None, sa_column=Column(String))
+    # JSON object
+    data:               StrictStr        = Field(default="{}", sa_column=Column(Text, nullable=False))
+    # abandoned states (not updated for FSM_STATE_TTL_SECONDS) are deleted
+    updated_at:         datetime         = Field(default_factory=datetime.utcnow, index=True)
+
+
+def main():
+    logger.info(START_MODULE_MESSAGE + str(__file__))
+    logger.info(MODULE_DESCRIPTION)
+    logger.info(str_object_is_created(FsmRecord))
+
+
+if __name__ != "__main__":
+    main()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,6 +1,7 @@
 # app/services/database/models/message.py
 
 from sqlmodel import SQLModel, Field, Relationship, Column, BigInteger
+from sqlalchemy import UniqueConstraint, Index
 from sqlalchemy.ext.asyncio import AsyncAttrs
 from pydantic import StrictInt, StrictStr, UUID4
 from uuid import uuid4
@@ -21,6 +22,13 @@ class AsyncBase(AsyncAttrs, SQLModel):
 
 
 class Message(AsyncBase, table=True):
+    # (chat_id, id) identifies a telegram message, used for idempotent inserts (ON CONFLICT DO NOTHING)
+    __table_args__ = (
+        UniqueConstraint("chat_id", "id", name="uq_message_chat_id_id"),
+        # chat/time filters of search and context queries
+        Index("ix_message_chat_id_created_at", "chat_id", "created_at"),
+    )
+
     uuid:               UUID4            = Field(default_factory=uuid4, primary_key=True)
     created_at:         datetime         = Field(default_factory=datetime.utcnow)
     id:                 StrictInt        = Field(sa_column=Column(BigInteger, nullable=False))
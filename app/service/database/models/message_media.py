@@ -0,0 +1,54 @@
+# app/service/database/models/message_media.py
+
+from sqlmodel import Field, Column, BigInteger, String
+from sqlalchemy import UniqueConstraint
+from pydantic import StrictInt, StrictStr, UUID4
+from uuid import uuid4
+from datetime import datetime
+
+from app.service.database.models.message import AsyncBase
+from app.service.logging.logger import (
+    logger,
+    START_MODULE_MESSAGE,
+    str_object_is_created,
+)
+
+
+MODULE_DESCRIPTION = "This module stores model of archived media of messages (references to content-addressed files)."
+
+
+class MessageMedia(AsyncBase, table=True):
+    __tablename__ = "message_media"
+
+    # (chat_id, message_id) references the message as Message (chat_id, id): the message may still be
+    # in the spool when its media is archived
+    __table_args__ = (
+        UniqueConstraint("chat_id", "message_id", "file_unique_id", name="uq_message_media_message_file"),
+    )
+
+    uuid:               UUID4            = Field(default_factory=uuid4, primary_key=True)
+    created_at:         datetime         = Field(default_factory=datetime.utcnow)
+    chat_id:            StrictInt        = Field(sa_column=Column(BigInteger, nullable=False))
+    message_id:         StrictInt        = Field(sa_column=Column(BigInteger, nullable=False))
+    # photo, document, video, sticker...
+    kind:               StrictStr
+    # the same file sent again (forwarded meme, sticker) has the same file_unique_id: it is not downloaded again
+    file_unique_id:     StrictStr        = Field(sa_column=Column(String, nullable=False, index=True))
+    mime_type:          StrictStr | None = None
+    size:               StrictInt        = Field(sa_column=Column(BigInteger, nullable=False))
+    # content hash; the file is stored once at MEDIA_PATH/<sha256[:2]>/<sha256>
+    sha256:             StrictStr        = Field(sa_column=Column(String(64), nullable=False, index=True))
+
+
+def main():
+    logger.info(START_MODULE_MESSAGE + str(__file__))
+    logger.info(MODULE_DESCRIPTION)
+    logger.info(str_object_is_created(MessageMedia))
+
+
+if __name__ != "__main__":
+    main()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,39 @@
+# app/service/database/models/message_stats.py
+
+from sqlmodel import Field, Column, BigInteger
+from pydantic import StrictInt
+from datetime import datetime
+
+from app.service.database.models.message import AsyncBase
+from app.service.logging.logger import (
+    logger,
+    START_MODULE_MESSAGE,
+    str_object_is_created,
+)
+
+
+MODULE_DESCRIPTION = ("This module stores model of message statistics rollup: message counts "
+                      "per hour bucket, chat and user.")
+
+
+class MessageStatsRollup(AsyncBase, table=True):
+    __tablename__ = "message_stats_rollup"
+
+    bucket_start:       datetime         = Field(primary_key=True)
+    chat_id:            StrictInt        = Field(sa_column=Column(BigInteger, primary_key=True, autoincrement=False))
+    from_user_id:       StrictInt        = Field(sa_column=Column(BigInteger, primary_key=True, autoincrement=False))
+    message_count:      StrictInt        = Field(default=0, sa_column=Column(BigInteger, nullable=False))
+
+
+def main():
+    logger.info(START_MODULE_MESSAGE + str(__file__))
+    logger.info(MODULE_DESCRIPTION)
+    logger.info(str_object_is_created(MessageStatsRollup))
+
+
+if __name__ != "__main__":
+    main()
+
+
+if __name__ == "__main__":
+    main()
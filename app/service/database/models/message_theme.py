@@ -0,0 +1,42 @@
+# app/service/database/models/message_theme.py
+
+from sqlmodel import Field, Column, String, JSON
+from pydantic import StrictStr, UUID4
+from uuid import uuid4
+from datetime import datetime
+
+from app.service.database.models.message import AsyncBase
+from app.service.logging.logger import (
+    logger,
+    START_MODULE_MESSAGE,
+    str_object_is_created,
+)
+
+
+MODULE_DESCRIPTION = "This module stores model of message themes (name, description and keywords of a theme)."
+
+
+class MessageTheme(AsyncBase, table=True):
+    __tablename__ = "message_theme"
+
+    uuid:               UUID4            = Field(default_factory=uuid4, primary_key=True)
+    created_at:         datetime         = Field(default_factory=datetime.utcnow)
+    name:               StrictStr        = Field(sa_column=Column(String, nullable=False, unique=True))
+    description:        StrictStr | None = None
+    # JSON list of keywords (see service.keywords.prefilter)
+    keywords:           list[str]        = Field(default_factory=list, sa_column=Column(JSON, nullable=False))
+    enable:             bool             = True
+
+
+def main():
+    logger.info(START_MODULE_MESSAGE + str(__file__))
+    logger.info(MODULE_DESCRIPTION)
+    logger.info(str_object_is_created(MessageTheme))
+
+
+if __name__ != "__main__":
+    main()
+
+
+if __name__ == "__main__":
+    main()
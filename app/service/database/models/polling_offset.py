@@ -0,0 +1,37 @@
+# app/service/database/models/polling_offset.py
+
+from sqlmodel import Field, Column, BigInteger
+from pydantic import StrictInt
+from datetime import datetime
+
+from app.service.database.models.message import AsyncBase
+from app.service.logging.logger import (
+    logger,
+    START_MODULE_MESSAGE,
+    str_object_is_created,
+)
+
+
+MODULE_DESCRIPTION = "This module stores model of the persisted polling offset (last processed update_id per bot)."
+
+
+class PollingOffset(AsyncBase, table=True):
+    __tablename__ = "polling_offset"
+
+    bot_id:             StrictInt        = Field(sa_column=Column(BigInteger, primary_key=True, autoincrement=False))
+    last_update_id:     StrictInt        = Field(sa_column=Column(BigInteger, nullable=False))
+    updated_at:         datetime         = Field(default_factory=datetime.utcnow)
+
+
+def main():
+    logger.info(START_MODULE_MESSAGE + str(__file__))
+    logger.info(MODULE_DESCRIPTION)
+    logger.info(str_object_is_created(PollingOffset))
+
+
+if __name__ != "__main__":
+    main()
+
+
+if __name__ == "__main__":
+    main()
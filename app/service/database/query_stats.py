@@ -0,0 +1,161 @@
+# app/service/database/query_stats.py
+
+import hashlib
+import re
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Any, Iterator
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from app.config.settings import settings
+from app.service.logging.logger import (
+    logger,
+    START_MODULE_MESSAGE,
+    str_object_is_created,
+)
+
+
+MODULE_DESCRIPTION = ("This module counts and fingerprints SQL statements per update / handler / code block, "
+                      "detects N+1 patterns (the same statement repeated) and provides query budgets for tests.")
+
+
+_STRING_LITERAL = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_LITERAL = re.compile(r"\b\d+(?:\.\d+)?\b")
+_PARAMETER = re.compile(r"(\$\d+|%\(\w+\)s|:\w+|\?)")
+_PARAMETER_LIST = re.compile(r"\(\s*\?(?:\s*,\s*\?)*\s*\)")
+_WHITESPACE = re.compile(r"\s+")
+
+
+def fingerprint(statement: str) -> str:
+    """
+    Normalize SQL statement: literals and bind parameters are replaced by "?",
+    IN lists are collapsed, whitespace is squeezed.
+
+    Parameters:
+        statement (str): SQL statement.
+
+    Returns:
+        str: Normalized statement.
+    """
+    statement = _STRING_LITERAL.sub("?", statement)
+    statement = _PARAMETER.sub("?", statement)
+    statement = _NUMBER_LITERAL.sub("?", statement)
+    statement = _PARAMETER_LIST.sub("(?)", statement)
+    return _WHITESPACE.sub(" ", statement).strip()
+
+
+def fingerprint_id(normalized_statement: str) -> str:
+    """Short stable id of the normalized statement (for logs)."""
+    return hashlib.blake2b(normalized_statement.encode(), digest_size=4).hexdigest()
+
+
+@dataclass(slots=True)
+class QueryStats:
+    label: str
+    count: int = 0
+    fingerprints: Counter = field(default_factory=Counter)
+
+    def add(self, statement: str) -> None:
+        self.count += 1
+        self.fingerprints[fingerprint(statement)] += 1
+
+    def repeated(self, threshold: int = settings.DB_N_PLUS_ONE_THRESHOLD) -> list[tuple[str, int]]:
+        """
+        Return statements executed at least threshold times (N+1 candidates), the most repeated first.
+        """
+        return [(statement, count) for statement, count in self.fingerprints.most_common() if count >= threshold]
+
+    def report(self) -> str:
+        lines = [f"{self.label}: {self.count} queries"]
+        for statement, count in self.fingerprints.most_common():
+            lines.append(f"  {count}x [{fingerprint_id(statement)}] {statement}")
+        return "\n".join(lines)
+
+
+_active_stats: ContextVar[tuple[QueryStats, ...]] = ContextVar("active_query_stats", default=())
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany) -> None:
+    # SQLAlchemy runs sync code of AsyncSession in a greenlet which shares the context of the caller task
+    for stats in _active_stats.get():
+        stats.add(statement)
+
+
+def install_query_stats(engine: AsyncEngine) -> None:
+    """
+    Install statement counting on the engine.
+
+    Parameters:
+        engine (AsyncEngine): The engine.
+    """
+
+    if not event.contains(engine.sync_engine, "before_cursor_execute", _before_cursor_execute):
+        event.listen(engine.sync_engine, "before_cursor_execute", _before_cursor_execute)
+        logger.debug(f"Query stats are installed on engine {engine.url.render_as_string(hide_password=True)}")
+
+
+@contextmanager
+def collect_queries(label: str, warn_n_plus_one: bool = True) -> Iterator[QueryStats]:
+    """
+    Count statements executed inside the block (including nested blocks, which are counted too).
+
+    Parameters:
+        label (str): Name of the block (update, handler, crud call...).
+        warn_n_plus_one (bool): Log repeated statements as N+1 patterns on exit.
+
+    Yields:
+        QueryStats: Statistics of the block.
+    """
+
+    stats = QueryStats(label=label)
+    token = _active_stats.set(_active_stats.get() + (stats,))
+    try:
+        yield stats
+    finally:
+        _active_stats.reset(token)
+
+        if warn_n_plus_one:
+            for statement, count in stats.repeated():
+                logger.warning(f"Possible N+1 in {label}: {count}x [{fingerprint_id(statement)}] {statement}")
+
+
+@contextmanager
+def max_queries(limit: int, label: str = "block") -> Iterator[QueryStats]:
+    """
+    Test helper: fail if the block executes more than limit statements.
+
+    Usage:
+        with max_queries(3, "fetch_context_messages"):
+            await fetch_context_messages(db, message)
+
+    Parameters:
+        limit (int): Maximum number of statements.
+        label (str): Name of the block for the error message.
+
+    Raises:
+        AssertionError: If the budget is exceeded.
+    """
+
+    with collect_queries(label, warn_n_plus_one=False) as stats:
+        yield stats
+
+    if stats.count > limit:
+        raise AssertionError(f"Query budget exceeded ({stats.count} > {limit})\n{stats.report()}")
+
+
+def main():
+    logger.info(START_MODULE_MESSAGE + str(__file__))
+    logger.info(MODULE_DESCRIPTION)
+    logger.info(str_object_is_created(collect_queries))
+
+
+if __name__ != "__main__":
+    main()
+
+
+if __name__ == "__main__":
+    main()
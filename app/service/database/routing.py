@@ -0,0 +1,214 @@
+# app/service/database/routing.py
+
+import asyncio
+import itertools
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Iterator
+
+from sqlalchemy import Select, text
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlalchemy.orm import Session
+
+from app.service.logging.logger import (
+    logger,
+    START_MODULE_MESSAGE,
+    str_object_is_created,
+)
+
+
+MODULE_DESCRIPTION = ("This module provides read/write routing of SQLAlchemy sessions: read-only statements go to "
+                      "healthy read replicas, everything else (and every read after a write) goes to the primary.")
+
+
+# key in Session.info: once set, all statements of the session go to the primary (read-your-writes)
+STICK_TO_PRIMARY = "stick_to_primary"
+
+
+# state shared by all sessions of a routing scope (an update): a write in one session (e.g. the own session
+# of persist_message) sends reads of the other sessions of the scope to the primary as well
+_routing_scope: ContextVar[dict | None] = ContextVar("routing_scope", default=None)
+
+
+@contextmanager
+def routing_scope() -> Iterator[None]:
+    """
+    Share read-your-writes stickiness between all sessions used inside the block
+    (DbSessionMiddleware wraps every update in it).
+    """
+
+    token = _routing_scope.set({})
+    try:
+        yield
+    finally:
+        _routing_scope.reset(token)
+
+
+POSTGRES_LAG_QUERY = text(
+    "SELECT CASE "
+    "WHEN NOT pg_is_in_recovery() THEN 0 "
+    "WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0 "
+    "ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0) "
+    "END"
+)
+
+
+class ReplicaPool:
+    """
+    Set of read replicas with lag-aware health state.
+    A replica is used only if its last measured lag is lower than max_lag_seconds.
+    """
+
+    def __init__(self, engines: list[AsyncEngine], max_lag_seconds: float, check_interval_seconds: float):
+
+        logger.debug(f"Initializing ReplicaPool with {len(engines)} replicas")
+
+        self.engines = engines
+        self.max_lag_seconds = max_lag_seconds
+        self.check_interval_seconds = check_interval_seconds
+        self.lags: dict[AsyncEngine, float | None] = {engine: None for engine in engines}
+        self._healthy: list[AsyncEngine] = []
+        self._round_robin = itertools.cycle(self._healthy)
+        self._monitor_task: asyncio.Task | None = None
+
+    def choose(self) -> AsyncEngine | None:
+        """
+        Choose a healthy replica (round-robin).
+
+        Returns:
+            AsyncEngine | None: Replica engine, or None if no replica is healthy (use the primary).
+        """
+
+        if not self._healthy:
+            return None
+
+        return next(self._round_robin)
+
+    async def measure_lag(self, engine: AsyncEngine) -> float:
+        """
+        Measure replication lag of the replica in seconds.
+        For non-PostgreSQL replicas (e.g. a local SQLite copy) lag is 0 when replica is reachable.
+        """
+
+        async with engine.connect() as conn:
+            if engine.dialect.name == "postgresql":
+                result = await conn.execute(POSTGRES_LAG_QUERY)
+                return float(result.scalar_one())
+
+            await conn.execute(text("SELECT 1"))
+            return 0.0
+
+    async def check_replicas(self) -> None:
+        """
+        Measure lag of every replica and rebuild the list of healthy ones.
+        """
+
+        healthy: list[AsyncEngine] = []
+
+        for engine in self.engines:
+            try:
+                lag = await asyncio.wait_for(self.measure_lag(engine), timeout=self.check_interval_seconds)
+            except Exception as e:
+                logger.warning(f"Replica {engine.url.render_as_string(hide_password=True)} is unavailable: {e}")
+                lag = None
+
+            self.lags[engine] = lag
+            if lag is not None and lag <= self.max_lag_seconds:
+                healthy.append(engine)
+            elif lag is not None:
+                logger.warning(f"Replica {engine.url.render_as_string(hide_password=True)} lags {lag:.2f}s, use primary")
+
+        if healthy != self._healthy:
+            logger.info(f"Healthy replicas: {len(healthy)} of {len(self.engines)}")
+
+        self._healthy = healthy
+        self._round_robin = itertools.cycle(healthy)
+
+    async def _monitor(self) -> None:
+        while True:
+            await self.check_replicas()
+            await asyncio.sleep(self.check_interval_seconds)
+
+    async def start_monitor(self) -> None:
+        """
+        Check replicas once and start periodic lag monitoring in background.
+        """
+
+        await self.check_replicas()
+        if self._monitor_task is None:
+            self._monitor_task = asyncio.create_task(self._monitor(), name="replica-lag-monitor")
+
+    async def stop_monitor(self) -> None:
+        if self._monitor_task is not None:
+            self._monitor_task.cancel()
+            self._monitor_task = None
+
+
+def make_routing_session_class(primary: AsyncEngine, replica_pool: ReplicaPool) -> type[Session]:
+    """
+    Build a sync Session class (use it as ``sync_session_class`` of ``async_sessionmaker``)
+    which routes statements between the primary and read replicas.
+
+    Parameters:
+        primary (AsyncEngine): The primary (read-write) engine.
+        replica_pool (ReplicaPool): Pool of read replicas.
+
+    Returns:
+        type[Session]: Routing session class.
+    """
+
+    class RoutingSession(Session):
+        def get_bind(self, mapper: Any = None, clause: Any = None, **kw: Any):
+            # SQLAlchemy runs sync code of AsyncSession in a greenlet which shares the context of the caller task
+            scope = _routing_scope.get()
+            if self.info.get(STICK_TO_PRIMARY) or (scope is not None and scope.get(STICK_TO_PRIMARY)):
+                return primary.sync_engine
+
+            if clause is None and not self._flushing:
+                # no statement: e.g. ``db.get_bind()`` of get_dialect_name, it is not a write
+                return primary.sync_engine
+
+            is_read_only = (
+                isinstance(clause, Select)
+                and clause._for_update_arg is None
+                and not self._flushing
+            )
+            if not is_read_only:
+                # read-your-writes: after the first write the session (and its routing scope) sticks to the primary
+                self.info[STICK_TO_PRIMARY] = True
+                if scope is not None:
+                    scope[STICK_TO_PRIMARY] = True
+                return primary.sync_engine
+
+            replica = replica_pool.choose()
+            if replica is None:
+                return primary.sync_engine
+
+            return replica.sync_engine
+
+    return RoutingSession
+
+
+def use_primary(db: Any) -> None:
+    """
+    Force all following statements of the session to go to the primary.
+
+    Parameters:
+        db (AsyncSession | Session): The database session.
+    """
+    db.info[STICK_TO_PRIMARY] = True
+
+
+def main():
+    logger.info(START_MODULE_MESSAGE + str(__file__))
+    logger.info(MODULE_DESCRIPTION)
+    logger.info(str_object_is_created(make_routing_session_class))
+    logger.info(str_object_is_created(routing_scope))
+
+
+if __name__ != "__main__":
+    main()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,166 @@
+# app/service/database/search.py
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncConnection
+
+from app.config.settings import settings
+from app.service.logging.logger import (
+    logger,
+    START_MODULE_MESSAGE,
+    str_object_is_created,
+)
+
+
+MODULE_DESCRIPTION = ("This module installs full-text search over message text: a generated tsvector column with "
+                      "GIN index for PostgreSQL and an FTS5 virtual table synced by triggers for SQLite.")
+
+
+MESSAGE_TABLE = "message"
+SQLITE_FTS_TABLE = "message_fts"
+POSTGRES_TSV_COLUMN = "text_tsv"
+# stable integer key of a message for FTS5 (the implicit rowid of a table with a UUID primary key
+# may change on VACUUM): assigned on insert from a one-row counter table, never reused
+SQLITE_FTS_ROWID_COLUMN = "fts_rowid"
+# the counter is incremented by the insert trigger, inside the writing transaction: SQLite lets one writer
+# at a time change the database file, so concurrent writers (processes sharing the file) get distinct keys;
+# the cost per insert is constant (no max() over the table)
+SQLITE_FTS_SEQUENCE_TABLE = "message_fts_sequence"
+
+
+POSTGRES_STATEMENTS = (
+    f"ALTER TABLE {MESSAGE_TABLE} ADD COLUMN IF NOT EXISTS {POSTGRES_TSV_COLUMN} tsvector "
+    f"GENERATED ALWAYS AS (to_tsvector('{settings.FULL_TEXT_SEARCH_CONFIG}', coalesce(text, ''))) STORED",
+    f"CREATE INDEX IF NOT EXISTS ix_{MESSAGE_TABLE}_{POSTGRES_TSV_COLUMN} "
+    f"ON {MESSAGE_TABLE} USING GIN ({POSTGRES_TSV_COLUMN})",
+)
+
+
+SQLITE_TRIGGERS = (f"{SQLITE_FTS_TABLE}_ai", f"{SQLITE_FTS_TABLE}_ad", f"{SQLITE_FTS_TABLE}_au")
+
+SQLITE_STATEMENTS = (
+    f"CREATE UNIQUE INDEX IF NOT EXISTS ix_{MESSAGE_TABLE}_{SQLITE_FTS_ROWID_COLUMN} "
+    f"ON {MESSAGE_TABLE} ({SQLITE_FTS_ROWID_COLUMN})",
+    f"CREATE VIRTUAL TABLE IF NOT EXISTS {SQLITE_FTS_TABLE} USING fts5("
+    f"text, content='{MESSAGE_TABLE}', content_rowid='{SQLITE_FTS_ROWID_COLUMN}', "
+    f"tokenize='unicode61 remove_diacritics 2')",
+    f"CREATE TRIGGER IF NOT EXISTS {SQLITE_FTS_TABLE}_ai AFTER INSERT ON {MESSAGE_TABLE} BEGIN "
+    f"UPDATE {SQLITE_FTS_SEQUENCE_TABLE} SET value = value + 1; "
+    f"UPDATE {MESSAGE_TABLE} SET {SQLITE_FTS_ROWID_COLUMN} = "
+    f"(SELECT value FROM {SQLITE_FTS_SEQUENCE_TABLE}) WHERE rowid = new.rowid; "
+    f"INSERT INTO {SQLITE_FTS_TABLE}(rowid, text) "
+    f"SELECT {SQLITE_FTS_ROWID_COLUMN}, text FROM {MESSAGE_TABLE} WHERE rowid = new.rowid; END",
+    f"CREATE TRIGGER IF NOT EXISTS {SQLITE_FTS_TABLE}_ad AFTER DELETE ON {MESSAGE_TABLE} BEGIN "
+    f"INSERT INTO {SQLITE_FTS_TABLE}({SQLITE_FTS_TABLE}, rowid, text) "
+    f"VALUES ('delete', old.{SQLITE_FTS_ROWID_COLUMN}, old.text); END",
+    f"CREATE TRIGGER IF NOT EXISTS {SQLITE_FTS_TABLE}_au AFTER UPDATE OF text ON {MESSAGE_TABLE} BEGIN "
+    f"INSERT INTO {SQLITE_FTS_TABLE}({SQLITE_FTS_TABLE}, rowid, text) "
+    f"VALUES ('delete', old.{SQLITE_FTS_ROWID_COLUMN}, old.text); "
+    f"INSERT INTO {SQLITE_FTS_TABLE}(rowid, text) VALUES (new.{SQLITE_FTS_ROWID_COLUMN}, new.text); END",
+)
+
+
+async def _install_sqlite_key(conn: AsyncConnection) -> bool:
+    """
+    Add the stable key column to the message table (numbered in insertion order for stored messages) and its
+    counter, replace the insert trigger of previous versions which assigned the key as max + 1,
+    and drop the FTS5 table and triggers of previous versions which were keyed by the implicit rowid.
+
+    Returns:
+        bool: True if the FTS5 table has to be (re)built.
+    """
+
+    result = await conn.execute(text(f"SELECT name FROM pragma_table_info('{MESSAGE_TABLE}')"))
+    if SQLITE_FTS_ROWID_COLUMN not in set(result.scalars().all()):
+        await conn.execute(text(f"ALTER TABLE {MESSAGE_TABLE} ADD COLUMN {SQLITE_FTS_ROWID_COLUMN} INTEGER"))
+        await conn.execute(text(f"UPDATE {MESSAGE_TABLE} SET {SQLITE_FTS_ROWID_COLUMN} = rowid"))
+
+    await conn.execute(text(f"CREATE TABLE IF NOT EXISTS {SQLITE_FTS_SEQUENCE_TABLE} (value INTEGER NOT NULL)"))
+    await conn.execute(text(
+        f"INSERT INTO {SQLITE_FTS_SEQUENCE_TABLE}(value) "
+        f"SELECT coalesce(max({SQLITE_FTS_ROWID_COLUMN}), 0) FROM {MESSAGE_TABLE} "
+        f"WHERE NOT EXISTS (SELECT 1 FROM {SQLITE_FTS_SEQUENCE_TABLE})"
+    ))
+
+    result = await conn.execute(
+        text("SELECT sql FROM sqlite_master WHERE type = 'trigger' AND name = :name"),
+        {"name": f"{SQLITE_FTS_TABLE}_ai"},
+    )
+    insert_trigger_sql = result.scalar_one_or_none()
+    if insert_trigger_sql is not None and SQLITE_FTS_SEQUENCE_TABLE not in insert_trigger_sql:
+        # recreated by SQLITE_STATEMENTS
+        await conn.execute(text(f"DROP TRIGGER {SQLITE_FTS_TABLE}_ai"))
+
+    result = await conn.execute(
+        text("SELECT sql FROM sqlite_master WHERE type = 'table' AND name = :name"),
+        {"name": SQLITE_FTS_TABLE},
+    )
+    fts_table_sql = result.scalar_one_or_none()
+    if fts_table_sql is None:
+        return True
+    if SQLITE_FTS_ROWID_COLUMN in fts_table_sql:
+        return False
+
+    logger.info(f"Full-text search table {SQLITE_FTS_TABLE} is keyed by rowid, it is rebuilt")
+    for trigger in SQLITE_TRIGGERS:
+        await conn.execute(text(f"DROP TRIGGER IF EXISTS {trigger}"))
+    await conn.execute(text(f"DROP TABLE {SQLITE_FTS_TABLE}"))
+    return True
+
+
+async def install_full_text_search(conn: AsyncConnection) -> None:
+    """
+    Create full-text search structures for the message table (idempotent).
+    Must be called after the message table is created.
+
+    Parameters:
+        conn (AsyncConnection): Connection in a transaction (e.g. from ``engine.begin()``).
+    """
+
+    dialect_name = conn.dialect.name
+
+    if dialect_name == "postgresql":
+        for statement in POSTGRES_STATEMENTS:
+            await conn.execute(text(statement))
+
+    elif dialect_name == "sqlite":
+        rebuild = await _install_sqlite_key(conn)
+
+        for statement in SQLITE_STATEMENTS:
+            await conn.execute(text(statement))
+
+        if rebuild:
+            # index messages which were stored before full-text search was installed
+            await conn.execute(text(f"INSERT INTO {SQLITE_FTS_TABLE}({SQLITE_FTS_TABLE}) VALUES ('rebuild')"))
+
+    else:
+        logger.warning(f"Full-text search is not supported for dialect {dialect_name}")
+        return
+
+    logger.info(f"Full-text search is installed for dialect {dialect_name}")
+
+
+def to_fts5_query(query: str) -> str:
+    """
+    Convert user input to a safe FTS5 query: every word is quoted, words are combined with AND.
+
+    Parameters:
+        query (str): User search query.
+
+    Returns:
+        str: FTS5 MATCH expression.
+    """
+    return " ".join('"' + word.replace('"', '""') + '"' for word in query.split())
+
+
+def main():
+    logger.info(START_MODULE_MESSAGE + str(__file__))
+    logger.info(MODULE_DESCRIPTION)
+    logger.info(str_object_is_created(install_full_text_search))
+
+
+if __name__ != "__main__":
+    main()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+# app/service/database/tracing.py
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from app.service.database.query_stats import fingerprint
+from app.service.tracing.tracer import tracer
+from app.service.logging.logger import (
+    logger,
+    START_MODULE_MESSAGE,
+    str_object_is_created,
+)
+
+
+MODULE_DESCRIPTION = "This module traces SQL statements: a span per statement in the sampled trace of the update."
+
+
+SPANS_KEY = "trace_spans"
+STATEMENT_MAX_LENGTH = 500
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany) -> None:
+    # a stack per connection: start and end of a statement are separate events; None is pushed too,
+    # so pushes and pops always match
+    span = tracer.start_span("sql")
+    if span is not None:
+        span.set_attribute("db.statement", fingerprint(statement)[:STATEMENT_MAX_LENGTH])
+        span.set_attribute("db.system", conn.dialect.name)
+        if executemany:
+            span.set_attribute("db.executemany", True)
+    conn.info.setdefault(SPANS_KEY, []).append(span)
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany) -> None:
+    spans = conn.info.get(SPANS_KEY)
+    if not spans:
+        return
+    span = spans.pop()
+    if span is not None and cursor.rowcount is not None and cursor.rowcount >= 0:
+        span.set_attribute("db.rowcount", cursor.rowcount)
+    tracer.end_span(span)
+
+
+def _handle_error(exception_context) -> None:
+    conn = exception_context.connection
+    spans = conn.info.get(SPANS_KEY) if conn is not None else None
+    if not spans:
+        return
+    tracer.end_span(spans.pop(), exception_context.original_exception)
+
+
+def install_sql_tracing(engine: AsyncEngine) -> None:
+    """
+    Install statement spans on the engine.
+
+    Parameters:
+        engine (AsyncEngine): The engine.
+    """
+
+    sync_engine = engine.sync_engine
+    if not event.contains(sync_engine, "before_cursor_execute", _before_cursor_execute):
+        event.listen(sync_engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(sync_engine, "after_cursor_execute", _after_cursor_execute)
+        event.listen(sync_engine, "handle_error", _handle_error)
+        logger.debug(f"SQL tracing is installed on engine {engine.url.render_as_string(hide_password=True)}")
+
+
+def main():
+    logger.info(START_MODULE_MESSAGE + str(__file__))
+    logger.info(MODULE_DESCRIPTION)
+    logger.info(str_object_is_created(install_sql_tracing))
+
+
+if __name__ != "__main__":
+    main()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,125 @@
+# app/service/diagnostics/loop_monitor.py
+
+import asyncio
+import sys
+import threading
+import time
+import traceback
+
+from app.config.settings import settings
+from app.service.logging.logger import (
+    logger,
+    START_MODULE_MESSAGE,
+    str_object_is_created,
+)
+
+
+MODULE_DESCRIPTION = ("This module measures event loop lag continuously and logs the stack of code "
+                      "which blocks the loop (sync call inside a coroutine, lock contention and so on).")
+
+
+class LoopLagMonitor:
+    """
+    Heartbeat coroutine measures how late the loop wakes it up (lag).
+    Watchdog thread notices when heartbeats stop and logs the current stack of the loop thread.
+    """
+
+    def __init__(
+        self,
+        interval_seconds: float = settings.LOOP_LAG_CHECK_INTERVAL_SECONDS,
+        warning_seconds: float = settings.LOOP_LAG_WARNING_SECONDS,
+        stall_seconds: float = settings.LOOP_STALL_STACK_SECONDS,
+    ):
+
+        logger.debug("Initializing LoopLagMonitor")
+
+        self.interval_seconds = interval_seconds
+        self.warning_seconds = warning_seconds
+        self.stall_seconds = stall_seconds
+
+        self.last_lag = 0.0
+        self.max_lag = 0.0
+        self.average_lag = 0.0
+        self.stalls = 0
+
+        self._last_heartbeat = time.monotonic()
+        self._loop_thread_id: int | None = None
+        self._task: asyncio.Task | None = None
+        self._watchdog: threading.Thread | None = None
+        self._stopped = threading.Event()
+
+    def stats(self) -> dict:
+        return {
+            "last_lag_ms": round(self.last_lag * 1000, 1),
+            "average_lag_ms": round(self.average_lag * 1000, 1),
+            "max_lag_ms": round(self.max_lag * 1000, 1),
+            "stalls": self.stalls,
+        }
+
+    async def _heartbeat(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            expected = loop.time() + self.interval_seconds
+            await asyncio.sleep(self.interval_seconds)
+            lag = max(0.0, loop.time() - expected)
+
+            self._last_heartbeat = time.monotonic()
+            self.last_lag = lag
+            self.max_lag = max(self.max_lag, lag)
+            # exponential moving average
+            self.average_lag += (lag - self.average_lag) * 0.1
+
+            if lag >= self.warning_seconds:
+                logger.warning(f"Event loop lag: {lag * 1000:.1f}ms")
+
+    def _watch(self) -> None:
+        reported_heartbeat = None
+        while not self._stopped.wait(self.stall_seconds / 2):
+            heartbeat = self._last_heartbeat
+            stalled_for = time.monotonic() - heartbeat - self.interval_seconds
+            if stalled_for < self.stall_seconds or heartbeat == reported_heartbeat:
+                continue
+
+            reported_heartbeat = heartbeat
+            self.stalls += 1
+            frame = sys._current_frames().get(self._loop_thread_id)
+            stack = "".join(traceback.format_stack(frame)) if frame is not None else "<no stack>"
+            logger.warning(f"Event loop is blocked for {stalled_for:.2f}s, loop thread stack:\n{stack}")
+
+    def start(self) -> None:
+        """Start monitoring of the running loop."""
+
+        if self._task is not None:
+            return
+
+        self._loop_thread_id = threading.get_ident()
+        self._last_heartbeat = time.monotonic()
+        self._stopped.clear()
+        self._task = asyncio.create_task(self._heartbeat(), name="loop-lag-monitor")
+        self._watchdog = threading.Thread(target=self._watch, name="loop-lag-watchdog", daemon=True)
+        self._watchdog.start()
+
+        logger.info("Event loop lag monitor is started")
+
+    def stop(self) -> None:
+        self._stopped.set()
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+
+loop_lag_monitor = LoopLagMonitor()
+
+
+def main():
+    logger.info(START_MODULE_MESSAGE + str(__file__))
+    logger.info(MODULE_DESCRIPTION)
+    logger.info(str_object_is_created(loop_lag_monitor))
+
+
+if __name__ != "__main__":
+    main()
+
+
+if __name__ == "__main__":
+    main()
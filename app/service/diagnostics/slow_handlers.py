@@ -0,0 +1,76 @@
+# app/service/diagnostics/slow_handlers.py
+
+import heapq
+import itertools
+import time
+from dataclasses import dataclass, field
+
+from app.config.settings import settings
+from app.service.logging.logger import (
+    logger,
+    START_MODULE_MESSAGE,
+    str_object_is_created,
+)
+
+
+MODULE_DESCRIPTION = "This module keeps a bounded buffer of the slowest handler calls for diagnostics."
+
+
+@dataclass(slots=True, order=True)
+class HandlerCall:
+    duration: float
+    # tie-breaker, so the rest fields are never compared
+    sequence: int
+    handler: str = field(compare=False)
+    update_id: int | None = field(compare=False, default=None)
+    chat_id: int | None = field(compare=False, default=None)
+    finished_at: float = field(compare=False, default_factory=time.time)
+
+
+class SlowHandlersRecorder:
+    def __init__(self, size: int = settings.SLOW_HANDLERS_BUFFER_SIZE):
+
+        logger.debug("Initializing SlowHandlersRecorder")
+
+        self.size = size
+        # min-heap: the fastest of the kept calls is evicted first
+        self._heap: list[HandlerCall] = []
+        self._sequence = itertools.count()
+
+    def record(self, handler: str, duration: float, update_id: int | None = None, chat_id: int | None = None) -> None:
+        if len(self._heap) >= self.size and duration <= self._heap[0].duration:
+            return
+
+        call = HandlerCall(duration, next(self._sequence), handler, update_id, chat_id)
+        if len(self._heap) < self.size:
+            heapq.heappush(self._heap, call)
+        else:
+            heapq.heapreplace(self._heap, call)
+
+    def slowest(self, limit: int | None = None) -> list[HandlerCall]:
+        """Return kept calls, the slowest first."""
+        return sorted(self._heap, reverse=True)[:limit]
+
+    def report(self, limit: int = 10) -> str:
+        lines = [
+            f"{call.duration * 1000:.1f}ms {call.handler} update_id={call.update_id} chat_id={call.chat_id}"
+            for call in self.slowest(limit)
+        ]
+        return "\n".join(lines) or "no handler calls recorded"
+
+
+slow_handlers_recorder = SlowHandlersRecorder()
+
+
+def main():
+    logger.info(START_MODULE_MESSAGE + str(__file__))
+    logger.info(MODULE_DESCRIPTION)
+    logger.info(str_object_is_created(slow_handlers_recorder))
+
+
+if __name__ != "__main__":
+    main()
+
+
+if __name__ == "__main__":
+    main()
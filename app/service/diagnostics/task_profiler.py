@@ -0,0 +1,122 @@
+# app/service/diagnostics/task_profiler.py
+
+import asyncio
+import signal
+import time
+from collections import Counter
+
+from app.config.settings import settings
+from app.service.diagnostics.loop_monitor import loop_lag_monitor
+from app.service.diagnostics.slow_handlers import slow_handlers_recorder
+from app.service.logging.logger import (
+    logger,
+    START_MODULE_MESSAGE,
+    str_object_is_created,
+)
+
+
+MODULE_DESCRIPTION = ("This module samples stacks of running asyncio tasks on demand (admin command or SIGUSR1) "
+                      "and aggregates them into a profile, without restarting the process.")
+
+
+STACK_DEPTH = 8
+
+
+def _task_stack_key(task: asyncio.Task) -> str:
+    frames = task.get_stack(limit=STACK_DEPTH)
+    if not frames:
+        return f"{task.get_name()}: <not started>"
+
+    # innermost frame first: it is where the task is suspended right now
+    parts = [f"{frame.f_code.co_name} ({frame.f_code.co_filename}:{frame.f_lineno})" for frame in reversed(frames)]
+    return f"{task.get_name()}: " + " <- ".join(parts)
+
+
+async def sample_tasks(
+    duration_seconds: float,
+    interval_seconds: float = settings.PROFILE_SAMPLE_INTERVAL_SECONDS,
+) -> tuple[Counter, int]:
+    """
+    Sample stacks of all running tasks.
+
+    Parameters:
+        duration_seconds (float): Sampling duration.
+        interval_seconds (float): Interval between samples.
+
+    Returns:
+        tuple[Counter, int]: Stack -> number of samples, and total number of samples.
+    """
+
+    current_task = asyncio.current_task()
+    profile: Counter = Counter()
+    samples = 0
+    deadline = time.monotonic() + duration_seconds
+
+    while time.monotonic() < deadline:
+        for task in asyncio.all_tasks():
+            if task is not current_task:
+                profile[_task_stack_key(task)] += 1
+        samples += 1
+        await asyncio.sleep(interval_seconds)
+
+    return profile, samples
+
+
+async def build_profile_report(duration_seconds: float = 2.0, limit: int = 20) -> str:
+    """
+    Sample running tasks and build a text report with loop lag and the slowest handlers.
+    """
+
+    profile, samples = await sample_tasks(duration_seconds)
+
+    lines = [
+        f"Loop lag: {loop_lag_monitor.stats()}",
+        f"Tasks profile ({samples} samples in {duration_seconds}s):",
+    ]
+    for stack, count in profile.most_common(limit):
+        lines.append(f"{count * 100 / max(samples, 1):5.1f}% {stack}")
+
+    lines.append("Slowest handlers:")
+    lines.append(slow_handlers_recorder.report())
+
+    return "\n".join(lines)
+
+
+async def dump_profile(duration_seconds: float = 2.0) -> None:
+    """Sample running tasks and write the report to log."""
+
+    report = await build_profile_report(duration_seconds)
+    logger.info(f"Async tasks profile:\n{report}")
+
+
+def install_profile_signal_handler(sig: int = getattr(signal, "SIGUSR1", 0)) -> None:
+    """
+    Dump profile to log on signal (``kill -USR1 <pid>``). Not available on Windows.
+    """
+
+    if not sig:
+        logger.warning("Profile signal is not supported on this platform")
+        return
+
+    loop = asyncio.get_running_loop()
+    try:
+        loop.add_signal_handler(sig, lambda: asyncio.ensure_future(dump_profile()))
+    except (NotImplementedError, RuntimeError) as e:
+        logger.warning(f"Failed to install profile signal handler: {e}")
+        return
+
+    logger.info(f"Profile signal handler is installed: {signal.Signals(sig).name}")
+
+
+def main():
+    logger.info(START_MODULE_MESSAGE + str(__file__))
+    logger.info(MODULE_DESCRIPTION)
+    logger.info(str_object_is_created(build_profile_report))
+
+
+if __name__ != "__main__":
+    main()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,172 @@
+# app/service/keywords/aho_corasick.py
+
+from collections import deque
+from typing import Iterator
+
+from app.service.logging.logger import (
+    logger,
+    START_MODULE_MESSAGE,
+    str_object_is_created,
+)
+
+
+MODULE_DESCRIPTION = ("This module stores Aho-Corasick automaton: multi-pattern matching of many keywords "
+                      "in one linear pass over the text.")
+
+
+ROOT = 0
+NO_NODE = -1
+
+
+def normalize(text: str) -> str:
+    """Normalize text and patterns in the same way (case-insensitive matching)."""
+    return text.casefold()
+
+
+class AhoCorasickAutomaton:
+    """
+    Automaton over normalized patterns.
+    Patterns are added in batches: ``add`` only queues a pattern, ``compile`` inserts the queued patterns
+    into the trie and recomputes failure links once for the whole batch (linear in total length of patterns).
+    Searches never compile: until ``compile`` is called they use the automaton of the previous batch,
+    so a stream of additions does not make every search rebuild the automaton.
+    """
+
+    __slots__ = ("_goto", "_fail", "_terminal", "_output_link", "_patterns", "_pattern_ids", "_pending")
+
+    def __init__(self):
+        self._goto: list[dict[str, int]] = [{}]
+        self._fail: list[int] = [ROOT]
+        # id of the pattern which ends in the node
+        self._terminal: list[int] = [NO_NODE]
+        # the nearest node in the failure chain where some pattern ends
+        self._output_link: list[int] = [NO_NODE]
+        self._patterns: list[str] = []
+        self._pattern_ids: dict[str, int] = {}
+        # ids of patterns added after the last compile
+        self._pending: list[int] = []
+
+    def __len__(self) -> int:
+        return len(self._patterns)
+
+    @property
+    def pending(self) -> int:
+        """Number of patterns which are not searched until the next ``compile``."""
+        return len(self._pending)
+
+    def pattern(self, pattern_id: int) -> str:
+        return self._patterns[pattern_id]
+
+    def add(self, pattern: str) -> int:
+        """
+        Queue pattern for the next ``compile``.
+
+        Parameters:
+            pattern (str): The pattern (keyword).
+
+        Returns:
+            int: Id of the pattern (the same for an already added pattern).
+        """
+
+        pattern = normalize(pattern.strip())
+        if not pattern:
+            raise ValueError("Pattern must not be empty")
+
+        pattern_id = self._pattern_ids.get(pattern)
+        if pattern_id is not None:
+            return pattern_id
+
+        pattern_id = len(self._patterns)
+        self._patterns.append(pattern)
+        self._pattern_ids[pattern] = pattern_id
+        self._pending.append(pattern_id)
+
+        return pattern_id
+
+    def _insert(self, pattern_id: int) -> None:
+        node = ROOT
+        for char in self._patterns[pattern_id]:
+            next_node = self._goto[node].get(char)
+            if next_node is None:
+                next_node = len(self._goto)
+                self._goto.append({})
+                self._fail.append(ROOT)
+                self._terminal.append(NO_NODE)
+                self._output_link.append(NO_NODE)
+                self._goto[node][char] = next_node
+            node = next_node
+
+        self._terminal[node] = pattern_id
+
+    def compile(self) -> None:
+        """
+        Insert queued patterns and compute failure and output links
+        (BFS over the trie, linear in total length of patterns). Does nothing if no pattern is queued.
+        """
+
+        if not self._pending:
+            return
+
+        pending, self._pending = self._pending, []
+        for pattern_id in pending:
+            self._insert(pattern_id)
+
+        goto, fail, terminal, output_link = self._goto, self._fail, self._terminal, self._output_link
+
+        queue: deque[int] = deque()
+        for child in goto[ROOT].values():
+            fail[child] = ROOT
+            output_link[child] = NO_NODE
+            queue.append(child)
+
+        while queue:
+            node = queue.popleft()
+            for char, child in goto[node].items():
+                state = fail[node]
+                while state != ROOT and char not in goto[state]:
+                    state = fail[state]
+                fallback = goto[state].get(char, ROOT)
+                fail[child] = fallback if fallback != child else ROOT
+                output_link[child] = fail[child] if terminal[fail[child]] != NO_NODE else output_link[fail[child]]
+                queue.append(child)
+
+        logger.debug(f"Aho-Corasick automaton compiled: patterns={len(self._patterns)} "
+                     f"({len(pending)} new), nodes={len(goto)}")
+
+    def iter_matches(self, text: str) -> Iterator[tuple[int, int]]:
+        """
+        Find all occurrences of compiled patterns in normalized text.
+
+        Parameters:
+            text (str): Normalized text (see ``normalize``).
+
+        Yields:
+            tuple[int, int]: (end index exclusive, pattern id).
+        """
+
+        goto, fail, terminal, output_link = self._goto, self._fail, self._terminal, self._output_link
+
+        node = ROOT
+        for index, char in enumerate(text):
+            while node != ROOT and char not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(char, ROOT)
+
+            match_node = node if terminal[node] != NO_NODE else output_link[node]
+            while match_node != NO_NODE:
+                yield index + 1, terminal[match_node]
+                match_node = output_link[match_node]
+
+
+def main():
+    logger.info(START_MODULE_MESSAGE + str(__file__))
+    logger.info(MODULE_DESCRIPTION)
+    logger.info(str_object_is_created(AhoCorasickAutomaton()))
+
+
+if __name__ != "__main__":
+    main()
+
+
+if __name__ == "__main__":
+    main()
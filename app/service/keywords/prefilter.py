@@ -0,0 +1,154 @@
+# app/service/keywords/prefilter.py
+
+from typing import Any, Iterable
+from uuid import UUID
+
+from app.service.keywords.aho_corasick import AhoCorasickAutomaton, normalize
+from app.service.logging.logger import (
+    logger,
+    START_MODULE_MESSAGE,
+    str_object_is_created,
+)
+
+
+MODULE_DESCRIPTION = ("This module stores keyword prefilter over enabled message themes. It tags a message with "
+                      "candidate themes in one pass, so the expensive classifier can be skipped or narrowed.")
+
+
+class ThemeKeywordPrefilter:
+    def __init__(self):
+
+        logger.debug("Initializing ThemeKeywordPrefilter")
+
+        self._automaton = AhoCorasickAutomaton()
+        self._pattern_themes: dict[int, set[UUID]] = {}
+        self._theme_patterns: dict[UUID, set[int]] = {}
+
+        self.messages_checked = 0
+        self.messages_matched = 0
+
+    @property
+    def themes_count(self) -> int:
+        return len(self._theme_patterns)
+
+    def stats(self) -> dict[str, int]:
+        return {
+            "themes": self.themes_count,
+            "keywords": len(self._automaton),
+            "messages_checked": self.messages_checked,
+            "messages_matched": self.messages_matched,
+        }
+
+    def add_theme_keywords(self, theme_uuid: UUID, keywords: Iterable[str], compile_now: bool = True) -> None:
+        """
+        Add keywords of the theme (other themes are untouched).
+        The keywords are one batch of the automaton: it is compiled once for them, not on every search.
+
+        Parameters:
+            theme_uuid (UUID): The uuid of the theme.
+            keywords (Iterable[str]): Keywords to add.
+            compile_now (bool): Compile the automaton now; pass False to add several themes as one batch
+                and call ``compile`` after the last one.
+        """
+
+        theme_patterns = self._theme_patterns.setdefault(theme_uuid, set())
+
+        for keyword in keywords:
+            if not keyword or not keyword.strip():
+                continue
+            pattern_id = self._automaton.add(keyword)
+            theme_patterns.add(pattern_id)
+            self._pattern_themes.setdefault(pattern_id, set()).add(theme_uuid)
+
+        if compile_now:
+            self.compile()
+
+        logger.debug(f"Keyword prefilter: theme {theme_uuid} has {len(theme_patterns)} keywords")
+
+    def compile(self) -> None:
+        """Make keywords added with ``compile_now=False`` searchable."""
+        self._automaton.compile()
+
+    def remove_theme(self, theme_uuid: UUID) -> None:
+        """
+        Remove the theme (e.g. disabled). Its keywords stay in the automaton but no longer map to the theme.
+
+        Parameters:
+            theme_uuid (UUID): The uuid of the theme.
+        """
+
+        for pattern_id in self._theme_patterns.pop(theme_uuid, set()):
+            self._pattern_themes[pattern_id].discard(theme_uuid)
+
+    def rebuild(self, themes: Iterable[Any]) -> None:
+        """
+        Rebuild the prefilter from scratch.
+
+        Parameters:
+            themes (Iterable[MessageTheme]): Enabled message themes (objects with ``uuid`` and ``keywords``).
+        """
+
+        self._automaton = AhoCorasickAutomaton()
+        self._pattern_themes = {}
+        self._theme_patterns = {}
+
+        for theme in themes:
+            self.add_theme_keywords(theme.uuid, theme.keywords or [], compile_now=False)
+        self.compile()
+
+        logger.info(f"Keyword prefilter is rebuilt: themes={self.themes_count}, keywords={len(self._automaton)}")
+
+    def match(self, text: str | None) -> dict[UUID, set[str]]:
+        """
+        Find candidate themes of the text. Keyword matches only on word boundaries.
+
+        Parameters:
+            text (str | None): Message text.
+
+        Returns:
+            dict[UUID, set[str]]: Candidate theme uuid -> matched keywords.
+        """
+
+        candidates: dict[UUID, set[str]] = {}
+        if not text or not self._pattern_themes:
+            return candidates
+
+        self.messages_checked += 1
+        normalized_text = normalize(text)
+        text_length = len(normalized_text)
+
+        for end, pattern_id in self._automaton.iter_matches(normalized_text):
+            theme_uuids = self._pattern_themes.get(pattern_id)
+            if not theme_uuids:
+                continue
+
+            keyword = self._automaton.pattern(pattern_id)
+            start = end - len(keyword)
+            if start > 0 and normalized_text[start - 1].isalnum():
+                continue
+            if end < text_length and normalized_text[end].isalnum():
+                continue
+
+            for theme_uuid in theme_uuids:
+                candidates.setdefault(theme_uuid, set()).add(keyword)
+
+        if candidates:
+            self.messages_matched += 1
+        return candidates
+
+
+keyword_prefilter = ThemeKeywordPrefilter()
+
+
+def main():
+    logger.info(START_MODULE_MESSAGE + str(__file__))
+    logger.info(MODULE_DESCRIPTION)
+    logger.info(str_object_is_created(keyword_prefilter))
+
+
+if __name__ != "__main__":
+    main()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+# app/service/lifecycle/shutdown.py
+
+import asyncio
+import time
+from typing import Awaitable, Callable
+
+from app.service.logging.logger import (
+    logger,
+    START_MODULE_MESSAGE,
+    str_object_is_created,
+)
+
+
+MODULE_DESCRIPTION = ("This module stores registry of flush hooks. Components which buffer work in memory "
+                      "(pending DB writes, aggregations and so on) register a hook to be flushed on shutdown.")
+
+
+FlushHook = Callable[[], Awaitable[None]]
+
+
+_flush_hooks: list[tuple[str, FlushHook]] = []
+
+
+def register_flush_hook(name: str, hook: FlushHook) -> None:
+    """
+    Register coroutine function which flushes buffered work on shutdown.
+
+    Parameters:
+        name (str): Human readable name of the hook (for logs).
+        hook (FlushHook): Coroutine function without arguments.
+    """
+
+    logger.debug(f"Registering flush hook: {name}")
+
+    _flush_hooks.append((name, hook))
+
+
+async def run_flush_hooks(timeout: float) -> None:
+    """
+    Run all registered flush hooks in registration order, sharing one deadline.
+
+    Parameters:
+        timeout (float): Total time in seconds for all hooks.
+    """
+
+    deadline = time.monotonic() + timeout
+
+    for name, hook in _flush_hooks:
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            logger.error(f"Shutdown deadline exceeded, flush hook '{name}' is skipped")
+            continue
+
+        try:
+            await asyncio.wait_for(hook(), timeout=remaining)
+            logger.info(f"Flush hook '{name}' completed")
+        except asyncio.TimeoutError:
+            logger.error(f"Flush hook '{name}' timed out")
+        except Exception as e:
+            logger.error(f"Flush hook '{name}' failed: {e}")
+
+
+def main():
+    logger.info(START_MODULE_MESSAGE + str(__file__))
+    logger.info(MODULE_DESCRIPTION)
+    logger.info(str_object_is_created(run_flush_hooks))
+
+
+if __name__ != "__main__":
+    main()
+
+
+if __name__ == "__main__":
+    main()
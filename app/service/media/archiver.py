@@ -0,0 +1,390 @@
+# app/service/media/archiver.py
+
+import asyncio
+import hashlib
+import os
+from collections import OrderedDict
+from contextlib import aclosing
+from dataclasses import dataclass
+from datetime import datetime
+from pathlib import Path
+from typing import Any, AsyncIterator, Callable, IO
+from uuid import uuid4
+
+from aiogram import Bot
+from aiogram.types import Message as AiogramMessage
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config.settings import settings
+from app.service.database.circuit_breaker import CircuitBreaker, CircuitOpenError, db_circuit_breaker
+from app.service.database.crud.message_media import get_media_by_file_unique_id, save_message_media
+from app.service.database.database import get_session
+from app.service.lifecycle.shutdown import register_flush_hook
+from app.service.media.bandwidth import BandwidthLimiter
+from app.service.logging.logger import (
+    logger,
+    START_MODULE_MESSAGE,
+    str_object_is_created,
+)
+
+
+MODULE_DESCRIPTION = ("This module archives media of messages: files are streamed to local disk in chunks "
+                      "(bounded concurrency and bandwidth), stored once per content hash, and referenced "
+                      "from the message_media table.")
+
+
+MEDIA_KINDS = ("photo", "document", "video", "animation", "audio", "voice", "video_note", "sticker")
+TEMP_DIR = "tmp"
+KNOWN_FILES_CACHE_SIZE = 10_000
+
+
+@dataclass(slots=True, frozen=True)
+class MediaRef:
+    kind: str
+    file_id: str
+    file_unique_id: str
+    size: int | None
+    mime_type: str | None
+
+
+@dataclass(slots=True)
+class MediaJob:
+    bot: Bot
+    chat_id: int
+    message_id: int
+    refs: list[MediaRef]
+
+
+def parse_media_kinds(value: str) -> frozenset[str]:
+    kinds = frozenset(kind.strip() for kind in value.split(",") if kind.strip())
+    unknown = kinds - set(MEDIA_KINDS)
+    if unknown:
+        logger.warning(f"Unknown media kinds are ignored: {sorted(unknown)}")
+    return kinds & set(MEDIA_KINDS)
+
+
+def extract_media(message: AiogramMessage, kinds: frozenset[str] = frozenset(MEDIA_KINDS)) -> list[MediaRef]:
+    """
+    Files of the message: the largest size of a photo, other media as is.
+    An animation is also sent as a document: the same file is listed once.
+    """
+
+    refs: dict[str, MediaRef] = {}
+
+    if "photo" in kinds and message.photo:
+        photo = message.photo[-1]
+        refs[photo.file_unique_id] = MediaRef("photo", photo.file_id, photo.file_unique_id, photo.file_size,
+                                              "image/jpeg")
+
+    for kind in MEDIA_KINDS[1:]:
+        media = getattr(message, kind) if kind in kinds else None
+        if media is not None and media.file_unique_id not in refs:
+            refs[media.file_unique_id] = MediaRef(kind, media.file_id, media.file_unique_id, media.file_size,
+                                                  getattr(media, "mime_type", None))
+
+    return list(refs.values())
+
+
+def content_path(directory: Path, sha256: str) -> Path:
+    return directory / sha256[:2] / sha256
+
+
+class MediaArchiver:
+    """
+    ``submit`` only queues the message (handlers do not wait for downloads); ``concurrency`` workers
+    download files. Deduplication:
+    - by Telegram file_unique_id (the same sticker / forwarded file): not downloaded again,
+    - by content hash (the same bytes uploaded twice): downloaded, but stored once.
+    """
+
+    def __init__(
+        self,
+        enabled: bool = settings.MEDIA_ARCHIVE_ENABLED,
+        directory: str = settings.MEDIA_PATH,
+        kinds: frozenset[str] | None = None,
+        concurrency: int = settings.MEDIA_ARCHIVE_CONCURRENCY,
+        queue_size: int = settings.MEDIA_ARCHIVE_QUEUE_SIZE,
+        chunk_size: int = settings.MEDIA_ARCHIVE_CHUNK_BYTES,
+        max_file_bytes: int = settings.MEDIA_ARCHIVE_MAX_FILE_BYTES,
+        timeout_seconds: int = settings.MEDIA_ARCHIVE_TIMEOUT_SECONDS,
+        limiter: BandwidthLimiter | None = None,
+        breaker: CircuitBreaker = db_circuit_breaker,
+        session_factory: Callable[[], AsyncSession] = get_session,
+    ):
+
+        logger.debug("Initializing MediaArchiver")
+
+        self.enabled = enabled
+        self.directory = Path(directory)
+        self.kinds = kinds if kinds is not None else parse_media_kinds(settings.MEDIA_ARCHIVE_KINDS)
+        self.concurrency = concurrency
+        self.chunk_size = chunk_size
+        self.max_file_bytes = max_file_bytes
+        self.timeout_seconds = timeout_seconds
+        self.limiter = limiter or BandwidthLimiter(settings.MEDIA_ARCHIVE_BANDWIDTH_BYTES_PER_SECOND)
+        self.breaker = breaker
+        self.session_factory = session_factory
+
+        self.queued = 0
+        self.dropped = 0
+        self.downloaded_files = 0
+        self.downloaded_bytes = 0
+        self.known_file_hits = 0
+        self.same_content_hits = 0
+        self.skipped_large = 0
+        self.errors = 0
+
+        self._queue: asyncio.Queue[MediaJob] = asyncio.Queue(maxsize=queue_size)
+        self._workers: list[asyncio.Task] = []
+        # file_unique_id -> (sha256, size) of recently archived files
+        self._known: OrderedDict[str, tuple[str, int]] = OrderedDict()
+
+    def submit(self, message: AiogramMessage) -> bool:
+        """
+        Queue media of the message for archiving.
+
+        Parameters:
+            message (AiogramMessage): The message (bound to its bot, as messages of updates are).
+
+        Returns:
+            bool: True if media of the message is queued.
+        """
+
+        if not self.enabled:
+            return False
+
+        refs = extract_media(message, self.kinds)
+        if not refs or message.bot is None:
+            return False
+
+        try:
+            self._queue.put_nowait(MediaJob(message.bot, message.chat.id, message.message_id, refs))
+        except asyncio.QueueFull:
+            self.dropped += 1
+            logger.warning(f"Media archive queue is full, media of message {message.message_id} "
+                           f"from chat {message.chat.id} is not archived")
+            return False
+
+        self.queued += 1
+        return True
+
+    def start(self) -> None:
+        if not self.enabled or self._workers:
+            return
+
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self._workers = [
+            asyncio.create_task(self._work(), name=f"media-archiver-{number}")
+            for number in range(self.concurrency)
+        ]
+        logger.info(f"Media archiver is started: {self.concurrency} workers, directory {self.directory}")
+
+    async def stop(self) -> None:
+        """Archive queued media (within the shutdown deadline) and stop the workers."""
+
+        try:
+            if self._workers:
+                await self._queue.join()
+        finally:
+            workers, self._workers = self._workers, []
+            for worker in workers:
+                worker.cancel()
+
+    async def _work(self) -> None:
+        while True:
+            job = await self._queue.get()
+            try:
+                await self.archive(job)
+            except Exception as e:
+                self.errors += 1
+                logger.error(f"Failed to archive media of message {job.message_id} from chat {job.chat_id}: {e!r}")
+            finally:
+                self._queue.task_done()
+
+    async def archive(self, job: MediaJob) -> None:
+        """Archive files of the message and save references to them."""
+
+        now = datetime.utcnow()
+        rows = []
+        for ref in job.refs:
+            content = await self._archive_file(job.bot, ref)
+            if content is None:
+                continue
+            sha256, size = content
+            rows.append({
+                "uuid": uuid4(),
+                "created_at": now,
+                "chat_id": job.chat_id,
+                "message_id": job.message_id,
+                "kind": ref.kind,
+                "file_unique_id": ref.file_unique_id,
+                "mime_type": ref.mime_type,
+                "size": size,
+                "sha256": sha256,
+            })
+
+        if rows:
+            await self.breaker.call(self._save, rows)
+
+    async def _save(self, rows: list[dict]) -> None:
+        async with self.session_factory() as db:
+            await save_message_media(db, rows)
+            await db.commit()
+
+    async def _archive_file(self, bot: Bot, ref: MediaRef) -> tuple[str, int] | None:
+        if ref.size is not None and ref.size > self.max_file_bytes:
+            self.skipped_large += 1
+            return None
+
+        known = await self._find_known(ref.file_unique_id)
+        if known is not None and content_path(self.directory, known[0]).exists():
+            self.known_file_hits += 1
+            return known
+
+        content = await self._download(bot, ref)
+        if content is not None:
+            self._remember(ref.file_unique_id, content)
+        return content
+
+    async def _find_known(self, file_unique_id: str) -> tuple[str, int] | None:
+        known = self._known.get(file_unique_id)
+        if known is not None:
+            self._known.move_to_end(file_unique_id)
+            return known
+
+        async def lookup() -> tuple[str, int] | None:
+            async with self.session_factory() as db:
+                return await get_media_by_file_unique_id(db, file_unique_id)
+
+        try:
+            known = await self.breaker.call(lookup)
+        except (CircuitOpenError, *self.breaker.failures):
+            # the file is downloaded again; the content hash still stores it once
+            return None
+
+        if known is not None:
+            self._remember(file_unique_id, known)
+        return known
+
+    def _remember(self, file_unique_id: str, content: tuple[str, int]) -> None:
+        self._known[file_unique_id] = content
+        self._known.move_to_end(file_unique_id)
+        while len(self._known) > KNOWN_FILES_CACHE_SIZE:
+            self._known.popitem(last=False)
+
+    async def _stream(self, bot: Bot, file_path: str) -> AsyncIterator[bytes]:
+        if bot.session.api.is_local:
+            # local Bot API server: file_path is a path on this machine
+            handle = await asyncio.to_thread(open, file_path, "rb")
+            try:
+                while chunk := await asyncio.to_thread(handle.read, self.chunk_size):
+                    yield chunk
+            finally:
+                await asyncio.to_thread(handle.close)
+            return
+
+        url = bot.session.api.file_url(bot.token, file_path)
+        async for chunk in bot.session.stream_content(
+            url=url,
+            timeout=self.timeout_seconds,
+            chunk_size=self.chunk_size,
+            raise_for_status=True,
+        ):
+            yield chunk
+
+    async def _download(self, bot: Bot, ref: MediaRef) -> tuple[str, int] | None:
+        """
+        Stream the file to a temporary file, hashing it on the way, then move it to its content path
+        (or delete it if the same content is already stored).
+        """
+
+        file = await bot.get_file(ref.file_id)
+        if file.file_path is None:
+            logger.warning(f"File {ref.file_unique_id} has no path, it is not archived")
+            return None
+
+        temp_dir = self.directory / TEMP_DIR
+        await asyncio.to_thread(temp_dir.mkdir, parents=True, exist_ok=True)
+        temp_path = temp_dir / f"{uuid4().hex}.part"
+
+        hasher = hashlib.sha256()
+        size = 0
+        handle: IO[bytes] = await asyncio.to_thread(temp_path.open, "wb")
+        try:
+            async with aclosing(self._stream(bot, file.file_path)) as chunks:
+                async for chunk in chunks:
+                    size += len(chunk)
+                    if size > self.max_file_bytes:
+                        break
+                    hasher.update(chunk)
+                    await asyncio.to_thread(handle.write, chunk)
+                    await self.limiter.consume(len(chunk))
+        except BaseException:
+            await asyncio.to_thread(self._discard, handle, temp_path)
+            raise
+
+        if size > self.max_file_bytes:
+            # file_size is not always known in advance
+            await asyncio.to_thread(self._discard, handle, temp_path)
+            self.skipped_large += 1
+            logger.warning(f"File {ref.file_unique_id} is larger than {self.max_file_bytes} bytes, it is not archived")
+            return None
+        await asyncio.to_thread(handle.close)
+
+        sha256 = hasher.hexdigest()
+        stored = await asyncio.to_thread(self._store, temp_path, content_path(self.directory, sha256))
+        if not stored:
+            self.same_content_hits += 1
+
+        self.downloaded_files += 1
+        self.downloaded_bytes += size
+        return sha256, size
+
+    @staticmethod
+    def _discard(handle: IO[bytes], temp_path: Path) -> None:
+        handle.close()
+        temp_path.unlink(missing_ok=True)
+
+    @staticmethod
+    def _store(temp_path: Path, path: Path) -> bool:
+        """Move the downloaded file to its content path. Returns False if the content is already stored."""
+        if path.exists():
+            temp_path.unlink(missing_ok=True)
+            return False
+        path.parent.mkdir(parents=True, exist_ok=True)
+        os.replace(temp_path, path)
+        return True
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "enabled": self.enabled,
+            "queue": self._queue.qsize(),
+            "queued": self.queued,
+            "dropped": self.dropped,
+            "downloaded_files": self.downloaded_files,
+            "downloaded_mb": round(self.downloaded_bytes / 2 ** 20, 1),
+            "known_file_hits": self.known_file_hits,
+            "same_content_hits": self.same_content_hits,
+            "skipped_large": self.skipped_large,
+            "throttled_seconds": round(self.limiter.throttled_seconds, 1),
+            "errors": self.errors,
+        }
+
+
+media_archiver = MediaArchiver()
+
+register_flush_hook("media archiver", media_archiver.stop)
+
+
+def main():
+    logger.info(START_MODULE_MESSAGE + str(__file__))
+    logger.info(MODULE_DESCRIPTION)
+    logger.info(str_object_is_created(media_archiver))
+
+
+if __name__ != "__main__":
+    main()
+
+
+if __name__ == "__main__":
+    main()
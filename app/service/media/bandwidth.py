@@ -0,0 +1,66 @@
+# app/service/media/bandwidth.py
+
+import asyncio
+import time
+
+from app.service.logging.logger import (
+    logger,
+    START_MODULE_MESSAGE,
+    str_object_is_created,
+)
+
+
+MODULE_DESCRIPTION = "This module stores a shared bandwidth limiter (token bucket of bytes) for downloads."
+
+
+class BandwidthLimiter:
+    """
+    One token bucket of bytes shared by all downloads: ``bytes_per_second`` refill, one second of burst.
+    Callers take the bytes they have just received and sleep if the bucket went below zero,
+    so concurrent downloads together do not exceed the rate.
+    """
+
+    def __init__(self, bytes_per_second: int):
+
+        logger.debug("Initializing BandwidthLimiter")
+
+        self.bytes_per_second = bytes_per_second
+        self._tokens = float(bytes_per_second)
+        self._updated_at = time.monotonic()
+        self.throttled_seconds = 0.0
+
+    async def consume(self, size: int) -> None:
+        """
+        Take size bytes; waits while the rate is exceeded (no limit if bytes_per_second is 0).
+
+        Parameters:
+            size (int): Number of received bytes.
+        """
+
+        if self.bytes_per_second <= 0:
+            return
+
+        now = time.monotonic()
+        self._tokens = min(float(self.bytes_per_second),
+                           self._tokens + (now - self._updated_at) * self.bytes_per_second)
+        self._updated_at = now
+        self._tokens -= size
+
+        if self._tokens < 0:
+            delay = -self._tokens / self.bytes_per_second
+            self.throttled_seconds += delay
+            await asyncio.sleep(delay)
+
+
+def main():
+    logger.info(START_MODULE_MESSAGE + str(__file__))
+    logger.info(MODULE_DESCRIPTION)
+    logger.info(str_object_is_created(BandwidthLimiter))
+
+
+if __name__ != "__main__":
+    main()
+
+
+if __name__ == "__main__":
+    main()
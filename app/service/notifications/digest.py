@@ -0,0 +1,275 @@
+# app/service/notifications/digest.py
+
+import asyncio
+import time
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable
+
+from app.aiogram_services.bot import bot
+from app.config.settings import settings
+from app.service.chats.metadata import ChatMetadataCache, chat_metadata_cache
+from app.service.database.circuit_breaker import CircuitOpenError, db_circuit_breaker
+from app.service.database.crud.messages import get_thread_root_id
+from app.service.database.database import get_session
+from app.service.lifecycle.shutdown import register_flush_hook
+from app.service.logging.logger import (
+    logger,
+    START_MODULE_MESSAGE,
+    str_object_is_created,
+)
+
+
+MODULE_DESCRIPTION = ("This module buffers notification rule matches per rule and recipient and sends them "
+                      "as one digest message per window (or when enough matches are buffered).")
+
+
+TELEGRAM_MESSAGE_LIMIT = 4000
+TEXT_PREVIEW_LENGTH = 120
+
+
+# (rule uuid, recipient telegram id)
+DigestKey = tuple[Any, int]
+# (chat_id, root message id): replies to the same message are one thread
+ThreadKey = tuple[int, int]
+
+Sender = Callable[[int, str], Awaitable[Any]]
+# stored message -> id of the first message of its reply thread
+RootResolver = Callable[[Any], Awaitable[int]]
+
+
+@dataclass(slots=True)
+class DigestThread:
+    chat_id: int
+    root_message_id: int
+    messages: int
+    last_text: str
+    last_link: str | None
+
+
+@dataclass(slots=True)
+class DigestBuffer:
+    first_at: float = field(default_factory=time.monotonic)
+    items: int = 0
+    threads: dict[ThreadKey, DigestThread] = field(default_factory=dict)
+    seen_messages: set[tuple[int, int]] = field(default_factory=set)
+    # failed sends of the buffered matches
+    attempts: int = 0
+
+    def merge(self, newer: "DigestBuffer") -> None:
+        """Add matches buffered while this buffer was being sent (its window is kept)."""
+
+        self.seen_messages |= newer.seen_messages
+        for thread_key, thread in newer.threads.items():
+            known = self.threads.get(thread_key)
+            if known is None:
+                self.threads[thread_key] = thread
+                continue
+            known.messages += thread.messages
+            known.last_text = thread.last_text
+            known.last_link = thread.last_link
+        self.items += newer.items
+
+
+def render_digest(buffer: DigestBuffer, chats: ChatMetadataCache = chat_metadata_cache) -> str:
+    """Render buffered matches as one text message (one line per thread); chat names come from the cache."""
+
+    lines = [f"{buffer.items} new matching messages in {len(buffer.threads)} threads:"]
+    length = len(lines[0])
+
+    threads = sorted(buffer.threads.values(), key=lambda thread: thread.messages, reverse=True)
+    for index, thread in enumerate(threads):
+        preview = thread.last_text[:TEXT_PREVIEW_LENGTH]
+        line = f"- {chats.title(thread.chat_id)}: {thread.messages} msg, last: {preview}"
+        if thread.last_link:
+            line += f" {thread.last_link}"
+
+        if length + len(line) + 1 > TELEGRAM_MESSAGE_LIMIT:
+            lines.append(f"... and {len(threads) - index} more threads")
+            break
+
+        lines.append(line)
+        length += len(line) + 1
+
+    return "\n".join(lines)
+
+
+async def send_with_bot(recipient_id: int, text: str) -> None:
+    await bot.send_message(recipient_id, text, disable_web_page_preview=True)
+
+
+async def resolve_thread_root(message: Any) -> int:
+    """
+    Root of the reply thread of the stored message, through the reply chain in the database.
+    While the database is unavailable the message it replies to is used.
+    """
+
+    if message.reply_to_message is None:
+        return message.id
+
+    async def lookup() -> int:
+        async with get_session() as db:
+            return await get_thread_root_id(db, message.chat_id, message.reply_to_message)
+
+    try:
+        return await db_circuit_breaker.call(lookup)
+    except (CircuitOpenError, *db_circuit_breaker.failures) as e:
+        logger.debug(f"Thread root of message {message.id} from chat {message.chat_id} is not resolved: {e!r}")
+        return message.reply_to_message
+
+
+class DigestEngine:
+    def __init__(
+        self,
+        sender: Sender = send_with_bot,
+        root_resolver: RootResolver = resolve_thread_root,
+        window_seconds: float = settings.NOTIFICATION_DIGEST_WINDOW_SECONDS,
+        max_items: int = settings.NOTIFICATION_DIGEST_MAX_ITEMS,
+        max_attempts: int = settings.NOTIFICATION_DIGEST_MAX_ATTEMPTS,
+    ):
+
+        logger.debug("Initializing DigestEngine")
+
+        self.sender = sender
+        self.root_resolver = root_resolver
+        self.window_seconds = window_seconds
+        self.max_items = max_items
+        self.max_attempts = max_attempts
+
+        self.matches_received = 0
+        self.digests_sent = 0
+        self.digests_dropped = 0
+
+        self._buffers: dict[DigestKey, DigestBuffer] = {}
+        # buffers which are being sent: their messages are not buffered again
+        self._sending: dict[DigestKey, DigestBuffer] = {}
+        self._task: asyncio.Task | None = None
+
+    async def add(self, rule_uuid: Any, recipient_id: int, message: Any) -> None:
+        """
+        Buffer a message which matched the rule. Repeated messages are ignored,
+        messages of the same thread are merged into one line.
+
+        Parameters:
+            rule_uuid (UUID): The uuid of the matched notification rule.
+            recipient_id (int): Telegram id of the recipient.
+            message (Message): The stored message (chat_id, id, reply_to_message, text, message_link).
+        """
+
+        self.matches_received += 1
+
+        key = (rule_uuid, recipient_id)
+        message_key = (message.chat_id, message.id)
+        if self._is_buffered(key, message_key):
+            return
+
+        thread_key = (message.chat_id, await self.root_resolver(message))
+
+        # checked again: the message could be buffered while the root was resolved
+        if self._is_buffered(key, message_key):
+            return
+        buffer = self._buffers.get(key)
+        if buffer is None:
+            buffer = self._buffers[key] = DigestBuffer()
+        buffer.seen_messages.add(message_key)
+
+        thread = buffer.threads.get(thread_key)
+        if thread is None:
+            thread = buffer.threads[thread_key] = DigestThread(message.chat_id, thread_key[1], 0, "", None)
+            # the chat name is needed when the digest is rendered; fetched now if the chat is unknown
+            chat_metadata_cache.prefetch(message.chat_id)
+
+        thread.messages += 1
+        thread.last_text = message.text or ""
+        thread.last_link = message.message_link or chat_metadata_cache.message_link(message.chat_id, message.id)
+        buffer.items += 1
+
+        if buffer.items >= self.max_items:
+            await self._send(key)
+
+    def _is_buffered(self, key: DigestKey, message_key: tuple[int, int]) -> bool:
+        return any(
+            buffer is not None and message_key in buffer.seen_messages
+            for buffer in (self._buffers.get(key), self._sending.get(key))
+        )
+
+    async def _send(self, key: DigestKey) -> None:
+        if key in self._sending:
+            return
+        buffer = self._buffers.pop(key, None)
+        if buffer is None or not buffer.items:
+            return
+
+        rule_uuid, recipient_id = key
+        self._sending[key] = buffer
+        try:
+            await self.sender(recipient_id, render_digest(buffer))
+        except Exception as e:
+            buffer.attempts += 1
+            if buffer.attempts >= self.max_attempts:
+                self.digests_dropped += 1
+                logger.error(f"Failed to send digest of rule {rule_uuid} to {recipient_id}, "
+                             f"{buffer.items} matches are dropped after {buffer.attempts} attempts: {e}")
+                return
+
+            logger.warning(f"Failed to send digest of rule {rule_uuid} to {recipient_id} "
+                           f"(attempt {buffer.attempts}), it is sent again on the next tick: {e}")
+            # matches buffered meanwhile join the failed digest: it stays due and is retried on the next tick
+            newer = self._buffers.get(key)
+            if newer is not None:
+                buffer.merge(newer)
+            self._buffers[key] = buffer
+            return
+        finally:
+            del self._sending[key]
+
+        self.digests_sent += 1
+        logger.debug(f"Digest of rule {rule_uuid} sent to {recipient_id}: {buffer.items} messages")
+
+    async def flush_due(self) -> None:
+        """Send digests whose window has passed."""
+
+        now = time.monotonic()
+        due = [key for key, buffer in self._buffers.items() if now - buffer.first_at >= self.window_seconds]
+        for key in due:
+            await self._send(key)
+
+    async def flush_all(self) -> None:
+        """Send all buffered digests (one attempt each: failed ones are not retried on shutdown)."""
+
+        for key in list(self._buffers):
+            await self._send(key)
+
+    async def _run(self) -> None:
+        tick = max(1.0, self.window_seconds / 4)
+        while True:
+            await asyncio.sleep(tick)
+            await self.flush_due()
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run(), name="notification-digest")
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+        await self.flush_all()
+
+
+notification_digest = DigestEngine()
+
+register_flush_hook("notification digests", notification_digest.stop)
+
+
+def main():
+    logger.info(START_MODULE_MESSAGE + str(__file__))
+    logger.info(MODULE_DESCRIPTION)
+    logger.info(str_object_is_created(notification_digest))
+
+
+if __name__ != "__main__":
+    main()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,203 @@
+# app/service/offload/executor.py
+
+import asyncio
+import os
+import multiprocessing
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any, Callable
+
+from app.config.settings import settings
+from app.service.lifecycle.shutdown import register_flush_hook
+from app.service.logging.logger import (
+    logger,
+    START_MODULE_MESSAGE,
+    str_object_is_created,
+)
+
+
+MODULE_DESCRIPTION = ("This module routes registered CPU-bound steps off the event loop: to a process pool "
+                      "(or a thread pool for code which releases the GIL), with calls submitted in batches.")
+
+
+INLINE = "inline"
+THREAD = "thread"
+PROCESS = "process"
+
+KINDS = (INLINE, THREAD, PROCESS)
+
+
+def run_batch(func: Callable[..., Any], batch: list[tuple]) -> list[tuple[bool, Any]]:
+    """
+    Run the function for every argument tuple of the batch (in a worker).
+    Errors are returned, not raised: one failed call does not fail the batch.
+    """
+
+    results = []
+    for args in batch:
+        try:
+            results.append((True, func(*args)))
+        except Exception as e:
+            results.append((False, e))
+    return results
+
+
+@dataclass(slots=True)
+class OffloadStep:
+    func: Callable[..., Any]
+    kind: str
+    pending: list[tuple[tuple, asyncio.Future]] = field(default_factory=list)
+    flush_handle: asyncio.TimerHandle | None = None
+    calls: int = 0
+    batches: int = 0
+
+
+class OffloadExecutor:
+    """
+    Steps are registered once by name; ``await run(name, *args)`` returns the result of ``func(*args)``.
+    Calls of a step made within ``batch_window_seconds`` (up to ``batch_size``) go to the pool as one task,
+    so the IPC overhead is paid per batch, not per call. Functions and arguments of process steps must
+    be picklable (module level functions, plain data).
+    """
+
+    def __init__(
+        self,
+        process_workers: int = settings.OFFLOAD_PROCESS_WORKERS,
+        thread_workers: int = settings.OFFLOAD_THREAD_WORKERS,
+        batch_size: int = settings.OFFLOAD_BATCH_SIZE,
+        batch_window_seconds: float = settings.OFFLOAD_BATCH_WINDOW_SECONDS,
+    ):
+
+        logger.debug("Initializing OffloadExecutor")
+
+        self.process_workers = process_workers or max(1, (os.cpu_count() or 2) - 1)
+        self.thread_workers = thread_workers
+        self.batch_size = batch_size
+        self.batch_window_seconds = batch_window_seconds
+
+        self._steps: dict[str, OffloadStep] = {}
+        self._pools: dict[str, Executor] = {}
+        self._in_flight: set[asyncio.Future] = set()
+
+    def register(self, name: str, func: Callable[..., Any], kind: str = PROCESS) -> None:
+        """
+        Register CPU-bound step.
+
+        Parameters:
+            name (str): Name of the step.
+            func (Callable): The function (module level for process steps).
+            kind (str): "process", "thread" or "inline" (run on the loop, e.g. to disable offloading).
+        """
+
+        if kind not in KINDS:
+            raise ValueError(f"Unknown offload kind {kind!r}, expected one of {KINDS}")
+
+        logger.debug(f"Registering offload step '{name}' ({kind})")
+
+        self._steps[name] = OffloadStep(func, kind)
+
+    def _pool(self, kind: str) -> Executor:
+        pool = self._pools.get(kind)
+        if pool is None:
+            if kind == PROCESS:
+                # spawn: the loop process has threads (watchdog, DB drivers), forking it is not safe
+                pool = ProcessPoolExecutor(self.process_workers, mp_context=multiprocessing.get_context("spawn"))
+            else:
+                pool = ThreadPoolExecutor(self.thread_workers, thread_name_prefix="offload")
+            self._pools[kind] = pool
+            logger.info(f"Offload {kind} pool is started")
+        return pool
+
+    async def run(self, name: str, *args: Any) -> Any:
+        step = self._steps[name]
+        step.calls += 1
+
+        if step.kind == INLINE:
+            return step.func(*args)
+
+        future = asyncio.get_running_loop().create_future()
+        step.pending.append((args, future))
+
+        if len(step.pending) >= self.batch_size:
+            self._submit(step)
+        elif step.flush_handle is None:
+            step.flush_handle = asyncio.get_running_loop().call_later(self.batch_window_seconds, self._submit, step)
+
+        return await future
+
+    def _submit(self, step: OffloadStep) -> None:
+        if step.flush_handle is not None:
+            step.flush_handle.cancel()
+            step.flush_handle = None
+
+        pending, step.pending = step.pending, []
+        if not pending:
+            return
+
+        step.batches += 1
+        loop = asyncio.get_running_loop()
+        try:
+            batch_future = loop.run_in_executor(self._pool(step.kind), run_batch, step.func,
+                                                [args for args, _ in pending])
+        except Exception as e:
+            # e.g. the pool is broken or shut down; callers must not wait forever
+            logger.error(f"Failed to submit {len(pending)} calls of offload step: {e!r}")
+            for _, future in pending:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        self._in_flight.add(batch_future)
+        batch_future.add_done_callback(lambda done: self._resolve(done, pending))
+
+    def _resolve(self, batch_future: asyncio.Future, pending: list[tuple[tuple, asyncio.Future]]) -> None:
+        self._in_flight.discard(batch_future)
+
+        if batch_future.cancelled() or batch_future.exception() is not None:
+            error = asyncio.CancelledError() if batch_future.cancelled() else batch_future.exception()
+            for _, future in pending:
+                if not future.done():
+                    future.set_exception(error)
+            return
+
+        for (_, future), (ok, result) in zip(pending, batch_future.result()):
+            if future.done():
+                continue
+            if ok:
+                future.set_result(result)
+            else:
+                future.set_exception(result)
+
+    def stats(self) -> dict:
+        return {name: {"kind": step.kind, "calls": step.calls, "batches": step.batches}
+                for name, step in self._steps.items()}
+
+    async def shutdown(self) -> None:
+        """Submit pending calls, wait for submitted batches and stop the pools."""
+
+        for step in self._steps.values():
+            self._submit(step)
+        if self._in_flight:
+            await asyncio.wait(list(self._in_flight))
+
+        pools, self._pools = self._pools, {}
+        for pool in pools.values():
+            await asyncio.to_thread(pool.shutdown)
+
+
+offload_executor = OffloadExecutor()
+
+register_flush_hook("offload executor", offload_executor.shutdown)
+
+
+def main():
+    logger.info(START_MODULE_MESSAGE + str(__file__))
+    logger.info(MODULE_DESCRIPTION)
+    logger.info(str_object_is_created(offload_executor))
+
+
+if __name__ != "__main__":
+    main()
+
+
+if __name__ == "__main__":
+    main()
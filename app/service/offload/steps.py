@@ -0,0 +1,49 @@
+# app/service/offload/steps.py
+
+import json
+
+from app.aiogram_services.services.utils import strip_aiogram_defaults
+from app.config.settings import settings
+from app.service.offload.executor import offload_executor
+from app.service.logging.logger import (
+    logger,
+    START_MODULE_MESSAGE,
+    str_object_is_created,
+)
+
+
+MODULE_DESCRIPTION = ("This module stores CPU-bound steps run by the offload executor. Steps are module level "
+                      "functions of plain data: process workers import this module to unpickle them.")
+
+
+MESSAGE_JSON = "message_json"
+
+
+def serialize_message_payload(payload: dict) -> str:
+    """
+    JSON of the stored message.
+
+    Parameters:
+        payload (dict): ``Message.model_dump(mode="json", ...)`` of the Aiogram message.
+
+    Returns:
+        str: JSON data without aiogram defaults.
+    """
+    return json.dumps(strip_aiogram_defaults(payload), ensure_ascii=False)
+
+
+offload_executor.register(MESSAGE_JSON, serialize_message_payload, settings.OFFLOAD_MESSAGE_JSON)
+
+
+def main():
+    logger.info(START_MODULE_MESSAGE + str(__file__))
+    logger.info(MODULE_DESCRIPTION)
+    logger.info(str_object_is_created(serialize_message_payload))
+
+
+if __name__ != "__main__":
+    main()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,183 @@
+# app/service/spool/journal.py
+
+import asyncio
+import json
+import os
+from pathlib import Path
+from typing import IO, Iterator
+
+from app.config.settings import settings
+from app.service.logging.logger import (
+    logger,
+    START_MODULE_MESSAGE,
+    str_object_is_created,
+)
+
+
+MODULE_DESCRIPTION = ("This module stores append-only local journal (JSON lines in segment files). Records appended "
+                      "together are written and fsynced once (group commit) in a worker thread.")
+
+
+SEGMENT_PREFIX = "segment-"
+SEGMENT_SUFFIX = ".jsonl"
+
+
+def segment_name(sequence: int) -> str:
+    return f"{SEGMENT_PREFIX}{sequence:012d}{SEGMENT_SUFFIX}"
+
+
+def segment_sequence(path: Path) -> int:
+    return int(path.name[len(SEGMENT_PREFIX):-len(SEGMENT_SUFFIX)])
+
+
+def read_segment(path: Path) -> Iterator[dict]:
+    """
+    Read records of the segment. A torn last line (crash in the middle of a write) is skipped.
+    """
+
+    with path.open("r", encoding="utf-8") as file:
+        for line_number, line in enumerate(file, start=1):
+            if not line.strip():
+                continue
+            try:
+                yield json.loads(line)
+            except json.JSONDecodeError:
+                logger.warning(f"Spool segment {path.name}: line {line_number} is damaged, skipped")
+
+
+class SpoolJournal:
+    """
+    Records go to the current (open) segment; a segment is sealed when it grows over ``segment_max_bytes``
+    or on ``seal()``. Only sealed segments are read back and deleted (see SpoolReplayer).
+    """
+
+    def __init__(
+        self,
+        directory: str = settings.SPOOL_PATH,
+        fsync_interval_seconds: float = settings.SPOOL_FSYNC_INTERVAL_SECONDS,
+        segment_max_bytes: int = settings.SPOOL_SEGMENT_MAX_BYTES,
+    ):
+
+        logger.debug("Initializing SpoolJournal")
+
+        self.directory = Path(directory)
+        self.fsync_interval_seconds = fsync_interval_seconds
+        self.segment_max_bytes = segment_max_bytes
+
+        self.appended = 0
+        self.fsyncs = 0
+
+        self._pending: list[tuple[str, asyncio.Future]] = []
+        self._write_lock = asyncio.Lock()
+        self._flush_task: asyncio.Task | None = None
+
+        # accessed only in the worker thread, under _write_lock
+        self._file: IO[str] | None = None
+        self._file_path: Path | None = None
+
+    async def append(self, record: dict) -> None:
+        """
+        Append the record; returns when the record is on disk (fsynced).
+
+        Parameters:
+            record (dict): JSON serializable record.
+        """
+
+        line = json.dumps(record, ensure_ascii=False, separators=(",", ":")) + "\n"
+        future = asyncio.get_running_loop().create_future()
+        self._pending.append((line, future))
+        self.appended += 1
+
+        if self._flush_task is None or self._flush_task.done():
+            self._flush_task = asyncio.create_task(self._flush_soon(), name="spool-journal-flush")
+
+        await future
+
+    async def _flush_soon(self) -> None:
+        # wait a little: records appended meanwhile share one write + fsync
+        while self._pending:
+            await asyncio.sleep(self.fsync_interval_seconds)
+            await self.flush()
+
+    async def flush(self) -> None:
+        """Write and fsync pending records."""
+
+        async with self._write_lock:
+            pending, self._pending = self._pending, []
+            if not pending:
+                return
+
+            try:
+                await asyncio.to_thread(self._write_lines, [line for line, _ in pending])
+            except Exception as e:
+                logger.error(f"Failed to write {len(pending)} records to spool: {e}")
+                for _, future in pending:
+                    if not future.done():
+                        future.set_exception(e)
+                return
+
+            self.fsyncs += 1
+            for _, future in pending:
+                if not future.done():
+                    future.set_result(None)
+
+    def _write_lines(self, lines: list[str]) -> None:
+        if self._file is None:
+            self._open_new_segment()
+
+        self._file.writelines(lines)
+        self._file.flush()
+        os.fsync(self._file.fileno())
+
+        if self._file.tell() >= self.segment_max_bytes:
+            self._close_segment()
+
+    def _open_new_segment(self) -> None:
+        self.directory.mkdir(parents=True, exist_ok=True)
+        existing = self._segments()
+        sequence = segment_sequence(existing[-1]) + 1 if existing else 1
+        self._file_path = self.directory / segment_name(sequence)
+        self._file = self._file_path.open("a", encoding="utf-8")
+        logger.info(f"Spool segment {self._file_path.name} is opened")
+
+    def _close_segment(self) -> None:
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+            self._file_path = None
+
+    def _segments(self) -> list[Path]:
+        if not self.directory.exists():
+            return []
+        return sorted(self.directory.glob(f"{SEGMENT_PREFIX}*{SEGMENT_SUFFIX}"), key=segment_sequence)
+
+    async def seal(self) -> None:
+        """Flush pending records and close the current segment, so it can be replayed."""
+
+        await self.flush()
+        async with self._write_lock:
+            await asyncio.to_thread(self._close_segment)
+
+    async def sealed_segments(self) -> list[Path]:
+        """Sealed segments, from the oldest."""
+
+        # under the lock: the worker thread may be opening a new segment right now
+        async with self._write_lock:
+            return [path for path in self._segments() if path != self._file_path]
+
+
+message_journal = SpoolJournal()
+
+
+def main():
+    logger.info(START_MODULE_MESSAGE + str(__file__))
+    logger.info(MODULE_DESCRIPTION)
+    logger.info(str_object_is_created(message_journal))
+
+
+if __name__ != "__main__":
+    main()
+
+
+if __name__ == "__main__":
+    main()
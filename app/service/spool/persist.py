@@ -0,0 +1,86 @@
+# app/service/spool/persist.py
+
+from datetime import datetime
+from typing import Callable
+from uuid import UUID
+
+from aiogram.types import Message as AiogramMessage
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.service.database.circuit_breaker import CircuitBreaker, CircuitOpenError, db_circuit_breaker
+from app.service.database.crud.messages import message_row, store_message_row
+from app.service.database.database import get_session
+from app.service.database.models.message import Message as DatabaseMessage
+from app.service.spool.journal import SpoolJournal, message_journal
+from app.service.logging.logger import (
+    logger,
+    START_MODULE_MESSAGE,
+    str_object_is_created,
+)
+
+
+MODULE_DESCRIPTION = ("This module stores messages through the database circuit breaker; while the database is "
+                      "slow or down messages are written to the local spool journal instead.")
+
+
+def encode_message_row(row: dict) -> dict:
+    """Make the message row JSON serializable."""
+    return {**row, "uuid": str(row["uuid"]), "created_at": row["created_at"].isoformat()}
+
+
+def decode_message_row(record: dict) -> dict:
+    """Inverse of ``encode_message_row``."""
+    return {**record, "uuid": UUID(record["uuid"]), "created_at": datetime.fromisoformat(record["created_at"])}
+
+
+async def persist_message(
+    message: AiogramMessage,
+    breaker: CircuitBreaker = db_circuit_breaker,
+    journal: SpoolJournal = message_journal,
+    session_factory: Callable[[], AsyncSession] = get_session,
+) -> DatabaseMessage | None:
+    """
+    Store the message in the database, or in the spool journal if the database is unavailable
+    (the spool replayer loads it later with the same uuid and created_at).
+    The message is stored in its own session, not in the session of the update: after a timeout or a failure
+    of the database the session is unusable, and DbSessionMiddleware would commit it.
+
+    Parameters:
+        message (AiogramMessage): The message to be saved.
+        breaker (CircuitBreaker): Circuit breaker of the database.
+        journal (SpoolJournal): Spool journal.
+        session_factory (Callable[[], AsyncSession]): Factory of the session the message is stored in.
+
+    Returns:
+        DatabaseMessage | None: The stored message, or None if the message is spooled.
+    """
+
+    row = await message_row(message)
+
+    async def store() -> DatabaseMessage:
+        async with session_factory() as session:
+            return await store_message_row(session, row)
+
+    try:
+        return await breaker.call(store)
+    except CircuitOpenError:
+        logger.debug(f"Database circuit is open, message {row['id']} from chat {row['chat_id']} is spooled")
+    except breaker.failures as e:
+        logger.warning(f"Failed to store message {row['id']} from chat {row['chat_id']}, spooled: {e!r}")
+
+    await journal.append(encode_message_row(row))
+    return None
+
+
+def main():
+    logger.info(START_MODULE_MESSAGE + str(__file__))
+    logger.info(MODULE_DESCRIPTION)
+    logger.info(str_object_is_created(persist_message))
+
+
+if __name__ != "__main__":
+    main()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,188 @@
+# app/service/spool/replayer.py
+
+import asyncio
+import json
+from pathlib import Path
+from typing import Callable
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config.settings import settings
+from app.service.database.circuit_breaker import CircuitBreaker, CircuitOpenError, db_circuit_breaker
+from app.service.database.crud.messages import insert_message_rows
+from app.service.database.database import get_session
+from app.service.lifecycle.shutdown import register_flush_hook
+from app.service.spool.journal import SpoolJournal, message_journal, read_segment
+from app.service.spool.persist import decode_message_row
+from app.service.logging.logger import (
+    logger,
+    START_MODULE_MESSAGE,
+    str_object_is_created,
+)
+
+
+MODULE_DESCRIPTION = ("This module replays spooled messages: sealed journal segments are bulk inserted "
+                      "(idempotent, ON CONFLICT DO NOTHING) once the database is healthy, then deleted.")
+
+
+# records which cannot be stored (not because the database is unavailable) are moved to this subdirectory
+# of the spool, one file per segment, so they do not block replay of the segment and of newer segments
+QUARANTINE_DIR = "quarantine"
+
+
+class SpoolReplayer:
+    def __init__(
+        self,
+        journal: SpoolJournal = message_journal,
+        breaker: CircuitBreaker = db_circuit_breaker,
+        session_factory: Callable[[], AsyncSession] = get_session,
+        batch_size: int = settings.SPOOL_REPLAY_BATCH_SIZE,
+        interval_seconds: float = settings.SPOOL_REPLAY_INTERVAL_SECONDS,
+    ):
+
+        logger.debug("Initializing SpoolReplayer")
+
+        self.journal = journal
+        self.breaker = breaker
+        self.session_factory = session_factory
+        self.batch_size = batch_size
+        self.interval_seconds = interval_seconds
+
+        self.replayed = 0
+        self.quarantined = 0
+
+        self._replay_lock = asyncio.Lock()
+        self._task: asyncio.Task | None = None
+
+    async def _insert_batch(self, rows: list[dict]) -> int:
+        async with self.session_factory() as db:
+            inserted = await insert_message_rows(db, rows)
+            await db.commit()
+        return inserted
+
+    async def _insert_records(self, records: list[dict]) -> int:
+        rows = [decode_message_row(record) for record in records]
+        return await self.breaker.call(self._insert_batch, rows)
+
+    async def replay_segment(self, path: Path) -> int:
+        """
+        Insert all records of the segment and delete it.
+        If the database is unavailable the segment is kept: replaying it again is safe, stored messages are skipped.
+        A batch failing otherwise is inserted record by record: records which still fail are quarantined.
+
+        Raises:
+            CircuitOpenError, Exception: The database is unavailable (one of ``breaker.failures``).
+        """
+
+        records = await asyncio.to_thread(lambda: list(read_segment(path)))
+        transient = (CircuitOpenError, *self.breaker.failures)
+
+        inserted = 0
+        poison: list[dict] = []
+        for start in range(0, len(records), self.batch_size):
+            batch = records[start:start + self.batch_size]
+            try:
+                inserted += await self._insert_records(batch)
+                continue
+            except transient:
+                raise
+            except Exception as e:
+                logger.warning(f"Spool segment {path.name}: batch of {len(batch)} records failed ({e!r}), "
+                               f"records are inserted one by one")
+
+            for record in batch:
+                try:
+                    inserted += await self._insert_records([record])
+                except transient:
+                    raise
+                except Exception as e:
+                    logger.error(f"Spool segment {path.name}: record {record.get('id')} from chat "
+                                 f"{record.get('chat_id')} cannot be stored, quarantined: {e!r}")
+                    poison.append(record)
+
+        if poison:
+            await asyncio.to_thread(self._quarantine, path, poison)
+            self.quarantined += len(poison)
+
+        await asyncio.to_thread(path.unlink)
+        logger.info(f"Spool segment {path.name} is replayed: {inserted} of {len(records)} messages inserted, "
+                    f"{len(poison)} quarantined")
+
+        return inserted
+
+    def _quarantine(self, path: Path, records: list[dict]) -> None:
+        directory = self.journal.directory / QUARANTINE_DIR
+        directory.mkdir(parents=True, exist_ok=True)
+        with (directory / path.name).open("a", encoding="utf-8") as file:
+            file.writelines(json.dumps(record, ensure_ascii=False, separators=(",", ":")) + "\n"
+                            for record in records)
+
+    async def replay(self) -> int:
+        """
+        Replay all spooled messages if the database looks healthy.
+
+        Returns:
+            int: Number of inserted messages.
+        """
+
+        if self.breaker.is_open:
+            return 0
+
+        async with self._replay_lock:
+            await self.journal.seal()
+
+            inserted = 0
+            for path in await self.journal.sealed_segments():
+                try:
+                    inserted += await self.replay_segment(path)
+                except CircuitOpenError:
+                    break
+                except self.breaker.failures as e:
+                    # the database is unavailable: the segment and newer ones are replayed next time, in order
+                    logger.warning(f"Failed to replay spool segment {path.name}, database is unavailable: {e!r}")
+                    break
+                except Exception as e:
+                    # e.g. an unreadable segment file: it is kept for inspection, newer segments are replayed
+                    logger.error(f"Failed to replay spool segment {path.name}: {e!r}")
+
+            self.replayed += inserted
+            return inserted
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await self.replay()
+            except Exception as e:
+                logger.error(f"Spool replay failed: {e!r}")
+            await asyncio.sleep(self.interval_seconds)
+
+    def start(self) -> None:
+        """Replay spooled messages (left from the previous run too) and keep replaying in background."""
+        if self._task is None:
+            self._task = asyncio.create_task(self._run(), name="spool-replayer")
+
+    async def stop(self) -> None:
+        """Stop replaying; records appended but not written yet are fsynced."""
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+        await self.journal.flush()
+
+
+spool_replayer = SpoolReplayer()
+
+register_flush_hook("message spool", spool_replayer.stop)
+
+
+def main():
+    logger.info(START_MODULE_MESSAGE + str(__file__))
+    logger.info(MODULE_DESCRIPTION)
+    logger.info(str_object_is_created(spool_replayer))
+
+
+if __name__ != "__main__":
+    main()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,27 @@
+# app/service/stats/rebuild_rollups.py
+
+import asyncio
+
+from app.service.database.database import init_db, get_session
+from app.service.database.crud.message_stats import rebuild_message_stats
+from app.service.logging.logger import (
+    logger,
+    START_MODULE_MESSAGE,
+)
+
+
+MODULE_DESCRIPTION = ("Command to regenerate message statistics rollups from raw messages. "
+                      "Usage: python -m app.service.stats.rebuild_rollups")
+
+
+async def main():
+    logger.info(START_MODULE_MESSAGE + str(__file__))
+    logger.info(MODULE_DESCRIPTION)
+
+    await init_db()
+    async with get_session() as db:
+        await rebuild_message_stats(db)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
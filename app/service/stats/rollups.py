@@ -0,0 +1,179 @@
+# app/service/stats/rollups.py
+
+import asyncio
+from collections import Counter
+from datetime import datetime
+from typing import Any, Callable, Iterable
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config.settings import settings
+from app.service.database.database import get_session
+from app.service.database.dialects import get_insert
+from app.service.database.models.message_stats import MessageStatsRollup
+from app.service.lifecycle.shutdown import register_flush_hook
+from app.service.logging.logger import (
+    logger,
+    START_MODULE_MESSAGE,
+    str_object_is_created,
+)
+
+
+MODULE_DESCRIPTION = ("This module aggregates message statistics in memory and periodically flushes them "
+                      "to rollup tables as batched upserts.")
+
+
+# (bucket_start, chat_id, from_user_id)
+RollupKey = tuple[datetime, int, int]
+
+
+UPSERT_BATCH_SIZE = 1_000
+
+
+def hour_bucket(moment: datetime) -> datetime:
+    """Return start of the hour bucket of the moment."""
+    return moment.replace(minute=0, second=0, microsecond=0)
+
+
+def rollup_key(created_at: datetime, chat_id: int, from_user_id: int) -> RollupKey:
+    return hour_bucket(created_at), chat_id, from_user_id
+
+
+def message_rollup_key(message: Any) -> RollupKey:
+    """Build rollup key of the stored message (a Message or a row with its created_at, chat_id, from_user_id)."""
+    return rollup_key(message.created_at, message.chat_id, message.from_user_id)
+
+
+async def upsert_rollup_counts(db: AsyncSession, counts: Iterable[tuple[RollupKey, int]]) -> int:
+    """
+    Add counts to rollup rows (insert or increment), in batches.
+
+    Parameters:
+        db (AsyncSession): The database session.
+        counts (Iterable[tuple[RollupKey, int]]): Rollup keys and count deltas.
+
+    Returns:
+        int: Number of upserted rows.
+    """
+
+    insert = get_insert(db)
+    stmt = insert(MessageStatsRollup)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=["bucket_start", "chat_id", "from_user_id"],
+        set_={"message_count": MessageStatsRollup.message_count + stmt.excluded.message_count},
+    )
+
+    upserted = 0
+    batch: list[dict] = []
+
+    for (bucket_start, chat_id, from_user_id), count in counts:
+        if count == 0:
+            continue
+        batch.append({
+            "bucket_start": bucket_start,
+            "chat_id": chat_id,
+            "from_user_id": from_user_id,
+            "message_count": count,
+        })
+        if len(batch) >= UPSERT_BATCH_SIZE:
+            await db.execute(stmt, batch)
+            upserted += len(batch)
+            batch = []
+
+    if batch:
+        await db.execute(stmt, batch)
+        upserted += len(batch)
+
+    return upserted
+
+
+class RollupAggregator:
+    """
+    In-memory aggregation of message counts, flushed to the rollup table periodically.
+    """
+
+    def __init__(
+        self,
+        session_factory: Callable[[], AsyncSession] = get_session,
+        flush_interval_seconds: float = settings.STATS_ROLLUP_FLUSH_INTERVAL_SECONDS,
+    ):
+
+        logger.debug("Initializing RollupAggregator")
+
+        self.session_factory = session_factory
+        self.flush_interval_seconds = flush_interval_seconds
+        self._pending: Counter[RollupKey] = Counter()
+        self._flush_lock = asyncio.Lock()
+        self._flush_task: asyncio.Task | None = None
+
+    @property
+    def pending_keys(self) -> int:
+        return len(self._pending)
+
+    def record(self, message: Any, delta: int = 1) -> None:
+        """
+        Count the stored message.
+
+        Parameters:
+            message (Message): The stored message.
+            delta (int): Count delta.
+        """
+        self._pending[message_rollup_key(message)] += delta
+
+    async def flush(self) -> None:
+        """
+        Flush pending counts as batched upserts. On failure counts are kept for the next flush.
+        """
+
+        async with self._flush_lock:
+            if not self._pending:
+                return
+
+            pending, self._pending = self._pending, Counter()
+
+            try:
+                async with self.session_factory() as db:
+                    upserted = await upsert_rollup_counts(db, pending.items())
+                    await db.commit()
+            except Exception as e:
+                logger.error(f"Failed to flush message stats rollups: {e}")
+                self._pending.update(pending)
+                return
+
+            logger.debug(f"Message stats rollups flushed: {upserted} rows")
+
+    async def _run_periodic_flush(self) -> None:
+        while True:
+            await asyncio.sleep(self.flush_interval_seconds)
+            await self.flush()
+
+    def start(self) -> None:
+        """Start periodic flushing in background."""
+        if self._flush_task is None:
+            self._flush_task = asyncio.create_task(self._run_periodic_flush(), name="message-stats-rollups-flush")
+
+    async def stop(self) -> None:
+        """Stop periodic flushing and flush what is pending."""
+        if self._flush_task is not None:
+            self._flush_task.cancel()
+            self._flush_task = None
+        await self.flush()
+
+
+message_stats_aggregator = RollupAggregator()
+
+register_flush_hook("message stats rollups", message_stats_aggregator.stop)
+
+
+def main():
+    logger.info(START_MODULE_MESSAGE + str(__file__))
+    logger.info(MODULE_DESCRIPTION)
+    logger.info(str_object_is_created(message_stats_aggregator))
+
+
+if __name__ != "__main__":
+    main()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,208 @@
+# app/service/themes/similarity_index.py
+
+import hashlib
+import re
+from typing import Any, Iterable
+from uuid import UUID
+
+import numpy as np
+
+from app.config.settings import settings
+from app.service.logging.logger import (
+    logger,
+    START_MODULE_MESSAGE,
+    str_object_is_created,
+)
+
+
+MODULE_DESCRIPTION = ("This module stores in-memory similarity index of message themes: deterministic hashing "
+                      "embeddings of name + description + keywords (works offline) and cosine search with NumPy.")
+
+
+_WORD = re.compile(r"\w+")
+
+NAME_WEIGHT = 2.0
+KEYWORD_WEIGHT = 1.5
+DESCRIPTION_WEIGHT = 1.0
+# character trigrams make "payments"/"payment" or "ДТП"/"дтп" close to each other
+TRIGRAM_WEIGHT = 0.5
+
+INITIAL_CAPACITY = 64
+
+
+def _token_slot(token: str, dim: int) -> tuple[int, float]:
+    digest = int.from_bytes(hashlib.blake2b(token.encode(), digest_size=8).digest(), "little")
+    # the lowest bit is the sign: collisions cancel out instead of adding up
+    return (digest >> 1) % dim, 1.0 if digest & 1 else -1.0
+
+
+def embed_theme(
+    name: str,
+    description: str | None = None,
+    keywords: Iterable[str] | None = None,
+    dim: int = settings.THEME_EMBEDDING_DIM,
+) -> np.ndarray:
+    """
+    Build L2-normalized hashing embedding of a theme.
+
+    Parameters:
+        name (str): Theme name.
+        description (str | None): Theme description.
+        keywords (Iterable[str] | None): Theme keywords.
+        dim (int): Embedding dimension.
+
+    Returns:
+        np.ndarray: float32 vector of shape (dim,).
+    """
+
+    vector = np.zeros(dim, dtype=np.float32)
+
+    def add_text(text: str, weight: float) -> None:
+        for word in _WORD.findall(text.casefold()):
+            index, sign = _token_slot("w:" + word, dim)
+            vector[index] += sign * weight
+
+            padded = f"^{word}$"
+            for start in range(len(padded) - 2):
+                index, sign = _token_slot("t:" + padded[start:start + 3], dim)
+                vector[index] += sign * weight * TRIGRAM_WEIGHT
+
+    add_text(name, NAME_WEIGHT)
+    add_text(description or "", DESCRIPTION_WEIGHT)
+    for keyword in keywords or []:
+        add_text(keyword, KEYWORD_WEIGHT)
+
+    norm = np.linalg.norm(vector)
+    if norm > 0:
+        vector /= norm
+
+    return vector
+
+
+class ThemeSimilarityIndex:
+    """
+    Matrix of theme embeddings (one row per theme), grown by doubling; updates are incremental.
+    """
+
+    def __init__(self, dim: int = settings.THEME_EMBEDDING_DIM, threshold: float = settings.THEME_SIMILARITY_THRESHOLD):
+
+        logger.debug("Initializing ThemeSimilarityIndex")
+
+        self.dim = dim
+        self.threshold = threshold
+        self._matrix = np.zeros((INITIAL_CAPACITY, dim), dtype=np.float32)
+        self._uuids: list[UUID] = []
+        self._rows: dict[UUID, int] = {}
+
+    def __len__(self) -> int:
+        return len(self._uuids)
+
+    def upsert(self, theme_uuid: UUID, name: str, description: str | None, keywords: Iterable[str] | None) -> None:
+        """
+        Add the theme or replace its embedding.
+        """
+
+        vector = embed_theme(name, description, keywords, self.dim)
+
+        row = self._rows.get(theme_uuid)
+        if row is None:
+            row = len(self._uuids)
+            if row == self._matrix.shape[0]:
+                self._matrix = np.concatenate([self._matrix, np.zeros_like(self._matrix)])
+            self._uuids.append(theme_uuid)
+            self._rows[theme_uuid] = row
+
+        self._matrix[row] = vector
+
+    def upsert_theme(self, theme: Any) -> None:
+        """
+        Add or update the theme from an object with uuid, name, description, keywords and enable.
+        A disabled theme is removed: it must not be found as a near-duplicate.
+        """
+        if not getattr(theme, "enable", True):
+            self.remove(theme.uuid)
+            return
+        self.upsert(theme.uuid, theme.name, theme.description, theme.keywords)
+
+    def remove(self, theme_uuid: UUID) -> None:
+        row = self._rows.pop(theme_uuid, None)
+        if row is None:
+            return
+
+        # move the last row into the gap
+        last_row = len(self._uuids) - 1
+        last_uuid = self._uuids.pop()
+        if row != last_row:
+            self._matrix[row] = self._matrix[last_row]
+            self._uuids[row] = last_uuid
+            self._rows[last_uuid] = row
+        self._matrix[last_row] = 0
+
+    def rebuild(self, themes: Iterable[Any]) -> None:
+        """Rebuild the index from scratch (disabled themes are skipped, see ``upsert_theme``)."""
+        self._matrix = np.zeros((INITIAL_CAPACITY, self.dim), dtype=np.float32)
+        self._uuids = []
+        self._rows = {}
+
+        for theme in themes:
+            self.upsert_theme(theme)
+
+        logger.info(f"Theme similarity index is rebuilt: {len(self)} themes")
+
+    def most_similar(
+        self,
+        name: str,
+        description: str | None = None,
+        keywords: Iterable[str] | None = None,
+    ) -> tuple[UUID, float] | None:
+        """
+        Find the most similar theme.
+
+        Returns:
+            tuple[UUID, float] | None: Theme uuid and cosine similarity, or None if the index is empty.
+        """
+
+        if not self._uuids:
+            return None
+
+        vector = embed_theme(name, description, keywords, self.dim)
+        scores = self._matrix[:len(self._uuids)] @ vector
+        row = int(np.argmax(scores))
+
+        return self._uuids[row], float(scores[row])
+
+    def find_duplicate(
+        self,
+        name: str,
+        description: str | None = None,
+        keywords: Iterable[str] | None = None,
+    ) -> UUID | None:
+        """
+        Return uuid of an existing theme which is similar enough (threshold) to the candidate theme.
+        """
+
+        found = self.most_similar(name, description, keywords)
+        if found is None:
+            return None
+
+        theme_uuid, score = found
+        logger.debug(f"The most similar theme to {name!r}: {theme_uuid} score={score:.3f}")
+
+        return theme_uuid if score >= self.threshold else None
+
+
+theme_similarity_index = ThemeSimilarityIndex()
+
+
+def main():
+    logger.info(START_MODULE_MESSAGE + str(__file__))
+    logger.info(MODULE_DESCRIPTION)
+    logger.info(str_object_is_created(theme_similarity_index))
+
+
+if __name__ != "__main__":
+    main()
+
+
+if __name__ == "__main__":
+    main()
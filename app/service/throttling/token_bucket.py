@@ -0,0 +1,105 @@
+# app/service/throttling/token_bucket.py
+
+import time
+from collections import OrderedDict
+from typing import Hashable
+
+from app.service.logging.logger import (
+    logger,
+    START_MODULE_MESSAGE,
+    str_object_is_created,
+)
+
+
+MODULE_DESCRIPTION = ("This module stores token bucket rate limiters keyed by user / chat id, kept in one ordered "
+                      "dict with TTL and size eviction.")
+
+
+class TokenBuckets:
+    """
+    One token bucket per key: ``burst`` tokens, refilled at ``rate`` tokens per second.
+    A bucket is only a (tokens, updated_at) tuple; buckets are kept in least recently used order, so idle ones
+    are evicted from the front in O(1) (an evicted bucket would be full anyway once idle for ``ttl_seconds``).
+    """
+
+    def __init__(self, rate: float, burst: float, ttl_seconds: float, max_size: int):
+
+        logger.debug("Initializing TokenBuckets")
+
+        self.rate = rate
+        self.burst = burst
+        self.ttl_seconds = max(ttl_seconds, burst / rate if rate > 0 else 0.0)
+        self.max_size = max_size
+        self._buckets: OrderedDict[Hashable, tuple[float, float]] = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._buckets)
+
+    def _tokens(self, key: Hashable, now: float) -> float:
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            return self.burst
+        tokens, updated_at = bucket
+        return min(self.burst, tokens + (now - updated_at) * self.rate)
+
+    def peek(self, key: Hashable, now: float | None = None) -> float:
+        """
+        Seconds until a token of the key is available (0.0 - right now); nothing is taken.
+        Check every limit with ``peek`` before taking from any, so a rejected call takes no tokens.
+        """
+
+        if now is None:
+            now = time.monotonic()
+        return max(0.0, (1.0 - self._tokens(key, now)) / self.rate)
+
+    def acquire(self, key: Hashable, max_wait: float = 0.0, now: float | None = None) -> float:
+        """
+        Take one token of the key.
+
+        Parameters:
+            key (Hashable): User / chat id.
+            max_wait (float): If the token is available within so many seconds, it is reserved
+                (tokens go below zero, so later callers wait longer).
+            now (float | None): Current monotonic time.
+
+        Returns:
+            float: Seconds until the taken token is available (0.0 - right now). If it is greater than
+            max_wait, nothing is taken.
+        """
+
+        if now is None:
+            now = time.monotonic()
+
+        tokens = self._tokens(key, now)
+        if key in self._buckets:
+            self._buckets.move_to_end(key)
+
+        wait = max(0.0, (1.0 - tokens) / self.rate)
+        if wait <= max_wait:
+            tokens -= 1.0
+        self._buckets[key] = (tokens, now)
+
+        self._evict(now)
+        return wait
+
+    def _evict(self, now: float) -> None:
+        buckets = self._buckets
+        while buckets:
+            key, (_, updated_at) = next(iter(buckets.items()))
+            if now - updated_at < self.ttl_seconds and len(buckets) <= self.max_size:
+                break
+            buckets.popitem(last=False)
+
+
+def main():
+    logger.info(START_MODULE_MESSAGE + str(__file__))
+    logger.info(MODULE_DESCRIPTION)
+    logger.info(str_object_is_created(TokenBuckets))
+
+
+if __name__ != "__main__":
+    main()
+
+
+if __name__ == "__main__":
+    main()
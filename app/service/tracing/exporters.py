@@ -0,0 +1,86 @@
+# app/service/tracing/exporters.py
+
+from __future__ import annotations
+
+import json
+import sys
+from pathlib import Path
+from typing import IO, Protocol, TYPE_CHECKING
+
+from app.config.settings import settings
+from app.service.logging.logger import (
+    logger,
+    START_MODULE_MESSAGE,
+    str_object_is_created,
+)
+
+if TYPE_CHECKING:
+    from app.service.tracing.tracer import Span
+
+
+MODULE_DESCRIPTION = "This module stores exporters of finished traces: JSON lines (one span per line) to stdout or a file."
+
+
+class SpanExporter(Protocol):
+    def export(self, spans: list[Span]) -> None: ...
+
+    def close(self) -> None: ...
+
+
+class JsonLinesExporter:
+    """
+    Spans of a trace are written together, so a trace is never interleaved with another one.
+    Only sampled traces are exported: a buffered write per trace is cheap enough for the event loop.
+    """
+
+    def __init__(self, stream: IO[str], close_stream: bool = False):
+
+        logger.debug("Initializing JsonLinesExporter")
+
+        self.stream = stream
+        self.close_stream = close_stream
+
+    @classmethod
+    def to_file(cls, path: str) -> "JsonLinesExporter":
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        return cls(open(path, "a", encoding="utf-8"), close_stream=True)
+
+    def export(self, spans: list[Span]) -> None:
+        self.stream.write("".join(
+            json.dumps(span.to_dict(), ensure_ascii=False, default=str, separators=(",", ":")) + "\n"
+            for span in spans
+        ))
+        self.stream.flush()
+
+    def close(self) -> None:
+        self.stream.flush()
+        if self.close_stream:
+            self.stream.close()
+
+
+def create_exporter(kind: str = settings.TRACING_EXPORTER, path: str = settings.TRACING_FILE_PATH) -> SpanExporter:
+    """
+    Create exporter according to settings.TRACING_EXPORTER ("file" or "stdout").
+    """
+
+    if kind == "stdout":
+        return JsonLinesExporter(sys.stdout)
+    if kind != "file":
+        logger.warning(f"Unknown TRACING_EXPORTER={kind}, file exporter is used")
+
+    logger.info(f"Traces are exported to {path}")
+    return JsonLinesExporter.to_file(path)
+
+
+def main():
+    logger.info(START_MODULE_MESSAGE + str(__file__))
+    logger.info(MODULE_DESCRIPTION)
+    logger.info(str_object_is_created(JsonLinesExporter))
+
+
+if __name__ != "__main__":
+    main()
+
+
+if __name__ == "__main__":
+    main()
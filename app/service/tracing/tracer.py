@@ -0,0 +1,295 @@
+# app/service/tracing/tracer.py
+
+import functools
+import random
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Iterator, TypeVar
+
+from app.config.settings import settings
+from app.service.lifecycle.shutdown import register_flush_hook
+from app.service.tracing.exporters import SpanExporter, create_exporter
+from app.service.logging.logger import (
+    logger,
+    START_MODULE_MESSAGE,
+    str_object_is_created,
+)
+
+
+MODULE_DESCRIPTION = ("This module provides tracing of updates: spans (update, middlewares, handler, SQL statements, "
+                      "Bot API calls) with head-based sampling; finished traces go to the exporter.")
+
+
+T = TypeVar("T")
+
+
+# attributes of the root span copied to exported child spans, so a span alone (e.g. a slow SQL statement
+# found by a search in the exporter) tells which update and chat it belongs to
+PROPAGATED_ATTRIBUTES = ("update_id", "chat_id")
+
+
+@dataclass(slots=True)
+class Span:
+    trace_id: str
+    span_id: str
+    parent_id: str | None
+    name: str
+    attributes: dict[str, Any] = field(default_factory=dict)
+    start_time: float = field(default_factory=time.time)
+    duration: float | None = None
+    error: str | None = None
+    _started: float = field(default_factory=time.perf_counter, repr=False)
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        self.attributes[key] = value
+
+    def finish(self, error: BaseException | None = None) -> None:
+        self.duration = time.perf_counter() - self._started
+        if error is not None:
+            self.error = f"{type(error).__name__}: {error}"
+
+    def to_dict(self) -> dict:
+        return {
+            "trace_id": self.trace_id,
+            "span_id": self.span_id,
+            "parent_id": self.parent_id,
+            "name": self.name,
+            "start_time": self.start_time,
+            "duration_ms": round(self.duration * 1000, 3) if self.duration is not None else None,
+            "attributes": self.attributes,
+            "error": self.error,
+        }
+
+
+@dataclass(slots=True)
+class Trace:
+    trace_id: str
+    root: Span | None = None
+    # finished child spans (the root is kept apart: it is finished last, but never dropped)
+    spans: list[Span] = field(default_factory=list)
+    dropped: int = 0
+    finished: bool = False
+
+
+_current_trace: ContextVar[Trace | None] = ContextVar("current_trace", default=None)
+_current_span: ContextVar[Span | None] = ContextVar("current_span", default=None)
+
+
+def new_trace_id() -> str:
+    return f"{random.getrandbits(128):032x}"
+
+
+def new_span_id() -> str:
+    return f"{random.getrandbits(64):016x}"
+
+
+class Tracer:
+    """
+    Head-based sampling: whether an update is traced is decided when its root span starts
+    (``sample_rate`` of updates). Inside a not sampled update ``span()`` yields None and costs
+    one context variable lookup, so instrumentation stays in place in production.
+    """
+
+    def __init__(
+        self,
+        sample_rate: float = settings.TRACING_SAMPLE_RATE,
+        exporter: SpanExporter | None = None,
+        max_spans_per_trace: int = settings.TRACING_MAX_SPANS_PER_TRACE,
+    ):
+
+        logger.debug("Initializing Tracer")
+
+        self.sample_rate = sample_rate
+        self.exporter = exporter
+        self.max_spans_per_trace = max_spans_per_trace
+
+        self.traces_started = 0
+        self.traces_sampled = 0
+        self.spans_exported = 0
+        self.spans_dropped = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.sample_rate > 0 and self.exporter is not None
+
+    def should_sample(self) -> bool:
+        return self.enabled and random.random() < self.sample_rate
+
+    @contextmanager
+    def trace(self, name: str, **attributes: Any) -> Iterator[Span | None]:
+        """
+        Root span of a unit of work (an update). Nested in another trace it is an ordinary span.
+
+        Parameters:
+            name (str): Name of the span.
+            **attributes: Attributes of the span (update_id, chat_id...).
+
+        Yields:
+            Span | None: The root span, or None if the trace is not sampled.
+        """
+
+        if _current_trace.get() is not None:
+            with self.span(name, **attributes) as span:
+                yield span
+            return
+
+        self.traces_started += 1
+        if not self.should_sample():
+            yield None
+            return
+
+        self.traces_sampled += 1
+        trace = Trace(new_trace_id())
+        root = trace.root = Span(trace.trace_id, new_span_id(), None, name, attributes)
+
+        trace_token = _current_trace.set(trace)
+        span_token = _current_span.set(root)
+        error = None
+        try:
+            yield root
+        except BaseException as e:
+            error = e
+            raise
+        finally:
+            _current_span.reset(span_token)
+            _current_trace.reset(trace_token)
+            root.finish(error)
+            self._export(trace)
+
+    @contextmanager
+    def span(self, name: str, **attributes: Any) -> Iterator[Span | None]:
+        """
+        Child of the current span (no-op outside of a sampled trace).
+
+        Parameters:
+            name (str): Name of the span.
+            **attributes: Attributes of the span.
+
+        Yields:
+            Span | None: The span, or None if there is no sampled trace.
+        """
+
+        span = self.start_span(name, **attributes)
+        if span is None:
+            yield None
+            return
+
+        token = _current_span.set(span)
+        error = None
+        try:
+            yield span
+        except BaseException as e:
+            error = e
+            raise
+        finally:
+            _current_span.reset(token)
+            self.end_span(span, error)
+
+    def start_span(self, name: str, **attributes: Any) -> Span | None:
+        """
+        Start a leaf span which is not made current, for code where start and end are separate callbacks
+        (e.g. SQLAlchemy cursor events). Must be finished by ``end_span``.
+        """
+
+        trace = _current_trace.get()
+        if trace is None:
+            return None
+
+        parent = _current_span.get()
+        return Span(trace.trace_id, new_span_id(), parent.span_id if parent is not None else None, name, attributes)
+
+    def end_span(self, span: Span | None, error: BaseException | None = None) -> None:
+        if span is None:
+            return
+
+        span.finish(error)
+        trace = _current_trace.get()
+        if trace is not None and trace.trace_id == span.trace_id:
+            self._add(trace, span)
+
+    def _add(self, trace: Trace, span: Span) -> None:
+        # spans finished after the trace is exported (e.g. tasks spawned by the handler) are dropped;
+        # one slot of the limit is reserved for the root span
+        if trace.finished or len(trace.spans) >= self.max_spans_per_trace - 1:
+            trace.dropped += 1
+            self.spans_dropped += 1
+            return
+        trace.spans.append(span)
+
+    def _export(self, trace: Trace) -> None:
+        trace.finished = True
+        root = trace.root
+        if trace.dropped:
+            root.set_attribute("dropped_spans", trace.dropped)
+
+        propagated = {key: root.attributes[key] for key in PROPAGATED_ATTRIBUTES
+                      if root.attributes.get(key) is not None}
+        if propagated:
+            for span in trace.spans:
+                for key, value in propagated.items():
+                    span.attributes.setdefault(key, value)
+
+        spans = [*trace.spans, root]
+        try:
+            self.exporter.export(spans)
+            self.spans_exported += len(spans)
+        except Exception as e:
+            logger.error(f"Failed to export trace {trace.trace_id}: {e!r}")
+
+    def traced(self, name: str | None = None) -> Callable[[Callable[..., Awaitable[T]]], Callable[..., Awaitable[T]]]:
+        """
+        Decorator: the coroutine function runs in a span (named after the function by default).
+        """
+
+        def decorator(func: Callable[..., Awaitable[T]]) -> Callable[..., Awaitable[T]]:
+            span_name = name or func.__qualname__
+
+            @functools.wraps(func)
+            async def wrapper(*args: Any, **kwargs: Any) -> T:
+                if _current_trace.get() is None:
+                    return await func(*args, **kwargs)
+                with self.span(span_name):
+                    return await func(*args, **kwargs)
+
+            return wrapper
+
+        return decorator
+
+    def stats(self) -> dict:
+        return {
+            "sample_rate": self.sample_rate,
+            "traces": self.traces_started,
+            "sampled": self.traces_sampled,
+            "spans_exported": self.spans_exported,
+            "spans_dropped": self.spans_dropped,
+        }
+
+    async def close(self) -> None:
+        if self.exporter is not None:
+            self.exporter.close()
+
+
+def current_span() -> Span | None:
+    """The current span of the sampled trace (None if the update is not traced)."""
+    return _current_span.get()
+
+
+tracer = Tracer(exporter=create_exporter() if settings.TRACING_SAMPLE_RATE > 0 else None)
+
+register_flush_hook("tracing", tracer.close)
+
+
+def main():
+    logger.info(START_MODULE_MESSAGE + str(__file__))
+    logger.info(MODULE_DESCRIPTION)
+    logger.info(str_object_is_created(tracer))
+
+
+if __name__ != "__main__":
+    main()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+# benchmarks/bot_api_session.py
+
+import argparse
+import asyncio
+import random
+import statistics
+import time
+
+from aiohttp import web
+from aiogram import Bot
+from aiogram.client.session.aiohttp import AiohttpSession
+from aiogram.client.telegram import TelegramAPIServer
+
+from app.aiogram_services.session import TunedAiohttpSession
+from app.service.logging.logger import (
+    logger,
+    START_MODULE_MESSAGE,
+)
+
+
+MODULE_DESCRIPTION = ("Benchmark of Bot API sessions against a local fake Bot API: default aiogram session, "
+                      "tuned session without keep-alive and tuned session. "
+                      "Usage: python -m benchmarks.bot_api_session --requests 2000 --error-rate 0.02")
+
+
+TOKEN = "42:BENCHMARK"
+
+
+def make_fake_api(latency: float, error_rate: float, rng: random.Random) -> web.Application:
+    """Fake Bot API: every method returns the bot user (getMe result); some requests fail with 502."""
+
+    async def handle(request: web.Request) -> web.Response:
+        await asyncio.sleep(latency)
+        if rng.random() < error_rate:
+            return web.json_response({"ok": False, "error_code": 502, "description": "Bad Gateway"}, status=502)
+
+        return web.json_response({"ok": True, "result": {"id": 42, "is_bot": True, "first_name": "benchmark"}})
+
+    app = web.Application()
+    app.router.add_post("/bot{token}/{method}", handle)
+    return app
+
+
+async def measure(name: str, session: AiohttpSession, requests: int, concurrency: int) -> None:
+    bot = Bot(token=TOKEN, session=session)
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies: list[float] = []
+    errors = 0
+
+    async def one_request() -> None:
+        nonlocal errors
+        async with semaphore:
+            started = time.perf_counter()
+            try:
+                await bot.get_me()
+            except Exception:
+                errors += 1
+                return
+            latencies.append(time.perf_counter() - started)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(one_request() for _ in range(requests)))
+    elapsed = time.perf_counter() - started
+
+    if not latencies:
+        logger.error(f"{name}: all {requests} requests failed")
+        await session.close()
+        return
+
+    latencies.sort()
+    p95 = latencies[int(len(latencies) * 0.95) - 1]
+    line = (
+        f"{name}: {requests / elapsed:.0f} req/s, p50 {statistics.median(latencies) * 1000:.2f}ms, "
+        f"p95 {p95 * 1000:.2f}ms, failed {errors}"
+    )
+    if isinstance(session, TunedAiohttpSession):
+        line += f", {session.stats()}"
+    logger.info(line)
+
+    await session.close()
+
+
+async def run(requests: int, concurrency: int, latency: float, error_rate: float) -> None:
+    runner = web.AppRunner(make_fake_api(latency, error_rate, random.Random(42)))
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+    port = site._server.sockets[0].getsockname()[1]
+
+    api = TelegramAPIServer.from_base(f"http://127.0.0.1:{port}")
+    fast_retries = {"retry_base_delay": 0.01, "retry_max_delay": 0.1}
+
+    try:
+        await measure("default session      ", AiohttpSession(api=api), requests, concurrency)
+        await measure("tuned, no keep-alive ", TunedAiohttpSession(api=api, keepalive_seconds=0, **fast_retries),
+                      requests, concurrency)
+        await measure("tuned                ", TunedAiohttpSession(api=api, **fast_retries), requests, concurrency)
+    finally:
+        await runner.cleanup()
+
+
+def main():
+    logger.info(START_MODULE_MESSAGE + str(__file__))
+    logger.info(MODULE_DESCRIPTION)
+
+    parser = argparse.ArgumentParser(description=MODULE_DESCRIPTION)
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--latency", type=float, default=0.002, help="server side latency, seconds")
+    parser.add_argument("--error-rate", type=float, default=0.02, help="share of requests failing with 502")
+    args = parser.parse_args()
+
+    asyncio.run(run(args.requests, args.concurrency, args.latency, args.error_rate))
+
+
+if __name__ == "__main__":
+    main()
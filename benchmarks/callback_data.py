@@ -0,0 +1,119 @@
+# benchmarks/callback_data.py
+
+import argparse
+import asyncio
+import timeit
+from uuid import uuid4
+
+from aiogram.filters.callback_data import CallbackData
+from aiogram.types import CallbackQuery, InlineKeyboardButton, InlineKeyboardMarkup, User
+
+from app.aiogram_services.keyboards.callback_data import CompactCallback
+from app.aiogram_services.keyboards.registry import KeyboardRegistry
+from app.service.logging.logger import (
+    logger,
+    START_MODULE_MESSAGE,
+)
+
+
+MODULE_DESCRIPTION = ("Microbenchmark of callback data and keyboards: aiogram CallbackData vs CompactCallback "
+                      "(pack, unpack, filter of a matching and of another kind query), and a markup built per "
+                      "response vs a registered one. Usage: python -m benchmarks.callback_data --number 20000")
+
+
+class RuleCallback(CallbackData, prefix="nr"):
+    rule_uuid: str
+    chat_id: int
+    message_id: int
+    action: int
+
+
+class OtherCallback(CallbackData, prefix="ot"):
+    page: int
+
+
+compact_rule = CompactCallback("nr", rule_uuid="uuid", chat_id="int64", message_id="int32", action="uint8")
+compact_other = CompactCallback("ot", page="uint16")
+
+VALUES = {"rule_uuid": uuid4(), "chat_id": -1001234567890, "message_id": 1234567, "action": 3}
+
+
+def build_keyboard(pack) -> InlineKeyboardMarkup:
+    return InlineKeyboardMarkup(inline_keyboard=[
+        [InlineKeyboardButton(text=f"Action {action}", callback_data=pack(action)) for action in range(row, row + 3)]
+        for row in range(0, 9, 3)
+    ])
+
+
+def run_filter(callback_filter, query: CallbackQuery):
+    coroutine = callback_filter(query)
+    try:
+        coroutine.send(None)
+    except StopIteration as e:
+        return e.value
+    raise RuntimeError("filter awaited something")
+
+
+def measure(name: str, func, number: int) -> None:
+    seconds = min(timeit.repeat(func, number=number, repeat=3))
+    logger.info(f"{name:<44}: {seconds / number * 1e9:8.0f} ns/op")
+
+
+def query(data: str) -> CallbackQuery:
+    return CallbackQuery(id="1", from_user=User(id=1, is_bot=False, first_name="benchmark"), chat_instance="1",
+                         data=data)
+
+
+def run(number: int) -> None:
+    aiogram_values = {**VALUES, "rule_uuid": VALUES["rule_uuid"].hex}
+    aiogram_data = RuleCallback(**aiogram_values).pack()
+    compact_data = compact_rule.pack(**VALUES)
+    logger.info(f"callback data length: aiogram {len(aiogram_data)} bytes, compact {len(compact_data)} bytes "
+                f"(limit 64, compact max {compact_rule.max_length})")
+
+    measure("aiogram pack", lambda: RuleCallback(**aiogram_values).pack(), number)
+    measure("compact pack", lambda: compact_rule.pack(**VALUES), number)
+    measure("aiogram unpack", lambda: RuleCallback.unpack(aiogram_data), number)
+    measure("compact unpack", lambda: compact_rule.unpack(compact_data), number)
+
+    aiogram_filter = RuleCallback.filter()
+    compact_filter = compact_rule.filter(action=3)
+    aiogram_query, compact_query = query(aiogram_data), query(compact_data)
+    aiogram_other = query(OtherCallback(page=2).pack())
+    compact_other_query = query(compact_other.pack(page=2))
+    assert run_filter(aiogram_filter, aiogram_query) and run_filter(compact_filter, compact_query)
+
+    measure("aiogram filter, matching query", lambda: run_filter(aiogram_filter, aiogram_query), number)
+    measure("compact filter, matching query", lambda: run_filter(compact_filter, compact_query), number)
+    measure("aiogram filter, query of another kind", lambda: run_filter(aiogram_filter, aiogram_other), number)
+    measure("compact filter, query of another kind", lambda: run_filter(compact_filter, compact_other_query), number)
+
+    def aiogram_pack(action: int) -> str:
+        return RuleCallback(**{**aiogram_values, "action": action}).pack()
+
+    def compact_pack(action: int) -> str:
+        return compact_rule.pack(**{**VALUES, "action": action})
+
+    registry = KeyboardRegistry()
+    registry.static("rule")(lambda: build_keyboard(compact_pack))
+    registry.build_all()
+
+    keyboard_number = max(1, number // 20)
+    measure("keyboard per response, aiogram callback data", lambda: build_keyboard(aiogram_pack), keyboard_number)
+    measure("keyboard per response, compact callback data", lambda: build_keyboard(compact_pack), keyboard_number)
+    measure("registered keyboard", lambda: registry.get("rule"), number)
+
+
+def main():
+    logger.info(START_MODULE_MESSAGE + str(__file__))
+    logger.info(MODULE_DESCRIPTION)
+
+    parser = argparse.ArgumentParser(description=MODULE_DESCRIPTION)
+    parser.add_argument("--number", type=int, default=20000, help="calls per measurement")
+    args = parser.parse_args()
+
+    run(args.number)
+
+
+if __name__ == "__main__":
+    main()
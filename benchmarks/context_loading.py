@@ -0,0 +1,116 @@
+# benchmarks/context_loading.py
+
+import argparse
+import asyncio
+import json
+import random
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+from pathlib import Path
+from uuid import uuid4
+
+from sqlalchemy import insert, select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlmodel import SQLModel
+
+from app.service.database.models.message import Message
+from app.service.database.crud.messages import fetch_context_messages, fetch_context_records
+from app.service.logging.logger import (
+    logger,
+    START_MODULE_MESSAGE,
+)
+
+
+MODULE_DESCRIPTION = ("Benchmark of context loading: ORM entities (fetch_context_messages) vs compact projections "
+                      "(fetch_context_records). Usage: python -m benchmarks.context_loading --contexts 500")
+
+
+# one busy chat: context windows are built within a chat
+CHATS = 1
+MESSAGES_PER_CHAT = 20_000
+REPLY_PROBABILITY = 0.6
+JSON_PAYLOAD_BYTES = 16_000
+
+
+def make_rows(rng: random.Random) -> list[dict]:
+    base_time = datetime.utcnow() - timedelta(days=1)
+    payload = json.dumps({"entities": "x" * JSON_PAYLOAD_BYTES})
+    rows = []
+    for chat_index in range(CHATS):
+        chat_id = -100_000_000_000 - chat_index
+        for message_id in range(1, MESSAGES_PER_CHAT + 1):
+            reply_to = message_id - rng.randint(1, 3) if message_id > 3 and rng.random() < REPLY_PROBABILITY else None
+            rows.append({
+                "uuid": uuid4(),
+                "created_at": base_time + timedelta(seconds=message_id * 10),
+                "id": message_id,
+                "chat_id": chat_id,
+                "from_user_id": rng.randrange(50),
+                "reply_to_message": reply_to,
+                "text": f"message {message_id} " + "lorem ipsum " * rng.randint(1, 20),
+                "message_link": None,
+                "str_json_data": payload,
+            })
+    return rows
+
+
+async def measure(name: str, session_factory, targets: list[Message], loader) -> None:
+    tracemalloc.start()
+    started = time.perf_counter()
+    contexts = []
+
+    async with session_factory() as db:
+        for target in targets:
+            contexts.append(await loader(db, target))
+
+    elapsed = time.perf_counter() - started
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    loaded = sum(len(context) for context in contexts)
+    logger.info(
+        f"{name}: {len(targets)} contexts, {loaded} messages, "
+        f"{elapsed * 1000 / len(targets):.2f}ms per context, peak memory {peak / 1024 / 1024:.1f}MiB"
+    )
+
+
+async def run(contexts: int) -> None:
+    rng = random.Random(42)
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        engine = create_async_engine(f"sqlite+aiosqlite:///{(Path(tmp_dir) / 'context_benchmark.db').as_posix()}")
+        session_factory = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+
+        async with engine.begin() as conn:
+            await conn.run_sync(SQLModel.metadata.create_all)
+            await conn.execute(insert(Message.__table__), make_rows(rng))
+
+        async with session_factory() as db:
+            result = await db.execute(select(Message.chat_id, Message.id))
+            keys = rng.sample(list(result.all()), k=contexts)
+
+        # detached lightweight targets: both loaders reload the target themselves
+        targets = [Message(id=message_id, chat_id=chat_id, from_user_id=0, text="", str_json_data="")
+                   for chat_id, message_id in keys]
+
+        await measure("ORM entities", session_factory, targets, fetch_context_messages)
+        await measure("projections ", session_factory, targets, fetch_context_records)
+
+        await engine.dispose()
+
+
+def main():
+    logger.info(START_MODULE_MESSAGE + str(__file__))
+    logger.info(MODULE_DESCRIPTION)
+
+    parser = argparse.ArgumentParser(description=MODULE_DESCRIPTION)
+    parser.add_argument("--contexts", type=int, default=500)
+    args = parser.parse_args()
+
+    asyncio.run(run(args.contexts))
+
+
+if __name__ == "__main__":
+    main()
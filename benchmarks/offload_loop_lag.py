@@ -0,0 +1,112 @@
+# benchmarks/offload_loop_lag.py
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import statistics
+import time
+
+from app.service.offload.executor import INLINE, PROCESS, THREAD, OffloadExecutor
+from app.service.logging.logger import (
+    logger,
+    START_MODULE_MESSAGE,
+)
+
+
+MODULE_DESCRIPTION = ("Benchmark of event loop lag while big message payloads are serialized to JSON: "
+                      "on the loop, in the offload thread pool and in the offload process pool. "
+                      "Usage: python -m benchmarks.offload_loop_lag --messages 400 --text-length 4096")
+
+
+STEP = "serialize"
+
+
+def serialize(payload: dict) -> str:
+    # module level: process workers unpickle it by name
+    return json.dumps(payload, ensure_ascii=False)
+
+
+def make_payload(rng: random.Random, text_length: int) -> dict:
+    words = ["".join(rng.choices("абвгдежзиклмнопрстуфхцчшщэюяabcdefghijklmnopqrstuvwxyz", k=rng.randint(2, 10)))
+             for _ in range(text_length // 6)]
+    text = " ".join(words)[:text_length]
+    return {
+        "message_id": rng.randint(1, 10 ** 9),
+        "date": 1_700_000_000,
+        "chat": {"id": -100 * rng.randint(1, 10 ** 9), "type": "supergroup", "title": "benchmark"},
+        "from": {"id": rng.randint(1, 10 ** 9), "is_bot": False, "first_name": "benchmark"},
+        "text": text,
+        "entities": [{"type": "bold", "offset": offset, "length": 5} for offset in range(0, len(text), 97)],
+    }
+
+
+async def heartbeat(interval: float, lags: list[float], stop: asyncio.Event) -> None:
+    """Sleeps for the interval; how much later than asked it wakes up is the loop lag."""
+    while not stop.is_set():
+        started = time.perf_counter()
+        await asyncio.sleep(interval)
+        lags.append(time.perf_counter() - started - interval)
+
+
+async def measure(kind: str, payloads: list[dict], concurrency: int, workers: int) -> None:
+    executor = OffloadExecutor(process_workers=workers, thread_workers=workers)
+    executor.register(STEP, serialize, kind)
+
+    # start the pool (spawning workers) before measuring
+    await executor.run(STEP, payloads[0])
+
+    lags: list[float] = []
+    stop = asyncio.Event()
+    heartbeat_task = asyncio.create_task(heartbeat(0.001, lags, stop))
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one(payload: dict) -> None:
+        async with semaphore:
+            await executor.run(STEP, payload)
+            # other work of the handler: lets the heartbeat run between messages
+            await asyncio.sleep(0)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(one(payload) for payload in payloads))
+    elapsed = time.perf_counter() - started
+
+    stop.set()
+    await heartbeat_task
+    await executor.shutdown()
+
+    lags.sort()
+    p99 = lags[max(0, int(len(lags) * 0.99) - 1)]
+    logger.info(
+        f"{kind:<8}: {len(payloads) / elapsed:.0f} messages/s, loop lag p50 {statistics.median(lags) * 1000:.2f}ms, "
+        f"p99 {p99 * 1000:.2f}ms, max {lags[-1] * 1000:.2f}ms, batches {executor.stats()[STEP]['batches']}"
+    )
+
+
+async def run(messages: int, text_length: int, concurrency: int, workers: int) -> None:
+    rng = random.Random(42)
+    payloads = [make_payload(rng, text_length) for _ in range(messages)]
+
+    for kind in (INLINE, THREAD, PROCESS):
+        await measure(kind, payloads, concurrency, workers)
+
+
+def main():
+    logger.info(START_MODULE_MESSAGE + str(__file__))
+    logger.info(MODULE_DESCRIPTION)
+
+    parser = argparse.ArgumentParser(description=MODULE_DESCRIPTION)
+    parser.add_argument("--messages", type=int, default=400)
+    parser.add_argument("--text-length", type=int, default=4096,
+                        help="characters of text (Telegram limit: 4096 for text, 1024 for captions)")
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--workers", type=int, default=0, help="pool workers (0 - number of CPUs - 1)")
+    args = parser.parse_args()
+
+    workers = args.workers or max(1, (os.cpu_count() or 2) - 1)
+    asyncio.run(run(args.messages, args.text_length, args.concurrency, workers))
+
+
+if __name__ == "__main__":
+    main()
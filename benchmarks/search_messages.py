@@ -0,0 +1,134 @@
+# benchmarks/search_messages.py
+
+import argparse
+import asyncio
+import random
+import statistics
+import tempfile
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+from uuid import uuid4
+
+from sqlalchemy import insert
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlmodel import SQLModel
+
+from app.service.database.models.message import Message
+from app.service.database.search import install_full_text_search
+from app.service.database.crud.messages import search_messages
+from app.service.logging.logger import (
+    logger,
+    START_MODULE_MESSAGE,
+)
+
+
+MODULE_DESCRIPTION = ("Benchmark of full-text search over synthetic messages. "
+                      "Usage: python -m benchmarks.search_messages --rows 2000000 [--url postgresql+asyncpg://...]")
+
+
+BATCH_SIZE = 20_000
+CHATS = 200
+USERS = 5_000
+VOCABULARY_SIZE = 50_000
+TARGET_P95_MS = 100.0
+
+
+def make_vocabulary(rng: random.Random) -> list[str]:
+    letters = "abcdefghijklmnopqrstuvwxyz"
+    return ["".join(rng.choices(letters, k=rng.randint(3, 10))) for _ in range(VOCABULARY_SIZE)]
+
+
+def make_rows(rng: random.Random, vocabulary: list[str], weights: list[float], start: int, count: int) -> list[dict]:
+    base_time = datetime.utcnow() - timedelta(days=365)
+    rows = []
+    for i in range(start, start + count):
+        chat_id = -100_000_000_000 - rng.randrange(CHATS)
+        text = " ".join(rng.choices(vocabulary, weights=weights, k=rng.randint(5, 30)))
+        rows.append({
+            "uuid": uuid4(),
+            "created_at": base_time + timedelta(seconds=i * 5),
+            "id": i,
+            "chat_id": chat_id,
+            "from_user_id": rng.randrange(USERS),
+            "reply_to_message": None,
+            "text": text,
+            "message_link": None,
+            "str_json_data": "{}",
+        })
+    return rows
+
+
+async def load(engine, rows_count: int, rng: random.Random, vocabulary: list[str]) -> None:
+    # Zipf-like word frequencies, as in real chats
+    weights = [1.0 / (rank + 1) for rank in range(len(vocabulary))]
+
+    async with engine.begin() as conn:
+        await conn.run_sync(SQLModel.metadata.create_all)
+        # installed before loading: rows are indexed on insert, exactly as in production
+        await install_full_text_search(conn)
+
+    started = time.perf_counter()
+    for start in range(0, rows_count, BATCH_SIZE):
+        rows = make_rows(rng, vocabulary, weights, start, min(BATCH_SIZE, rows_count - start))
+        async with engine.begin() as conn:
+            await conn.execute(insert(Message.__table__), rows)
+        logger.info(f"Loaded {start + len(rows)} / {rows_count} rows")
+
+    logger.info(f"Loading took {time.perf_counter() - started:.1f}s")
+
+
+async def run_queries(session_factory, queries: int, rng: random.Random, vocabulary: list[str]) -> list[float]:
+    # mid-frequency words: neither stop words nor words which are never found
+    candidates = vocabulary[100:5_000]
+    timings: list[float] = []
+
+    for i in range(queries):
+        query = " ".join(rng.sample(candidates, k=rng.randint(1, 2)))
+        chat_id = -100_000_000_000 - rng.randrange(CHATS) if i % 2 else None
+
+        async with session_factory() as db:
+            started = time.perf_counter()
+            await search_messages(db, query, chat_id=chat_id, limit=20, offset=rng.choice((0, 0, 20)))
+            timings.append((time.perf_counter() - started) * 1000)
+
+    return timings
+
+
+async def run(rows_count: int, queries: int, url: str | None) -> None:
+    rng = random.Random(42)
+    vocabulary = make_vocabulary(rng)
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        url = url or f"sqlite+aiosqlite:///{(Path(tmp_dir) / 'search_benchmark.db').as_posix()}"
+        engine = create_async_engine(url)
+        session_factory = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+
+        await load(engine, rows_count, rng, vocabulary)
+        timings = await run_queries(session_factory, queries, rng, vocabulary)
+        await engine.dispose()
+
+    timings.sort()
+    p50 = statistics.median(timings)
+    p95 = timings[int(len(timings) * 0.95) - 1]
+    logger.info(f"rows={rows_count} queries={queries} p50={p50:.1f}ms p95={p95:.1f}ms max={timings[-1]:.1f}ms")
+
+    if p95 > TARGET_P95_MS:
+        logger.warning(f"p95 is above target {TARGET_P95_MS}ms")
+
+
+def main():
+    logger.info(START_MODULE_MESSAGE + str(__file__))
+    logger.info(MODULE_DESCRIPTION)
+
+    parser = argparse.ArgumentParser(description=MODULE_DESCRIPTION)
+    parser.add_argument("--rows", type=int, default=2_000_000)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--url", default=None, help="SQLAlchemy URL of an empty database (temporary SQLite by default)")
+    args = parser.parse_args()
+
+    asyncio.run(run(args.rows, args.queries, args.url))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,46 @@
+# tests/conftest.py
+
+import asyncio
+import os
+import tempfile
+
+import pytest
+
+
+# settings are read when app modules are imported: minimal environment of a local run on SQLite
+# (the database file lives in a temporary directory, ROOT_DIR / DB_FILE keeps absolute paths as is)
+TEST_ENVIRONMENT = {
+    "BOT_TOKEN": "123456:AAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAA",
+    "DB_ENGINE": "sqlite+aiosqlite",
+    "DB_FILE": os.path.join(tempfile.mkdtemp(prefix="bot-tests-"), "test.db"),
+    "DB_HOST": "localhost",
+    "DB_PORT": "5432",
+    "DB_NAME": "test",
+    "DB_USER": "test",
+    "DB_PASSWORD": "test",
+}
+
+for name, value in TEST_ENVIRONMENT.items():
+    os.environ.setdefault(name, value)
+
+
+@pytest.fixture
+def database():
+    """
+    Empty tables of the application database (``init_db`` schema, full-text search included).
+    Every test runs its own event loop: connections of the engine are closed before and after the test.
+    """
+
+    from sqlmodel import SQLModel
+    from app.service.database.database import engine, init_db
+
+    async def reset() -> None:
+        await init_db()
+        async with engine.begin() as conn:
+            for table in reversed(SQLModel.metadata.sorted_tables):
+                await conn.execute(table.delete())
+        await engine.dispose()
+
+    asyncio.run(reset())
+    yield engine
+    asyncio.run(engine.dispose())
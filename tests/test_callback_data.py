@@ -0,0 +1,115 @@
+# tests/test_callback_data.py
+
+import asyncio
+import base64
+from uuid import uuid4
+
+import pytest
+from aiogram.types import CallbackQuery, User
+
+from app.aiogram_services.keyboards.callback_data import CALLBACK_DATA_LIMIT, CompactCallback
+
+
+rule_callback = CompactCallback("nr", rule_uuid="uuid", chat_id="int64", message_id="int32", action="uint8",
+                                confirmed="bool")
+
+
+def test_values_round_trip():
+    values = dict(rule_uuid=uuid4(), chat_id=-1001234567890, message_id=2**31 - 1, action=255, confirmed=True)
+
+    data = rule_callback.pack(**values)
+
+    assert data.startswith("nr.")
+    assert len(data.encode()) == rule_callback.max_length <= CALLBACK_DATA_LIMIT
+    assert rule_callback.unpack(data)._asdict() == values
+
+
+def test_factory_over_the_limit_is_rejected_when_defined():
+    # "x." and 46 bytes -> 62 base64 characters: exactly 64 bytes
+    fields = dict(first="uuid", second="uuid", third="int64", fourth="int32", fifth="uint16")
+    at_limit = CompactCallback("x", **fields)
+    data = at_limit.pack(first=uuid4(), second=uuid4(), third=-1, fourth=-1, fifth=65535)
+    assert len(data.encode()) == at_limit.max_length == CALLBACK_DATA_LIMIT
+
+    with pytest.raises(ValueError, match="Telegram limit"):
+        CompactCallback("x", **fields, sixth="uint8")
+    # the prefix is counted in bytes
+    with pytest.raises(ValueError, match="Telegram limit"):
+        CompactCallback("ü", **fields)
+
+
+@pytest.mark.parametrize("prefix, fields", [
+    ("", {"action": "uint8"}),
+    ("a.b", {"action": "uint8"}),
+    ("nr", {"action": "float"}),
+])
+def test_invalid_factories_are_rejected(prefix, fields):
+    with pytest.raises(ValueError):
+        CompactCallback(prefix, **fields)
+
+
+@pytest.mark.parametrize("values", [
+    dict(action=1),
+    dict(action=1, page=2, extra=3),
+    dict(action=256, page=0),
+    dict(action=-1, page=0),
+    dict(action="1", page=0),
+])
+def test_invalid_values_are_rejected(values):
+    callback = CompactCallback("pg", action="uint8", page="uint16")
+
+    with pytest.raises(ValueError):
+        callback.pack(**values)
+
+
+def test_uuid_field_needs_a_uuid():
+    with pytest.raises(ValueError):
+        rule_callback.pack(rule_uuid=str(uuid4()), chat_id=1, message_id=1, action=1, confirmed=False)
+
+
+def test_malformed_data_is_rejected():
+    callback = CompactCallback("pg", action="uint8", page="uint16")
+    data = callback.pack(action=1, page=500)
+    encoded = data[len("pg."):]
+
+    malformed = [
+        "dg." + encoded,                    # other kind
+        "pg",                               # no separator
+        "pg.",                              # no fields
+        data[:-1],                          # truncated
+        data + "A",                         # too long
+        data + "=",                         # padded
+        "pg." + encoded[:2] + "!" + encoded[2:],  # outside of the alphabet
+        "pg." + encoded[:2] + "é" + encoded[3:],  # not ASCII
+        "pg." + base64.b64encode(b"\xff\xfb\xff").decode(),  # standard alphabet ("+", "/")
+    ]
+    for damaged in malformed:
+        with pytest.raises(ValueError):
+            callback.unpack(damaged)
+
+
+def test_filter_passes_values_of_its_kind_only():
+    callback = CompactCallback("pg", action="uint8", page="uint16")
+    user = User(id=7, is_bot=False, first_name="test")
+
+    def query(data: str | None) -> CallbackQuery:
+        return CallbackQuery(id="1", from_user=user, chat_instance="1", data=data)
+
+    async def scenario():
+        page_filter = callback.filter(action=1)
+        return [
+            await page_filter(query(callback.pack(action=1, page=3))),
+            await page_filter(query(callback.pack(action=2, page=3))),
+            await page_filter(query("pg.damaged")),
+            await page_filter(query("dg.AQ")),
+            await page_filter(query(None)),
+        ]
+
+    matched, *rejected = asyncio.run(scenario())
+
+    assert matched["callback_data"] == (1, 3)
+    assert matched["callback_data"].page == 3
+    assert rejected == [False] * 4
+
+    with pytest.raises(ValueError):
+        callback.filter(missing=1)
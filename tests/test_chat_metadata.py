@@ -0,0 +1,130 @@
+# tests/test_chat_metadata.py
+
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+from aiogram.types import Chat
+
+import app.service.chats.metadata as metadata_module
+from app.service.chats.metadata import ChatInfo, ChatMetadataCache, build_message_link
+
+
+SUPERGROUP = Chat(id=-1001234567890, type="supergroup", title="Support")
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = SimpleNamespace(now=1000.0)
+    monkeypatch.setattr(metadata_module, "time", SimpleNamespace(monotonic=lambda: clock.now))
+    return clock
+
+
+class SlowFetcher:
+    """getChat stand-in: answers when released, counts the calls."""
+
+    def __init__(self, title: str = "Support"):
+        self.title = title
+        self.calls: list[int] = []
+        self.release = asyncio.Event()
+        self.fail = False
+
+    async def __call__(self, chat_id: int) -> Chat:
+        self.calls.append(chat_id)
+        await self.release.wait()
+        if self.fail:
+            raise RuntimeError("Bad Request: chat not found")
+        return Chat(id=chat_id, type="supergroup", title=self.title)
+
+
+def test_concurrent_misses_share_one_get_chat_call(clock):
+    async def scenario():
+        fetcher = SlowFetcher()
+        cache = ChatMetadataCache(fetcher=fetcher, max_size=10, ttl_seconds=60, error_ttl_seconds=5)
+
+        waiting = [asyncio.create_task(cache.resolve(SUPERGROUP.id)) for _ in range(5)]
+        cache.prefetch(SUPERGROUP.id)
+        await asyncio.sleep(0)
+        # a cancelled caller does not cancel the call the others wait for
+        waiting[0].cancel()
+        fetcher.release.set()
+
+        results = await asyncio.gather(*waiting[1:])
+        return cache, fetcher, results
+
+    cache, fetcher, results = asyncio.run(scenario())
+
+    assert fetcher.calls == [SUPERGROUP.id]
+    assert results == [ChatInfo(SUPERGROUP.id, "supergroup", "Support")] * 4
+    assert cache.stats() == {"size": 1, "hits": 0, "misses": 5, "fetches": 1, "fetch_errors": 0}
+
+
+def test_stale_entry_is_returned_and_refreshed_in_background(clock):
+    async def scenario():
+        fetcher = SlowFetcher(title="Support team")
+        fetcher.release.set()
+        cache = ChatMetadataCache(fetcher=fetcher, max_size=10, ttl_seconds=60, error_ttl_seconds=5)
+        cache.update_from_chat(SUPERGROUP)
+
+        results = {"fresh": await cache.resolve(SUPERGROUP.id)}
+        clock.now += 60
+        results["stale"] = await cache.resolve(SUPERGROUP.id)
+        await asyncio.sleep(0)
+        results["refreshed"] = await cache.resolve(SUPERGROUP.id)
+        return cache, fetcher, results
+
+    cache, fetcher, results = asyncio.run(scenario())
+
+    assert results["fresh"].title == "Support"
+    assert results["stale"].title == "Support"
+    assert results["refreshed"].title == "Support team"
+    assert fetcher.calls == [SUPERGROUP.id]
+    assert cache.stats()["hits"] == 3
+
+
+def test_failed_get_chat_is_remembered_for_error_ttl(clock):
+    async def scenario():
+        fetcher = SlowFetcher()
+        fetcher.fail = True
+        fetcher.release.set()
+        cache = ChatMetadataCache(fetcher=fetcher, max_size=10, ttl_seconds=60, error_ttl_seconds=5)
+
+        results = [await cache.resolve(SUPERGROUP.id), await cache.resolve(SUPERGROUP.id)]
+        calls_within_error_ttl = len(fetcher.calls)
+
+        clock.now += 5
+        fetcher.fail = False
+        results.append(await cache.resolve(SUPERGROUP.id))
+        return cache, fetcher, results, calls_within_error_ttl
+
+    cache, fetcher, results, calls_within_error_ttl = asyncio.run(scenario())
+
+    assert results[:2] == [None, None]
+    assert calls_within_error_ttl == 1
+    # an expired failure is fetched again (the caller waits: there is nothing to return)
+    assert results[2].title == "Support"
+    assert cache.stats()["fetch_errors"] == 1
+
+
+def test_least_recently_used_chats_are_evicted(clock):
+    cache = ChatMetadataCache(fetcher=SlowFetcher(), max_size=2, ttl_seconds=60, error_ttl_seconds=5)
+    for chat_id in (-1, -2, -3):
+        cache.update_from_chat(Chat(id=chat_id, type="group", title=f"chat {chat_id}"))
+        if chat_id == -2:
+            cache.update_from_chat(Chat(id=-1, type="group", title="chat -1"))
+
+    assert len(cache) == 2
+    assert cache.get(-2) is None
+    assert cache.title(-1) == "chat -1"
+    assert cache.title(-2) == "-2"
+
+
+def test_message_links():
+    private_supergroup = ChatInfo(SUPERGROUP.id, "supergroup", "Support")
+    public_channel = ChatInfo(-1009876543210, "channel", "News", username="news")
+
+    assert build_message_link(private_supergroup, 15) == "https://t.me/c/1234567890/15"
+    assert build_message_link(private_supergroup, 15, thread_id=3) == "https://t.me/c/1234567890/3/15"
+    assert build_message_link(public_channel, 15) == "https://t.me/news/15"
+    assert build_message_link(ChatInfo(-42, "group", "Basic group"), 15) is None
+    assert build_message_link(ChatInfo(7, "private", first_name="Ann"), 15) is None
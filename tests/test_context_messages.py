@@ -0,0 +1,76 @@
+# tests/test_context_messages.py
+
+import asyncio
+from datetime import datetime, timedelta
+
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlmodel import SQLModel
+
+from app.service.database.crud.messages import (
+    ContextMessage,
+    fetch_context_messages,
+    fetch_context_records,
+    get_message_by_id,
+)
+from app.service.database.models.message import Message as DatabaseMessage
+
+
+STARTED_AT = datetime(2026, 1, 1)
+
+
+def database_message(chat_id: int, message_id: int, reply_to_message: int | None = None) -> DatabaseMessage:
+    return DatabaseMessage(
+        created_at=STARTED_AT + timedelta(seconds=message_id),
+        id=message_id,
+        chat_id=chat_id,
+        from_user_id=7,
+        reply_to_message=reply_to_message,
+        text=f"message {message_id} of chat {chat_id}",
+        str_json_data="{}",
+    )
+
+
+async def make_session_factory(messages: list[DatabaseMessage]) -> async_sessionmaker:
+    engine = create_async_engine("sqlite+aiosqlite:///:memory:")
+    async with engine.begin() as conn:
+        await conn.run_sync(SQLModel.metadata.create_all, tables=[DatabaseMessage.__table__])
+    session_factory = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    async with session_factory() as db:
+        db.add_all(messages)
+        await db.commit()
+    return session_factory
+
+
+def test_messages_are_looked_up_within_their_chat():
+    # the same telegram message ids in two chats
+    messages = [database_message(chat_id, message_id, message_id - 1 if message_id > 1 else None)
+                for chat_id in (-100, -200) for message_id in range(1, 4)]
+
+    async def scenario():
+        session_factory = await make_session_factory(messages)
+        async with session_factory() as db:
+            found = await get_message_by_id(db, -200, 2)
+            entities = await fetch_context_messages(db, messages[2])
+            records = await fetch_context_records(db, messages[2])
+        return found, entities, records
+
+    found, entities, records = asyncio.run(scenario())
+
+    assert (found.chat_id, found.id) == (-200, 2)
+    assert [(message.chat_id, message.id) for message in entities] == [(-100, 1), (-100, 2), (-100, 3)]
+    assert [(message.chat_id, message.id) for message in records] == [(-100, 1), (-100, 2), (-100, 3)]
+
+
+def test_context_of_a_message_which_is_not_stored_ends_with_the_message():
+    stored = [database_message(-100, 1)]
+    spooled = database_message(-100, 2, reply_to_message=1)
+
+    async def scenario():
+        session_factory = await make_session_factory(stored)
+        async with session_factory() as db:
+            return await fetch_context_records(db, spooled)
+
+    records = asyncio.run(scenario())
+
+    assert [record.id for record in records] == [1, 2]
+    assert records[-1] == ContextMessage(*(getattr(spooled, name) for name in ContextMessage.__slots__))
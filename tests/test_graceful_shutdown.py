@@ -0,0 +1,81 @@
+# tests/test_graceful_shutdown.py
+
+import asyncio
+
+from aiogram import Bot
+from aiogram.types import Update
+
+import app.aiogram_services.main as aiogram_main
+from app.aiogram_services.middlewares.in_flight import InFlightUpdatesMiddleware
+from app.service.database.crud.polling_offsets import get_last_update_id
+from app.service.database.database import get_session
+
+
+BOT = Bot("123456:AAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAA")
+
+
+def test_drain_waits_for_handlers_and_reports_the_processed_offset():
+    async def scenario():
+        middleware = InFlightUpdatesMiddleware()
+        releases = {update_id: asyncio.Event() for update_id in (10, 11, 12)}
+
+        async def handler(event, data):
+            await releases[event.update_id].wait()
+
+        tasks = [asyncio.create_task(middleware(handler, Update(update_id=update_id), {"bot": BOT}))
+                 for update_id in releases]
+        await asyncio.sleep(0)
+
+        results = {"in flight": middleware.in_flight_update_ids(BOT.id), "nothing processed": middleware.safe_offset(BOT.id)}
+
+        # completed out of order: 12 is processed, 11 is not
+        releases[10].set()
+        releases[12].set()
+        await asyncio.sleep(0.01)
+        results["offset"] = middleware.safe_offset(BOT.id)
+        results["drain timed out"] = await middleware.drain(timeout=0.01)
+
+        releases[11].set()
+        results["drained"] = await middleware.drain(timeout=1)
+        results["offset after drain"] = middleware.safe_offset(BOT.id)
+        await asyncio.gather(*tasks)
+        return results
+
+    assert asyncio.run(scenario()) == {
+        "in flight": [10, 11, 12],
+        "nothing processed": 9,
+        "offset": 10,
+        "drain timed out": False,
+        "drained": True,
+        "offset after drain": 12,
+    }
+
+
+def test_graceful_shutdown_drains_then_flushes_then_persists_the_offset(database, monkeypatch):
+    events = []
+
+    async def run_flush_hooks(timeout: float) -> None:
+        events.append("flush")
+
+    async def confirm_updates(bot: Bot, last_update_id: int) -> None:
+        events.append(("confirm", last_update_id))
+
+    monkeypatch.setattr(aiogram_main, "run_flush_hooks", run_flush_hooks)
+    monkeypatch.setattr(aiogram_main, "confirm_updates", confirm_updates)
+
+    async def scenario():
+        async def slow_handler(event, data):
+            await asyncio.sleep(0.05)
+            events.append(("handled", event.update_id))
+
+        # polling is stopped while the handler of update 42 is running
+        task = asyncio.create_task(aiogram_main.in_flight_middleware(slow_handler, Update(update_id=42), {"bot": BOT}))
+        await asyncio.sleep(0)
+        await aiogram_main.graceful_shutdown([BOT])
+        await task
+
+        async with get_session() as db:
+            return await get_last_update_id(db, BOT.id)
+
+    assert asyncio.run(scenario()) == 42
+    assert events == [("handled", 42), "flush", ("confirm", 42)]
@@ -0,0 +1,68 @@
+# tests/test_keyword_prefilter.py
+
+import random
+from types import SimpleNamespace
+from uuid import uuid4
+
+from app.service.keywords.aho_corasick import AhoCorasickAutomaton
+from app.service.keywords.prefilter import ThemeKeywordPrefilter
+
+
+def naive_matches(automaton: AhoCorasickAutomaton, text: str) -> set[tuple[int, int]]:
+    found = set()
+    for pattern_id in range(len(automaton)):
+        pattern = automaton.pattern(pattern_id)
+        start = text.find(pattern)
+        while start != -1:
+            found.add((start + len(pattern), pattern_id))
+            start = text.find(pattern, start + 1)
+    return found
+
+
+def test_automaton_compiled_in_batches_finds_what_a_naive_search_finds():
+    rng = random.Random(7)
+    words = ["".join(rng.choice("abc") for _ in range(rng.randint(1, 5))) for _ in range(60)]
+    texts = ["".join(rng.choice("abc") for _ in range(200)) for _ in range(20)]
+
+    automaton = AhoCorasickAutomaton()
+    for batch_start in range(0, len(words), 20):
+        for word in words[batch_start:batch_start + 20]:
+            automaton.add(word)
+        automaton.compile()
+
+        for text in texts:
+            assert set(automaton.iter_matches(text)) == naive_matches(automaton, text)
+
+
+def test_added_patterns_are_searched_after_compile():
+    automaton = AhoCorasickAutomaton()
+    automaton.add("he")
+    automaton.compile()
+
+    assert automaton.add("she") == 1
+    assert automaton.add("She") == 1
+    assert automaton.pending == 1
+    # the previous batch keeps working, the search does not compile
+    assert list(automaton.iter_matches("ushers")) == [(4, 0)]
+    assert automaton.pending == 1
+
+    automaton.compile()
+    assert automaton.pending == 0
+    assert sorted(automaton.iter_matches("ushers")) == [(4, 0), (4, 1)]
+
+
+def test_prefilter_matches_whole_keywords_of_added_and_rebuilt_themes():
+    cats, dogs = uuid4(), uuid4()
+    prefilter = ThemeKeywordPrefilter()
+    prefilter.add_theme_keywords(cats, ["cat", "kitten"])
+    prefilter.add_theme_keywords(dogs, ["dog", "Puppy"])
+
+    assert prefilter.match("A kitten and a PUPPY") == {cats: {"kitten"}, dogs: {"puppy"}}
+    # keywords match on word boundaries only
+    assert prefilter.match("concatenate dogma") == {}
+
+    prefilter.remove_theme(dogs)
+    assert prefilter.match("dog and cat") == {cats: {"cat"}}
+
+    prefilter.rebuild([SimpleNamespace(uuid=dogs, keywords=["dog"])])
+    assert prefilter.match("dog and cat") == {dogs: {"dog"}}
@@ -0,0 +1,93 @@
+# tests/test_media_archiver.py
+
+import asyncio
+import hashlib
+from datetime import datetime
+from pathlib import Path
+
+import pytest
+from aiogram import Bot
+from aiogram.client.session.aiohttp import AiohttpSession
+from aiogram.client.telegram import TelegramAPIServer
+from aiogram.types import Chat, File, Message, Sticker, User
+from sqlalchemy import select
+
+import app.aiogram_services.routers.messages as messages_router_module
+from app.aiogram_services.routers.messages import save_message
+from app.service.database.database import get_session
+from app.service.database.models.message import Message as DatabaseMessage
+from app.service.database.models.message_media import MessageMedia
+from app.service.media.archiver import MediaArchiver, content_path
+
+
+CHAT = Chat(id=-100, type="supergroup", title="test")
+USER = User(id=7, is_bot=False, first_name="test")
+STICKER_BYTES = b"RIFF sticker bytes" * 1000
+
+
+class LocalFilesBot(Bot):
+    """Bot of a local Bot API server: files are read from the disk, getFile is answered from ``files``."""
+
+    def __init__(self, files: dict[str, Path]):
+        api = TelegramAPIServer.from_base("http://localhost:8081", is_local=True)
+        super().__init__("123456:AAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAA", session=AiohttpSession(api=api))
+        self.files = files
+        self.get_file_calls = 0
+
+    async def get_file(self, file_id: str, **kwargs) -> File:
+        self.get_file_calls += 1
+        return File(file_id=file_id, file_unique_id=f"{file_id}-unique", file_path=str(self.files[file_id]))
+
+
+def sticker_message(message_id: int, file_id: str, bot: Bot) -> Message:
+    sticker = Sticker(file_id=file_id, file_unique_id=f"{file_id}-unique", type="regular", width=512, height=512,
+                      is_animated=False, is_video=False, file_size=len(STICKER_BYTES))
+    return Message(message_id=message_id, date=datetime(2026, 1, 1), chat=CHAT, from_user=USER,
+                   sticker=sticker).as_(bot)
+
+
+@pytest.fixture
+def archiver(tmp_path, monkeypatch) -> MediaArchiver:
+    archiver = MediaArchiver(enabled=True, directory=str(tmp_path / "media"), concurrency=2)
+    monkeypatch.setattr(messages_router_module, "media_archiver", archiver)
+    return archiver
+
+
+def test_sticker_is_archived_once_per_file_and_per_content(database, archiver, tmp_path):
+    source = tmp_path / "bot-api" / "sticker.webp"
+    source.parent.mkdir()
+    source.write_bytes(STICKER_BYTES)
+    # the same bytes uploaded as another sticker: another file_unique_id, the same content
+    bot = LocalFilesBot({"sticker": source, "reupload": source})
+
+    async def scenario():
+        archiver.start()
+        try:
+            await save_message(sticker_message(1, "sticker", bot))
+            await archiver._queue.join()
+            # the same sticker sent again: not downloaded again
+            await save_message(sticker_message(2, "sticker", bot))
+            await archiver._queue.join()
+            await save_message(sticker_message(3, "reupload", bot))
+        finally:
+            await archiver.stop()
+            await bot.session.close()
+
+        async with get_session() as db:
+            messages = (await db.execute(select(DatabaseMessage.id).order_by(DatabaseMessage.id))).scalars().all()
+            media = (await db.execute(select(MessageMedia).order_by(MessageMedia.message_id))).scalars().all()
+        return list(messages), list(media)
+
+    messages, media = asyncio.run(scenario())
+
+    sha256 = hashlib.sha256(STICKER_BYTES).hexdigest()
+    assert messages == [1, 2, 3]
+    assert [(row.message_id, row.kind, row.sha256, row.size) for row in media] == [
+        (message_id, "sticker", sha256, len(STICKER_BYTES)) for message_id in (1, 2, 3)
+    ]
+    assert bot.get_file_calls == 2
+    assert (archiver.downloaded_files, archiver.known_file_hits, archiver.same_content_hits) == (2, 1, 1)
+
+    stored_files = [path for path in (tmp_path / "media").rglob("*") if path.is_file()]
+    assert stored_files == [content_path(tmp_path / "media", sha256)]
+    assert stored_files[0].read_bytes() == STICKER_BYTES
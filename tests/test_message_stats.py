@@ -0,0 +1,51 @@
+# tests/test_message_stats.py
+
+import asyncio
+from datetime import datetime
+from uuid import uuid4
+
+from app.service.database.crud.message_stats import get_message_counts, rebuild_message_stats
+from app.service.database.crud.messages import store_message_row
+from app.service.database.database import get_session
+from app.service.stats.rollups import RollupAggregator
+
+
+def message_row(message_id: int, from_user_id: int, hour: int) -> dict:
+    return {
+        "uuid": uuid4(),
+        "created_at": datetime(2026, 1, 1, hour, message_id),
+        "id": message_id,
+        "chat_id": -100,
+        "from_user_id": from_user_id,
+        "reply_to_message": None,
+        "text": f"message {message_id}",
+        "message_link": None,
+        "str_json_data": "{}",
+    }
+
+
+def test_rollups_are_aggregated_incrementally_and_rebuilt_the_same(database):
+    rows = [message_row(1, 7, 10), message_row(2, 7, 10), message_row(3, 8, 10), message_row(4, 7, 11)]
+
+    async def scenario():
+        aggregator = RollupAggregator(get_session)
+        async with get_session() as db:
+            for row in rows:
+                aggregator.record(await store_message_row(db, row))
+        await aggregator.flush()
+
+        async with get_session() as db:
+            counts = await get_message_counts(db, group_by=("bucket_start", "from_user_id"))
+            await rebuild_message_stats(db)
+            rebuilt_counts = await get_message_counts(db, group_by=("bucket_start", "from_user_id"))
+        return counts, rebuilt_counts
+
+    counts, rebuilt_counts = asyncio.run(scenario())
+
+    expected = [
+        {"bucket_start": datetime(2026, 1, 1, 10), "from_user_id": 7, "message_count": 2},
+        {"bucket_start": datetime(2026, 1, 1, 10), "from_user_id": 8, "message_count": 1},
+        {"bucket_start": datetime(2026, 1, 1, 11), "from_user_id": 7, "message_count": 1},
+    ]
+    assert sorted(counts, key=lambda row: (row["bucket_start"], row["from_user_id"])) == expected
+    assert sorted(rebuilt_counts, key=lambda row: (row["bucket_start"], row["from_user_id"])) == expected
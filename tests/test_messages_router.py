@@ -0,0 +1,52 @@
+# tests/test_messages_router.py
+
+import asyncio
+from datetime import datetime
+
+from aiogram.types import Chat, Message, PhotoSize, Sticker, User
+from sqlalchemy import select
+
+from app.aiogram_services.routers.messages import save_message
+from app.service.database.database import get_session
+from app.service.database.models.message import Message as DatabaseMessage
+
+
+CHAT = Chat(id=-100, type="supergroup", title="test")
+USER = User(id=7, is_bot=False, first_name="test")
+
+
+def message(message_id: int, **fields) -> Message:
+    return Message(message_id=message_id, date=datetime(2026, 1, 1), chat=CHAT, **fields)
+
+
+async def stored(message_id: int) -> DatabaseMessage | None:
+    async with get_session() as db:
+        result = await db.execute(select(DatabaseMessage).where(
+            DatabaseMessage.chat_id == CHAT.id,
+            DatabaseMessage.id == message_id,
+        ))
+        return result.scalar_one_or_none()
+
+
+def test_media_and_anonymous_messages_are_stored(database):
+    photo = message(1, from_user=USER, caption="look at this", photo=[
+        PhotoSize(file_id="photo", file_unique_id="photo-unique", width=90, height=90, file_size=100),
+    ])
+    sticker = message(2, from_user=USER, sticker=Sticker(
+        file_id="sticker", file_unique_id="sticker-unique", type="regular", width=512, height=512,
+        is_animated=False, is_video=False,
+    ))
+    # anonymous admin: sent on behalf of the chat, no from_user
+    anonymous = message(3, sender_chat=CHAT, text="announcement")
+
+    async def scenario():
+        for update_message in (photo, sticker, anonymous):
+            await save_message(update_message)
+
+        return [await stored(message_id) for message_id in (1, 2, 3)]
+
+    photo_row, sticker_row, anonymous_row = asyncio.run(scenario())
+
+    assert (photo_row.text, photo_row.from_user_id) == ("look at this", USER.id)
+    assert (sticker_row.text, sticker_row.from_user_id) == ("", USER.id)
+    assert (anonymous_row.text, anonymous_row.from_user_id) == ("announcement", CHAT.id)
@@ -0,0 +1,152 @@
+# tests/test_notification_digest.py
+
+import asyncio
+from collections import OrderedDict
+from datetime import datetime
+from types import SimpleNamespace
+from uuid import uuid4
+
+import pytest
+from aiogram.types import Chat
+
+from app.service.chats.metadata import chat_metadata_cache
+from app.service.database.crud.messages import store_message_row
+from app.service.database.database import get_session
+from app.service.lifecycle import shutdown
+from app.service.notifications.digest import DigestEngine, notification_digest
+
+
+CHAT = Chat(id=-1001234567890, type="supergroup", title="Support")
+RULE = uuid4()
+RECIPIENT = 42
+
+
+@pytest.fixture(autouse=True)
+def known_chat(monkeypatch):
+    # the chat is cached: digests render its title and links without getChat
+    monkeypatch.setattr(chat_metadata_cache, "_entries", OrderedDict())
+    chat_metadata_cache.update_from_chat(CHAT)
+
+
+class RecordingSender:
+    def __init__(self, failures: int = 0):
+        self.failures = failures
+        self.sent: list[tuple[int, str]] = []
+
+    async def __call__(self, recipient_id: int, text: str) -> None:
+        if self.failures:
+            self.failures -= 1
+            raise OSError("network is unreachable")
+        self.sent.append((recipient_id, text))
+
+
+def message(message_id: int, reply_to_message: int | None = None) -> SimpleNamespace:
+    return SimpleNamespace(chat_id=CHAT.id, id=message_id, reply_to_message=reply_to_message,
+                           text=f"message {message_id}", message_link=None)
+
+
+def test_replies_are_grouped_by_the_root_of_their_thread(database):
+    replies = {1: None, 2: 1, 3: 2, 4: None, 5: 99}
+
+    async def scenario():
+        stored = {}
+        async with get_session() as db:
+            for message_id, reply_to_message in replies.items():
+                stored[message_id] = await store_message_row(db, {
+                    "uuid": uuid4(),
+                    "created_at": datetime(2026, 1, 1, 0, 0, message_id),
+                    "id": message_id,
+                    "chat_id": CHAT.id,
+                    "from_user_id": 7,
+                    "reply_to_message": reply_to_message,
+                    "text": f"message {message_id}",
+                    "message_link": None,
+                    "str_json_data": "{}",
+                })
+
+        sender = RecordingSender()
+        engine = DigestEngine(sender=sender, window_seconds=3600, max_items=100)
+        for message_id in (3, 2, 4, 5, 2):
+            await engine.add(RULE, RECIPIENT, stored[message_id])
+        await engine.flush_all()
+        return engine, sender
+
+    engine, sender = asyncio.run(scenario())
+
+    assert engine.matches_received == 5
+    assert sender.sent == [(RECIPIENT, "\n".join([
+        "4 new matching messages in 3 threads:",
+        "- Support: 2 msg, last: message 2 https://t.me/c/1234567890/2",
+        "- Support: 1 msg, last: message 4 https://t.me/c/1234567890/4",
+        "- Support: 1 msg, last: message 5 https://t.me/c/1234567890/5",
+    ]))]
+
+
+def test_digest_is_sent_when_enough_matches_are_buffered():
+    async def scenario():
+        sender = RecordingSender()
+        engine = DigestEngine(sender=sender, window_seconds=3600, max_items=2)
+        for message_id in (1, 2, 3):
+            await engine.add(RULE, RECIPIENT, message(message_id))
+        return engine, sender
+
+    engine, sender = asyncio.run(scenario())
+
+    assert [text.splitlines()[0] for _, text in sender.sent] == ["2 new matching messages in 2 threads:"]
+    assert engine.digests_sent == 1
+
+
+def test_failed_digest_is_retried_with_matches_buffered_meanwhile():
+    async def scenario():
+        sender = RecordingSender(failures=1)
+        engine = DigestEngine(sender=sender, window_seconds=0, max_items=100, max_attempts=3)
+        await engine.add(RULE, RECIPIENT, message(1))
+        await engine.flush_due()
+        failed = list(sender.sent)
+
+        await engine.add(RULE, RECIPIENT, message(2))
+        # already buffered in the failed digest
+        await engine.add(RULE, RECIPIENT, message(1))
+        await engine.flush_due()
+        return engine, failed, sender
+
+    engine, failed, sender = asyncio.run(scenario())
+
+    assert failed == []
+    assert [text.splitlines()[0] for _, text in sender.sent] == ["2 new matching messages in 2 threads:"]
+    assert (engine.digests_sent, engine.digests_dropped) == (1, 0)
+
+
+def test_digest_is_dropped_after_max_attempts():
+    async def scenario():
+        sender = RecordingSender(failures=2)
+        engine = DigestEngine(sender=sender, window_seconds=0, max_items=100, max_attempts=2)
+        await engine.add(RULE, RECIPIENT, message(1))
+        for _ in range(3):
+            await engine.flush_due()
+        return engine, sender
+
+    engine, sender = asyncio.run(scenario())
+
+    assert sender.sent == []
+    assert (engine.digests_sent, engine.digests_dropped) == (0, 1)
+
+
+def test_buffered_digests_are_flushed_on_shutdown():
+    async def scenario():
+        sender = RecordingSender()
+        engine = DigestEngine(sender=sender, window_seconds=3600, max_items=100)
+        engine.start()
+        await engine.add(RULE, RECIPIENT, message(1))
+        await engine.add(uuid4(), RECIPIENT + 1, message(2))
+        task = engine._task
+
+        await engine.stop()
+        await asyncio.sleep(0)
+        return sender, task
+
+    sender, task = asyncio.run(scenario())
+
+    assert sorted(recipient_id for recipient_id, _ in sender.sent) == [RECIPIENT, RECIPIENT + 1]
+    assert task.cancelled()
+    assert ("notification digests", notification_digest.stop) in shutdown._flush_hooks
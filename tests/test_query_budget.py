@@ -0,0 +1,62 @@
+# tests/test_query_budget.py
+
+import asyncio
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlmodel import SQLModel
+
+from app.service.database.crud.messages import fetch_context_messages, fetch_context_records
+from app.service.database.models.message import Message as DatabaseMessage
+from app.service.database.query_stats import install_query_stats, max_queries
+
+
+CHAT_ID = -100
+
+
+async def make_session_factory() -> async_sessionmaker:
+    engine = create_async_engine("sqlite+aiosqlite:///:memory:")
+    # query stats are off by default in settings: the budget counts statements of this engine only
+    install_query_stats(engine)
+    async with engine.begin() as conn:
+        await conn.run_sync(SQLModel.metadata.create_all, tables=[DatabaseMessage.__table__])
+    return async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+
+
+def reply_chain(length: int) -> list[DatabaseMessage]:
+    started_at = datetime(2026, 1, 1)
+    return [
+        DatabaseMessage(
+            created_at=started_at + timedelta(seconds=message_id),
+            id=message_id,
+            chat_id=CHAT_ID,
+            from_user_id=message_id % 3,
+            reply_to_message=message_id - 1 if message_id > 1 else None,
+            text=f"message {message_id}",
+            str_json_data="{}",
+        )
+        for message_id in range(1, length + 1)
+    ]
+
+
+@pytest.mark.parametrize("loader", [fetch_context_messages, fetch_context_records])
+@pytest.mark.parametrize("length", [3, 50])
+def test_reply_chain_context_does_not_query_per_hop(loader, length):
+    async def scenario():
+        session_factory = await make_session_factory()
+        messages = reply_chain(length)
+        async with session_factory() as db:
+            db.add_all(messages)
+            await db.commit()
+
+        async with session_factory() as db:
+            # the message itself and one recursive query for the whole chain, whatever its length
+            with max_queries(2, loader.__name__) as stats:
+                context = await loader(db, messages[-1])
+
+        assert stats.repeated(threshold=2) == []
+        assert context[-1].id == length
+        assert context[0].id == 1
+
+    asyncio.run(scenario())
@@ -0,0 +1,96 @@
+# tests/test_redis_fsm_storage.py
+
+import asyncio
+import json
+
+import pytest
+from aiogram.fsm.storage.base import StorageKey
+
+fakeredis = pytest.importorskip("fakeredis")
+
+from app.aiogram_services.storage import RedisFsmStorage
+
+
+KEY = StorageKey(bot_id=1, chat_id=-100, user_id=7)
+
+
+def make_storage(redis=None) -> RedisFsmStorage:
+    return RedisFsmStorage(redis or fakeredis.FakeAsyncRedis(), write_interval_seconds=0.01, cache_ttl_seconds=60)
+
+
+def test_changes_are_written_in_batches_and_read_back():
+    async def scenario():
+        redis = fakeredis.FakeAsyncRedis()
+        storage = make_storage(redis)
+
+        await storage.set_state(KEY, "form:name")
+        await storage.set_data(KEY, {"name": "Alice"})
+        await storage.update_data(KEY, {"age": 30})
+        assert await redis.get(storage.key_builder.build(KEY, "state")) is None
+
+        await storage.flush()
+        assert storage.batches == 1
+        assert await redis.get(storage.key_builder.build(KEY, "state")) == b"form:name"
+        assert json.loads(await redis.get(storage.key_builder.build(KEY, "data"))) == {"name": "Alice", "age": 30}
+
+        # another process: nothing is cached
+        other = make_storage(redis)
+        assert await other.get_state(KEY) == "form:name"
+        assert await other.get_data(KEY) == {"name": "Alice", "age": 30}
+
+        await storage.set_state(KEY, None)
+        await storage.set_data(KEY, {})
+        await storage.shutdown()
+        assert await redis.exists(storage.key_builder.build(KEY, "state"), storage.key_builder.build(KEY, "data")) == 0
+
+    asyncio.run(scenario())
+
+
+def test_not_serializable_data_fails_the_caller_not_the_batch():
+    async def scenario():
+        redis = fakeredis.FakeAsyncRedis()
+        storage = make_storage(redis)
+        other_key = StorageKey(bot_id=1, chat_id=-100, user_id=8)
+
+        await storage.set_data(other_key, {"step": 1})
+        with pytest.raises(TypeError):
+            await storage.set_data(KEY, {"when": object()})
+
+        await storage.flush()
+        assert storage.stats()["dirty"] == 0
+        assert await storage.get_data(KEY) == {}
+        assert json.loads(await redis.get(storage.key_builder.build(other_key, "data"))) == {"step": 1}
+
+        await storage.shutdown()
+
+    asyncio.run(scenario())
+
+
+def test_dispatcher_close_keeps_backend_open_until_shutdown():
+    async def scenario():
+        redis = fakeredis.FakeAsyncRedis()
+        storage = make_storage(redis)
+        closed = 0
+
+        async def aclose():
+            nonlocal closed
+            closed += 1
+
+        redis.aclose = aclose
+
+        await storage.set_state(KEY, "form:name")
+        # the Dispatcher's shutdown (before in-flight handlers are drained)
+        await storage.close()
+        assert closed == 0
+        assert await redis.get(storage.key_builder.build(KEY, "state")) == b"form:name"
+
+        # a handler which is drained still changes the state
+        await storage.set_state(KEY, "form:age")
+
+        # the flush hook after the drain, then a repeated call
+        await storage.shutdown()
+        await storage.shutdown()
+        assert closed == 1
+        assert await redis.get(storage.key_builder.build(KEY, "state")) == b"form:age"
+
+    asyncio.run(scenario())
@@ -0,0 +1,83 @@
+# tests/test_routing.py
+
+import asyncio
+from datetime import datetime
+from uuid import uuid4
+
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlmodel import SQLModel
+
+from app.service.database.crud.messages import list_messages, search_messages, store_message_row
+from app.service.database.models.message import Message as DatabaseMessage
+from app.service.database.routing import ReplicaPool, make_routing_session_class, routing_scope
+from app.service.database.search import install_full_text_search
+
+
+def message_row(message_id: int, text: str) -> dict:
+    return {
+        "uuid": uuid4(),
+        "created_at": datetime(2026, 1, 1, 0, 0, message_id),
+        "id": message_id,
+        "chat_id": -100,
+        "from_user_id": 7,
+        "reply_to_message": None,
+        "text": text,
+        "message_link": None,
+        "str_json_data": "{}",
+    }
+
+
+def test_reads_go_to_the_replica_until_a_write_of_the_update(tmp_path):
+    async def scenario():
+        primary = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'primary.db'}")
+        replica = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'replica.db'}")
+
+        # the replica is a separate database: its rows tell which database a statement was sent to
+        for engine, text in ((primary, "primary copy"), (replica, "replica copy")):
+            async with engine.begin() as conn:
+                await conn.run_sync(SQLModel.metadata.create_all, tables=[DatabaseMessage.__table__])
+                await install_full_text_search(conn)
+            async with AsyncSession(engine) as db:
+                await store_message_row(db, message_row(1, text))
+
+        replica_pool = ReplicaPool([replica], max_lag_seconds=1, check_interval_seconds=1)
+        await replica_pool.check_replicas()
+        session_factory = async_sessionmaker(
+            primary,
+            class_=AsyncSession,
+            expire_on_commit=False,
+            sync_session_class=make_routing_session_class(primary, replica_pool),
+        )
+
+        results = {}
+        async with session_factory() as db:
+            results["list"] = [found.text for found in await list_messages(db)]
+            results["search"] = [found.text for found, _ in await search_messages(db, "copy")]
+
+        with routing_scope():
+            async with session_factory() as db:
+                results["scope before write"] = [found.text for found in await list_messages(db)]
+            # another session of the update writes (as persist_message does)
+            async with session_factory() as db:
+                await store_message_row(db, message_row(2, "primary only"))
+                results["writing session"] = [found.text for found in await list_messages(db)]
+            async with session_factory() as db:
+                results["scope after write"] = [found.text for found in await list_messages(db)]
+
+        async with session_factory() as db:
+            results["next update"] = [found.text for found in await list_messages(db)]
+
+        await primary.dispose()
+        await replica.dispose()
+        return results
+
+    results = asyncio.run(scenario())
+
+    assert results == {
+        "list": ["replica copy"],
+        "search": ["replica copy"],
+        "scope before write": ["replica copy"],
+        "writing session": ["primary only", "primary copy"],
+        "scope after write": ["primary only", "primary copy"],
+        "next update": ["replica copy"],
+    }
@@ -0,0 +1,120 @@
+# tests/test_search.py
+
+import asyncio
+from datetime import datetime
+from uuid import uuid4
+
+from sqlalchemy import delete, text, update
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlmodel import SQLModel
+
+from app.service.database.crud.messages import search_messages, store_message_row
+from app.service.database.database import get_session
+from app.service.database.models.message import Message as DatabaseMessage
+from app.service.database.search import (
+    SQLITE_FTS_ROWID_COLUMN,
+    SQLITE_FTS_SEQUENCE_TABLE,
+    SQLITE_FTS_TABLE,
+    install_full_text_search,
+)
+
+
+def message_row(message_id: int, text: str) -> dict:
+    return {
+        "uuid": uuid4(),
+        "created_at": datetime(2026, 1, 1, 0, 0, message_id),
+        "id": message_id,
+        "chat_id": -100,
+        "from_user_id": 7,
+        "reply_to_message": None,
+        "text": text,
+        "message_link": None,
+        "str_json_data": "{}",
+    }
+
+
+async def found_ids(query: str) -> list[int]:
+    async with get_session() as db:
+        return sorted(found.id for found, _ in await search_messages(db, query))
+
+
+def test_search_follows_inserts_updates_and_deletes(database):
+    async def scenario():
+        results = {}
+        async with get_session() as db:
+            for message_id, message_text in ((1, "red apple"), (2, "green apple"), (3, "yellow banana")):
+                await store_message_row(db, message_row(message_id, message_text))
+        results["insert"] = await found_ids("apple")
+
+        async with get_session() as db:
+            await db.execute(update(DatabaseMessage).where(DatabaseMessage.id == 2).values(text="green pear"))
+            await db.commit()
+        results["update old word"] = await found_ids("apple")
+        results["update new word"] = await found_ids("pear")
+
+        async with get_session() as db:
+            await db.execute(delete(DatabaseMessage).where(DatabaseMessage.id == 1))
+            await db.commit()
+        results["delete"] = await found_ids("apple")
+
+        # VACUUM may renumber implicit rowids: the index is keyed by fts_rowid
+        async with database.connect() as conn:
+            await conn.execute(text("VACUUM"))
+        async with get_session() as db:
+            await store_message_row(db, message_row(4, "another banana"))
+        results["after vacuum"] = await found_ids("banana")
+
+        async with database.connect() as conn:
+            # raises if the index does not match the content table
+            await conn.execute(
+                text(f"INSERT INTO {SQLITE_FTS_TABLE}({SQLITE_FTS_TABLE}, rank) VALUES ('integrity-check', 1)")
+            )
+        return results
+
+    assert asyncio.run(scenario()) == {
+        "insert": [1, 2],
+        "update old word": [1],
+        "update new word": [2],
+        "delete": [],
+        "after vacuum": [3, 4],
+    }
+
+
+def test_keys_of_the_max_plus_one_trigger_are_continued_by_the_counter(tmp_path):
+    async def scenario():
+        engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'old.db'}")
+        async with engine.begin() as conn:
+            await conn.run_sync(SQLModel.metadata.create_all, tables=[DatabaseMessage.__table__])
+            await install_full_text_search(conn)
+            # layout of the previous version: no counter, the insert trigger assigns max + 1
+            await conn.execute(text(f"DROP TABLE {SQLITE_FTS_SEQUENCE_TABLE}"))
+            await conn.execute(text(f"DROP TRIGGER {SQLITE_FTS_TABLE}_ai"))
+            await conn.execute(text(
+                f"CREATE TRIGGER {SQLITE_FTS_TABLE}_ai AFTER INSERT ON message BEGIN "
+                f"UPDATE message SET {SQLITE_FTS_ROWID_COLUMN} = "
+                f"(SELECT coalesce(max({SQLITE_FTS_ROWID_COLUMN}), 0) + 1 FROM message) WHERE rowid = new.rowid; "
+                f"INSERT INTO {SQLITE_FTS_TABLE}(rowid, text) "
+                f"SELECT {SQLITE_FTS_ROWID_COLUMN}, text FROM message WHERE rowid = new.rowid; END"
+            ))
+        async with engine.begin() as conn:
+            for message_id in (1, 2, 3):
+                await conn.execute(DatabaseMessage.__table__.insert().values(**message_row(message_id, "old")))
+
+        async with engine.begin() as conn:
+            await install_full_text_search(conn)
+            await install_full_text_search(conn)
+            await conn.execute(DatabaseMessage.__table__.insert().values(**message_row(4, "new")))
+            result = await conn.execute(text(f"SELECT id, {SQLITE_FTS_ROWID_COLUMN} FROM message ORDER BY id"))
+            keys = result.all()
+            result = await conn.execute(
+                text(f"SELECT rowid FROM {SQLITE_FTS_TABLE} WHERE {SQLITE_FTS_TABLE} MATCH 'new'")
+            )
+            new_keys = result.scalars().all()
+
+        await engine.dispose()
+        return keys, new_keys
+
+    keys, new_keys = asyncio.run(scenario())
+
+    assert keys == [(1, 1), (2, 2), (3, 3), (4, 4)]
+    assert new_keys == [4]
@@ -0,0 +1,95 @@
+# tests/test_spool.py
+
+import asyncio
+import json
+from datetime import datetime
+
+from aiogram.types import Chat, Message, User
+from sqlalchemy import select
+
+from app.service.database.circuit_breaker import CircuitBreaker
+from app.service.database.database import get_session
+from app.service.database.models.message import Message as DatabaseMessage
+from app.service.spool.journal import SpoolJournal
+from app.service.spool.persist import persist_message
+from app.service.spool.replayer import QUARANTINE_DIR, SpoolReplayer
+
+
+CHAT = Chat(id=-100, type="supergroup", title="test")
+USER = User(id=7, is_bot=False, first_name="test")
+
+
+def message(message_id: int) -> Message:
+    return Message(message_id=message_id, date=datetime(2026, 1, 1), chat=CHAT, from_user=USER,
+                   text=f"message {message_id}")
+
+
+def open_breaker() -> CircuitBreaker:
+    breaker = CircuitBreaker("test", failure_threshold=1, reset_timeout_seconds=0.05)
+    breaker.record_failure()
+    assert breaker.is_open
+    return breaker
+
+
+async def stored_rows() -> list[DatabaseMessage]:
+    async with get_session() as db:
+        result = await db.execute(select(DatabaseMessage).order_by(DatabaseMessage.created_at))
+        return list(result.scalars().all())
+
+
+def test_messages_are_spooled_while_the_circuit_is_open_and_replayed_in_order(database, tmp_path):
+    async def scenario():
+        breaker = open_breaker()
+        journal = SpoolJournal(str(tmp_path), fsync_interval_seconds=0.001, segment_max_bytes=300)
+        replayer = SpoolReplayer(journal, breaker, get_session, batch_size=2)
+
+        for message_id in range(1, 8):
+            assert await persist_message(message(message_id), breaker, journal) is None
+        assert await stored_rows() == []
+        # several segments: small segment size
+        assert len(await journal.sealed_segments()) > 1
+
+        # nothing is tried while the circuit is open
+        assert await replayer.replay() == 0
+
+        await asyncio.sleep(0.06)
+        assert await replayer.replay() == 7
+        assert breaker.state == "closed"
+        assert await journal.sealed_segments() == []
+
+        return await stored_rows()
+
+    rows = asyncio.run(scenario())
+    assert [row.id for row in rows] == list(range(1, 8))
+
+
+def test_poison_records_are_quarantined_and_do_not_block_replay(database, tmp_path):
+    async def scenario():
+        breaker = CircuitBreaker("test")
+        journal = SpoolJournal(str(tmp_path), fsync_interval_seconds=0.001)
+        replayer = SpoolReplayer(journal, breaker, get_session, batch_size=10)
+
+        spooled = open_breaker()
+        await persist_message(message(1), spooled, journal)
+        await journal.seal()
+        await persist_message(message(2), spooled, journal)
+        await journal.seal()
+        # the segment holds a record which violates NOT NULL of the text column
+        poisoned = (await journal.sealed_segments())[-1]
+        record = json.loads(poisoned.read_text())
+        poisoned.write_text(json.dumps({**record, "text": None}) + "\n")
+
+        await persist_message(message(3), spooled, journal)
+        await journal.seal()
+
+        inserted = await replayer.replay()
+        return inserted, await journal.sealed_segments(), poisoned.name, replayer.quarantined, await stored_rows()
+
+    inserted, segments, poisoned_name, quarantined, rows = asyncio.run(scenario())
+
+    assert inserted == 2
+    assert segments == []
+    assert quarantined == 1
+    quarantine_records = (tmp_path / QUARANTINE_DIR / poisoned_name).read_text().splitlines()
+    assert [json.loads(line)["id"] for line in quarantine_records] == [2]
+    assert [row.id for row in rows] == [1, 3]
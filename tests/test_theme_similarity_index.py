@@ -0,0 +1,62 @@
+# tests/test_theme_similarity_index.py
+
+from types import SimpleNamespace
+from uuid import uuid4
+
+from app.service.themes.similarity_index import INITIAL_CAPACITY, ThemeSimilarityIndex, embed_theme
+
+
+def theme(name: str, description: str, keywords: list[str], enable: bool = True) -> SimpleNamespace:
+    return SimpleNamespace(uuid=uuid4(), name=name, description=description, keywords=keywords, enable=enable)
+
+
+PAYMENTS = theme("Payments", "Problems with card payments", ["payment", "card", "refund"])
+DELIVERY = theme("Delivery", "Late or lost parcels", ["courier", "parcel", "tracking"])
+
+
+def test_embedding_is_deterministic_and_normalized():
+    vector = embed_theme("Payments", "Problems with card payments", ["refund"], dim=128)
+
+    assert vector.shape == (128,)
+    assert abs(float(vector @ vector) - 1.0) < 1e-5
+    assert (vector == embed_theme("Payments", "Problems with card payments", ["refund"], dim=128)).all()
+
+
+def test_near_duplicate_is_found_and_unrelated_theme_is_not():
+    index = ThemeSimilarityIndex(dim=512, threshold=0.6)
+    index.rebuild([PAYMENTS, DELIVERY])
+
+    assert index.find_duplicate("payment", "problems with payments by card", ["refund", "card"]) == PAYMENTS.uuid
+    assert index.find_duplicate("Weather", "Rain and snow forecast", ["rain"]) is None
+    assert index.most_similar("parcels", "lost parcel", ["courier"])[0] == DELIVERY.uuid
+
+
+def test_disabled_themes_are_not_returned():
+    disabled = theme("Refunds", "Card payment refunds", ["refund", "payment"], enable=False)
+    index = ThemeSimilarityIndex(dim=512, threshold=0.3)
+    index.rebuild([disabled, DELIVERY])
+
+    assert len(index) == 1
+    assert index.find_duplicate("Refunds", "Card payment refunds", ["refund", "payment"]) is None
+
+    # a theme disabled after it was indexed is removed by the next update
+    index.upsert_theme(PAYMENTS)
+    index.upsert_theme(SimpleNamespace(**{**vars(PAYMENTS), "enable": False}))
+    assert index.find_duplicate("Payments", "Problems with card payments", ["payment"]) is None
+
+
+def test_rows_grow_and_removal_keeps_other_themes():
+    index = ThemeSimilarityIndex(dim=256, threshold=0.99)
+    themes = [theme(f"Theme {number}", f"description {number}", [f"keyword{number}"])
+              for number in range(INITIAL_CAPACITY + 10)]
+    for indexed_theme in themes:
+        index.upsert_theme(indexed_theme)
+
+    index.remove(themes[0].uuid)
+    index.remove(uuid4())
+
+    assert len(index) == len(themes) - 1
+    assert index.find_duplicate(themes[0].name, themes[0].description, themes[0].keywords) is None
+    for indexed_theme in themes[1:]:
+        assert index.find_duplicate(indexed_theme.name, indexed_theme.description,
+                                    indexed_theme.keywords) == indexed_theme.uuid
@@ -0,0 +1,161 @@
+# tests/test_throttling.py
+
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+from aiogram.types import Chat, Update, User
+
+import app.aiogram_services.middlewares.throttling as throttling_module
+from app.aiogram_services.middlewares.throttling import (
+    POLICY_DELAY,
+    POLICY_DROP,
+    POLICY_RECORD,
+    ThrottlingMiddleware,
+)
+from app.service.throttling.token_bucket import TokenBuckets
+
+
+USER = User(id=7, is_bot=False, first_name="test")
+OTHER_USER = User(id=8, is_bot=False, first_name="other")
+CHAT = Chat(id=-100, type="supergroup", title="test")
+OTHER_CHAT = Chat(id=-200, type="supergroup", title="other")
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = SimpleNamespace(now=1000.0)
+    monkeypatch.setattr(throttling_module, "time", SimpleNamespace(monotonic=lambda: clock.now))
+    return clock
+
+
+def middleware(policy: str, **limits) -> ThrottlingMiddleware:
+    options = dict(user_rate=1.0, user_burst=2.0, chat_rate=1.0, chat_burst=3.0, max_delay_seconds=0.0,
+                   ttl_seconds=600.0, max_buckets=100, exempt_user_ids=[])
+    options.update(limits)
+    return ThrottlingMiddleware(policy, **options)
+
+
+def test_burst_is_spent_and_refilled_at_rate():
+    buckets = TokenBuckets(rate=2.0, burst=3.0, ttl_seconds=600.0, max_size=10)
+
+    assert [buckets.acquire("user", now=0.0) for _ in range(3)] == [0.0, 0.0, 0.0]
+    assert buckets.peek("user", now=0.0) == 0.5
+    # over the limit nothing is taken
+    assert buckets.acquire("user", now=0.0) == 0.5
+    assert buckets.peek("user", now=0.0) == 0.5
+
+    assert buckets.acquire("user", now=0.5) == 0.0
+    assert buckets.peek("user", now=0.5) == 0.5
+    # refill never exceeds the burst
+    assert [buckets.acquire("user", now=100.0) for _ in range(4)] == [0.0, 0.0, 0.0, 0.5]
+
+
+def test_token_within_max_wait_is_reserved():
+    buckets = TokenBuckets(rate=1.0, burst=1.0, ttl_seconds=600.0, max_size=10)
+
+    assert buckets.acquire("user", max_wait=2.0, now=0.0) == 0.0
+    assert buckets.acquire("user", max_wait=2.0, now=0.0) == 1.0
+    # the reserved token is owed: the next caller waits longer
+    assert buckets.acquire("user", max_wait=2.0, now=0.0) == 2.0
+    assert buckets.acquire("user", max_wait=2.0, now=0.0) == 3.0
+    assert buckets.peek("user", now=0.0) == 3.0
+
+
+def test_idle_buckets_expire_and_least_recently_used_are_evicted():
+    buckets = TokenBuckets(rate=1.0, burst=2.0, ttl_seconds=10.0, max_size=2)
+
+    buckets.acquire("a", now=0.0)
+    buckets.acquire("b", now=5.0)
+    buckets.acquire("a", now=6.0)
+    buckets.acquire("c", now=7.0)
+    # size: "b" is the least recently used
+    assert list(buckets._buckets) == ["a", "c"]
+
+    buckets.acquire("d", now=16.5)
+    # ttl: "a" was idle for 10.5 seconds, "c" for 9.5
+    assert list(buckets._buckets) == ["c", "d"]
+    assert len(buckets) == 2
+
+    # an evicted bucket starts full again
+    assert buckets.peek("a", now=16.5) == 0.0
+
+
+def test_ttl_is_at_least_the_time_to_refill_the_burst():
+    assert TokenBuckets(rate=1.0, burst=30.0, ttl_seconds=10.0, max_size=10).ttl_seconds == 30.0
+
+
+def test_rejected_update_takes_no_tokens_from_either_bucket(clock):
+    throttling = middleware(POLICY_DROP)
+
+    assert [throttling.check(USER, CHAT) for _ in range(2)] == [0.0, 0.0]
+    # the user bucket is empty, the chat bucket keeps its last token
+    assert throttling.check(USER, CHAT) == 1.0
+    assert throttling.check(OTHER_USER, CHAT) == 0.0
+    # the chat bucket is empty, the user bucket keeps its tokens
+    assert throttling.check(OTHER_USER, CHAT) == 1.0
+    assert throttling.check(OTHER_USER, OTHER_CHAT) == 0.0
+
+    assert throttling.user_buckets.peek(USER.id, clock.now) == 1.0
+    assert throttling.chat_buckets.peek(CHAT.id, clock.now) == 1.0
+    clock.now += 1.0
+    assert throttling.check(USER, CHAT) == 0.0
+
+
+def test_zero_rate_disables_the_limit(clock):
+    throttling = middleware(POLICY_DROP, chat_rate=0.0)
+
+    assert throttling.chat_buckets is None
+    assert [throttling.check(None, CHAT) for _ in range(5)] == [0.0] * 5
+
+
+def run_updates(throttling: ThrottlingMiddleware, count: int, user: User = USER) -> list:
+    async def handler(event, data):
+        return event.update_id
+
+    async def scenario():
+        return await asyncio.gather(*(
+            throttling(handler, Update(update_id=update_id), {"event_from_user": user, "event_chat": CHAT})
+            for update_id in range(count)
+        ))
+
+    return asyncio.run(scenario())
+
+
+def test_drop_policy_skips_updates_over_the_limit(clock):
+    throttling = middleware(POLICY_DROP)
+
+    assert run_updates(throttling, 4) == [0, 1, None, None]
+    assert throttling.stats()["allowed"] == 2
+    assert throttling.stats()["throttled"] == {POLICY_DROP: 2}
+    assert throttling.stats()["top_users"] == [(USER.id, 2)]
+
+
+def test_record_policy_counts_and_processes_updates_over_the_limit(clock):
+    throttling = middleware(POLICY_RECORD)
+
+    assert run_updates(throttling, 4) == [0, 1, 2, 3]
+    assert throttling.stats()["allowed"] == 2
+    assert throttling.stats()["throttled"] == {POLICY_RECORD: 2}
+
+
+def test_delay_policy_waits_up_to_max_delay_then_drops(clock, monkeypatch):
+    sleeps = []
+
+    async def sleep(seconds: float) -> None:
+        sleeps.append(seconds)
+
+    monkeypatch.setattr(throttling_module.asyncio, "sleep", sleep)
+    throttling = middleware(POLICY_DELAY, max_delay_seconds=1.5)
+
+    # two tokens, one reserved within max delay, the next one would take 2 seconds
+    assert run_updates(throttling, 4) == [0, 1, 2, None]
+    assert sleeps == [1.0]
+    assert throttling.stats()["throttled"] == {POLICY_DELAY: 1, POLICY_DROP: 1}
+
+
+def test_exempt_users_are_not_limited(clock):
+    throttling = middleware(POLICY_DROP, exempt_user_ids=[USER.id])
+
+    assert run_updates(throttling, 4) == [0, 1, 2, 3]
+    assert throttling.stats()["throttled"] == {}